@@ -0,0 +1,94 @@
+"""
+Measures, for every available serialization codec, the time needed to serialize and to load
+the contents produced from a dataset, and the disk space that they use.
+
+Run from the root of the repository:
+    python benchmarks/serialization_benchmark.py [--dataset datasets/movies_info_reduced.json] [--repeat 3]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from orange_cb_recsys.content_analyzer import ContentAnalyzer, ContentAnalyzerConfig, FieldConfig, \
+    FieldRepresentationPipeline
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.tf_idf import SkLearnTfIdf
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.utils.load_content import get_all_items, load_content_instance
+from orange_cb_recsys.utils.serialization import get_codec_name_list, get_codec
+
+
+def produce_contents(dataset_path: str, output_directory: str):
+    """
+    Produces the contents of the dataset, with the tf-idf of the plot and the original data of some fields
+    """
+    plot_config = FieldConfig()
+    plot_config.append_pipeline(FieldRepresentationPipeline(SkLearnTfIdf()))
+    plot_config.append_pipeline(FieldRepresentationPipeline(None))
+    config = ContentAnalyzerConfig('ITEM', JSONFile(dataset_path), ["imdbID"], output_directory, codec='none')
+    config.append_field_config("Plot", plot_config)
+    for field_name in ["Title", "Genre", "Director", "Actors"]:
+        field_config = FieldConfig()
+        field_config.append_pipeline(FieldRepresentationPipeline(None))
+        config.append_field_config(field_name, field_config)
+    ContentAnalyzer(config).fit()
+
+    return config.get_output_directory()
+
+
+def directory_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, file_name)) for file_name in os.listdir(directory))
+
+
+def benchmark_codec(contents: list, codec: str, directory: str, repeat: int):
+    """
+    Returns:
+        write_time (float): best time, in seconds, to serialize all the contents
+        read_time (float): best time, in seconds, to load all the contents
+        size (int): bytes used by the serialized contents
+    """
+    file_name_list = [os.path.splitext(file_name)[0] for file_name in os.listdir(directory)
+                      if file_name.endswith(get_codec('lzma').get_extension())]
+    codec_directory = os.path.join(directory, codec)
+
+    write_time_list, read_time_list = [], []
+    for _ in range(repeat):
+        shutil.rmtree(codec_directory, ignore_errors=True)
+        os.mkdir(codec_directory)
+
+        start = time.perf_counter()
+        for content in contents:
+            content.serialize(codec_directory, codec)
+        write_time_list.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for file_name in file_name_list:
+            load_content_instance(codec_directory, file_name)
+        read_time_list.append(time.perf_counter() - start)
+
+    return min(write_time_list), min(read_time_list), directory_size(codec_directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the serialization codecs of the contents")
+    parser.add_argument('--dataset', default=os.path.join('datasets', 'movies_info_reduced.json'))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    work_directory = tempfile.mkdtemp()
+    try:
+        directory = produce_contents(args.dataset, os.path.join(work_directory, 'contents'))
+        contents = get_all_items(directory)
+
+        print("%d contents" % len(contents))
+        print("%-6s %12s %12s %12s" % ("codec", "write (ms)", "read (ms)", "size (KiB)"))
+        for codec in get_codec_name_list():
+            write_time, read_time, size = benchmark_codec(contents, codec, directory, args.repeat)
+            print("%-6s %12.1f %12.1f %12.1f" % (codec, write_time * 1000, read_time * 1000, size / 1024))
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import os
 import time
 from typing import List, Dict, Set
 
@@ -7,6 +8,17 @@ from orange_cb_recsys.content_analyzer.information_processor.information_process
 from orange_cb_recsys.content_analyzer.lod_properties_retrieval import LODPropertiesRetrieval
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import InformationInterface
 from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource
+from orange_cb_recsys.utils.serialization import get_codec
+
+
+def _to_bool(value):
+    """
+    Converts a flag of the config, that is a string when the config is read from a file,
+    to a bool: only the string 'true' (in any case) is True, other values are kept as they are
+    """
+    if type(value) is str:
+        return value.lower() == 'true'
+    return value
 
 
 class FieldRepresentationPipeline:
@@ -123,6 +135,21 @@ class ContentAnalyzerConfig:
             composed of multiple fields
         field_config_dict (Dict<str, FieldConfig>):
             store the config for each field_name
+        columnar_store (bool): if True the contents will be stored in a single columnar
+            store file instead of one serialized file per content
+        n_jobs (int): number of processes used to produce the representations of the
+            single content techniques, -1 means one process for each cpu
+        incremental (bool): if True the output directory is used as is and, if it contains the contents
+            produced by a previous run, only the new or changed contents are produced again
+        collection_update_threshold (float): in incremental mode, fraction of the collection that must
+            change before the representations of the collection based techniques of the unchanged
+            contents are produced again
+        ann_index (bool): if True an approximate nearest neighbour index is built on the exported
+            matrix of every document embedding representation
+        inverted_index (bool): if True an inverted index is built on the exported matrix
+            of every features bag representation
+        codec (str): compression of the serialized contents, one of the codecs of
+            orange_cb_recsys.utils.serialization. Ignored if the contents are stored in a columnar store
     """
 
     def __init__(self, content_type: str,
@@ -131,16 +158,45 @@ class ContentAnalyzerConfig:
                  output_directory: str,
                  search_index=False,
                  field_config_dict: Dict[str, FieldConfig] = None,
-                 lod_properties_retrieval: LODPropertiesRetrieval = None):
+                 lod_properties_retrieval: LODPropertiesRetrieval = None,
+                 columnar_store=False,
+                 n_jobs=1,
+                 incremental=False,
+                 collection_update_threshold=0.1,
+                 ann_index=False,
+                 inverted_index=False,
+                 codec='lzma'):
         if field_config_dict is None:
             field_config_dict = {}
 
-        if type(search_index) is str:
-            self.__search_index = search_index.lower() == 'true'
-        else:
-            self.__search_index = search_index
+        self.__search_index = _to_bool(search_index)
+        self.__columnar_store = _to_bool(columnar_store)
+
+        n_jobs = int(n_jobs)
+        if n_jobs == -1:
+            n_jobs = os.cpu_count()
+        if n_jobs < 1:
+            raise ValueError("n_jobs must be a positive number or -1")
+        self.__n_jobs: int = n_jobs
+
+        self.__incremental = _to_bool(incremental)
+
+        collection_update_threshold = float(collection_update_threshold)
+        if collection_update_threshold < 0:
+            raise ValueError("collection_update_threshold can't be negative")
+        self.__collection_update_threshold: float = collection_update_threshold
+
+        self.__ann_index = _to_bool(ann_index)
+        self.__inverted_index = _to_bool(inverted_index)
 
-        self.__output_directory: str = output_directory + str(time.time())
+        # raises ValueError if the codec is not available
+        self.__codec: str = get_codec(codec).get_name()
+
+        # incremental runs must find the contents of the previous runs in the same directory
+        if self.__incremental:
+            self.__output_directory: str = output_directory
+        else:
+            self.__output_directory: str = output_directory + str(time.time())
         self.__content_type = content_type.lower()
         self.__field_config_dict: Dict[str, FieldConfig] = field_config_dict
         self.__source: RawInformationSource = source
@@ -158,6 +214,27 @@ class ContentAnalyzerConfig:
     def get_search_index(self):
         return self.__search_index
 
+    def get_columnar_store(self):
+        return self.__columnar_store
+
+    def get_n_jobs(self):
+        return self.__n_jobs
+
+    def get_incremental(self):
+        return self.__incremental
+
+    def get_collection_update_threshold(self):
+        return self.__collection_update_threshold
+
+    def get_ann_index(self):
+        return self.__ann_index
+
+    def get_inverted_index(self):
+        return self.__inverted_index
+
+    def get_codec(self):
+        return self.__codec
+
     def get_output_directory(self):
         return self.__output_directory
 
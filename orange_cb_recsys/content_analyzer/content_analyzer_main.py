@@ -1,21 +1,104 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
 from typing import Dict
 import time
 import os
+import re
+import shutil
 
 from orange_cb_recsys.content_analyzer.config import ContentAnalyzerConfig, \
     FieldRepresentationPipeline
+from orange_cb_recsys.content_analyzer.content_representation.ann_index import build_ann_index, ANN_INDEX_SUFFIX
 from orange_cb_recsys.content_analyzer.content_representation.content import Content, \
     RepresentedContentsRecap
-from orange_cb_recsys.content_analyzer.content_representation.content_field import ContentField
+from orange_cb_recsys.content_analyzer.content_representation.content_field import ContentField, \
+    FeaturesBagField
+from orange_cb_recsys.content_analyzer.content_representation.content_store import ColumnarStoreWriter, \
+    ColumnarStoreReader, STORE_FILE_NAME
+from orange_cb_recsys.content_analyzer.content_representation.content_manifest import ContentManifestWriter
+from orange_cb_recsys.content_analyzer.content_representation.document_id_map import write_document_id_map
+from orange_cb_recsys.content_analyzer.content_representation.inverted_index import build_inverted_index, \
+    INVERTED_INDEX_SUFFIX
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import \
+    EmbeddingMatrixWriter, FeaturesBagMatrixWriter, EmbeddingMatrix, FeaturesBagMatrix, \
+    REPRESENTATIONS_DIRECTORY, get_representation_path
 from orange_cb_recsys.content_analyzer.field_content_production_techniques. \
     field_content_production_technique import \
     CollectionBasedTechnique, \
-    SingleContentTechnique, SearchIndexing
+    SingleContentTechnique, SearchIndexing, EmbeddingTechnique
+from orange_cb_recsys.content_analyzer.fingerprints import IncrementalUpdate, config_fingerprint, \
+    raw_content_fingerprint
 from orange_cb_recsys.content_analyzer.memory_interfaces import IndexInterface
+from orange_cb_recsys.utils import serialization
 from orange_cb_recsys.utils.const import home_path, DEVELOPING, logger
 from orange_cb_recsys.utils.id_merger import id_merger
 
 
+# number of raw contents that each process of the pool receives at once
+_CHUNK_SIZE_PER_JOB = 16
+
+# pipelines of the single content techniques, set in each process of the pool
+_worker_pipeline_dict = None
+
+
+def _init_worker(pipeline_dict: Dict[str, list]):
+    global _worker_pipeline_dict
+    _worker_pipeline_dict = pipeline_dict
+
+
+def _produce_representations(raw_content: Dict) -> Dict[str, Dict[str, object]]:
+    """
+    Produces, in a process of the pool, the representations of the single content techniques
+    of a raw content
+
+    Returns:
+        representation_dict: for each field name, the representations of the field
+            indexed by representation id
+    """
+    representation_dict = {}
+    for field_name, pipeline_list in _worker_pipeline_dict.items():
+        field_data = _get_field_data(raw_content, field_name)
+        representation_dict[field_name] = {
+            representation_id: _produce_representation(representation_id, field_data, pipeline)
+            for representation_id, pipeline in pipeline_list}
+
+    return representation_dict
+
+
+def _get_field_data(raw_content: Dict, field_name: str):
+    """
+    Gets the data of a field of a raw content, a field can be a list [data, timestamp]
+    """
+    if isinstance(raw_content[field_name], list):
+        return raw_content[field_name][0]
+    return raw_content[field_name]
+
+
+def _produce_representation(field_representation_name: str, field_data,
+                           pipeline: FieldRepresentationPipeline):
+    """
+    Returns the specified representation for the specified field.
+    Args:
+        field_representation_name: Name of the representation
+        field_data: Raw data contained in the field
+        pipeline: Preprocessing pipeline for the data
+
+    Returns:
+        (FieldRepresentation)
+    """
+    preprocessor_list = pipeline.get_preprocessor_list()
+    processed_field_data = field_data
+    for preprocessor in preprocessor_list:
+        processed_field_data = preprocessor.process(processed_field_data)
+
+    representation = pipeline.get_content_technique(). \
+        produce_content(field_representation_name, processed_field_data)
+    # the representations of the contents are kept compact in memory
+    representation.compact()
+    return representation
+
+
 class ContentAnalyzer:
     """
     Class to whom the control of the content analysis phase is delegated
@@ -33,6 +116,11 @@ class ContentAnalyzer:
         self.__config = config
 
     def __dataset_refactor(self):
+        """
+        Creates the collections of the collection based techniques. The collection is always built
+        on the whole source, also in incremental mode when only some contents changed,
+        since the representations of a content, like its tf-idf, depend on every content of the collection
+        """
         for field_name in self.__config.get_field_name_list():
             for pipeline in self.__config.get_pipeline_list(field_name):
 
@@ -46,6 +134,74 @@ class ContentAnalyzer:
                     technique.dataset_refactor(
                         self.__config.get_source(), self.__config.get_id_field_name())
 
+    def __create_matrix_writers(self, output_path: str):
+        """
+        Creates a writer for each representation that is known to be exportable as a dense matrix,
+        that is each document embedding representation. The writers of the features bag
+        representations are created when the first content is exported
+        """
+        matrix_writers = {}
+        for field_name in self.__config.get_field_name_list():
+            for i, pipeline in enumerate(self.__config.get_pipeline_list(field_name)):
+                technique = pipeline.get_content_technique()
+                if isinstance(technique, EmbeddingTechnique) and technique.get_granularity() == "doc":
+                    matrix_writers[(field_name, str(i))] = EmbeddingMatrixWriter(output_path, field_name, str(i))
+
+        return matrix_writers
+
+    @staticmethod
+    def __export_representations(content: Content, matrix_writers: dict, output_path: str):
+        """
+        Appends the representations of the content to the matrices in which they are exported
+        """
+        for field_name, field in content.get_field_list().items():
+            for representation_id, representation in field.get_representation_list().items():
+                key = (field_name, representation_id)
+                if key not in matrix_writers and isinstance(representation, FeaturesBagField):
+                    matrix_writers[key] = FeaturesBagMatrixWriter(output_path, field_name, representation_id)
+                if key in matrix_writers:
+                    matrix_writers[key].append(content.get_content_id(), representation.get_value())
+
+    def __produce_contents(self, contents_producer, raw_contents):
+        """
+        Generator that creates the contents from the raw contents, in the same order.
+        If the config sets more than one job, the representations produced by single content techniques
+        are computed by a pool of processes, in chunks of raw contents; the other representations,
+        the search index and the memory interfaces are still produced by this process
+        """
+        n_jobs = self.__config.get_n_jobs()
+        pipeline_dict = {}
+        for field_name in self.__config.get_field_name_list():
+            pipeline_list = [(str(i), pipeline)
+                             for i, pipeline in enumerate(self.__config.get_pipeline_list(field_name))
+                             if isinstance(pipeline.get_content_technique(), SingleContentTechnique)]
+            if len(pipeline_list) != 0:
+                pipeline_dict[field_name] = pipeline_list
+
+        if n_jobs == 1 or len(pipeline_dict) == 0:
+            for raw_content in raw_contents:
+                yield contents_producer.create_content(raw_content)
+            return
+
+        source_iterator = iter(raw_contents)
+        chunk_size = n_jobs * _CHUNK_SIZE_PER_JOB
+        with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=(pipeline_dict,)) as executor:
+            # the next chunk is submitted before the current one is consumed, to keep the workers busy
+            pending = None
+            while True:
+                chunk = list(islice(source_iterator, chunk_size))
+                submitted = None
+                if len(chunk) != 0:
+                    submitted = (chunk, executor.map(_produce_representations, chunk, chunksize=_CHUNK_SIZE_PER_JOB))
+
+                if pending is not None:
+                    for raw_content, representation_dict in zip(*pending):
+                        yield contents_producer.create_content(raw_content, representation_dict)
+
+                if submitted is None:
+                    break
+                pending = submitted
+
     def __config_recap(self):
         recap_list = [("Field: %s; representation id: %s: technique: %s",
                        field_name, str(pipeline), str(pipeline.get_content_technique()))
@@ -54,49 +210,274 @@ class ContentAnalyzer:
 
         return RepresentedContentsRecap(recap_list)
 
+    def __has_collection_techniques(self) -> bool:
+        return any(isinstance(pipeline.get_content_technique(), CollectionBasedTechnique)
+                   for field_name in self.__config.get_field_name_list()
+                   for pipeline in self.__config.get_pipeline_list(field_name))
+
+    def __get_incremental_update(self, output_path: str) -> IncrementalUpdate:
+        """
+        Compares the fingerprints of the raw contents in the source and of the config
+        with the ones saved by the previous run in the output directory
+        """
+        content_fingerprint_dict = {}
+        for raw_content in self.__config.get_source():
+            content_id = id_merger(raw_content, self.__config.get_id_field_name())
+            content_fingerprint_dict[content_id] = raw_content_fingerprint(raw_content)
+
+        return IncrementalUpdate(output_path, config_fingerprint(self.__config), content_fingerprint_dict,
+                                 self.__config.get_collection_update_threshold(),
+                                 self.__has_collection_techniques())
+
+    @staticmethod
+    def __remove_contents(update: IncrementalUpdate, output_path: str, indexer: IndexInterface, interfaces):
+        """
+        Removes the contents deleted from the source since the previous run, and the outputs
+        of the previous run that are not valid anymore if the config changed
+        """
+        if update.is_config_changed():
+            shutil.rmtree(os.path.join(output_path, REPRESENTATIONS_DIRECTORY), ignore_errors=True)
+            if os.path.isfile(os.path.join(output_path, STORE_FILE_NAME)):
+                os.remove(os.path.join(output_path, STORE_FILE_NAME))
+
+        for content_id in update.get_deleted_id_list():
+            logger.info("Removing content %s", content_id)
+            if indexer is not None:
+                indexer.delete_content(content_id)
+            for interface in interfaces:
+                if isinstance(interface, IndexInterface):
+                    interface.delete_content(content_id)
+
+        # if the config changed the contents may be written with another codec, so with another extension
+        removed_id_list = update.get_deleted_id_list()
+        if update.is_config_changed():
+            removed_id_list = removed_id_list + list(update.get_changed_id_set())
+        for content_id in removed_id_list:
+            content_path = os.path.join(output_path, re.sub(r'[^\w\s]', '', content_id))
+            for extension in serialization.get_extension_list():
+                if os.path.isfile(content_path + extension):
+                    os.remove(content_path + extension)
+
+    def __load_exported_matrices(self, output_path: str) -> dict:
+        """
+        Opens the matrices exported by the previous run, indexed by (field name, representation id)
+        """
+        exported_matrices = {}
+        for field_name in self.__config.get_field_name_list():
+            for i, _ in enumerate(self.__config.get_pipeline_list(field_name)):
+                if os.path.isfile(get_representation_path(output_path, field_name, str(i), '.npy')):
+                    exported_matrices[(field_name, str(i))] = EmbeddingMatrix(output_path, field_name, str(i))
+                elif os.path.isfile(get_representation_path(output_path, field_name, str(i), '.npz')):
+                    exported_matrices[(field_name, str(i))] = FeaturesBagMatrix(output_path, field_name, str(i))
+
+        return exported_matrices
+
+    @staticmethod
+    def __load_unchanged_contents(update: IncrementalUpdate, output_path: str,
+                                  previous_store: ColumnarStoreReader, contents_producer,
+                                  index_updated: bool):
+        """
+        Generator of the unchanged contents produced by the previous run. If the collection changed enough,
+        the representations of the collection based techniques of the contents are produced again.
+        If the search index was updated, the documents of the contents may have moved,
+        so their document ids are removed: the ids are in the document id map written after the update
+        """
+        for content_id in update.get_unchanged_id_list():
+            if previous_store is not None:
+                content = previous_store.get_content(content_id)
+            else:
+                content = None
+                content_path = serialization.find_file(os.path.join(output_path, re.sub(r'[^\w\s]', '', content_id)))
+                if content_path is not None:
+                    content = serialization.load(content_path)
+            if content is None:
+                logger.warning("Content %s of the previous run not found", content_id)
+                continue
+
+            if update.get_refresh_collection():
+                contents_producer.refresh_collection_representations(content)
+            if index_updated:
+                content.set_index_document_id(None)
+            yield content
+
+    def __build_indexes(self, matrix_writers: dict, output_path: str):
+        """
+        Builds the ANN index of each exported embedding matrix and the inverted index of each exported
+        features bag matrix, if the configuration asks for them, otherwise removes the indexes
+        of the previous run, that would no longer match the matrices
+        """
+        for key, matrix_writer in matrix_writers.items():
+            if isinstance(matrix_writer, EmbeddingMatrixWriter):
+                matrix_suffix, index_suffix = '.npy', ANN_INDEX_SUFFIX
+                build_index, index_enabled = build_ann_index, self.__config.get_ann_index()
+            else:
+                matrix_suffix, index_suffix = '.npz', INVERTED_INDEX_SUFFIX
+                build_index, index_enabled = build_inverted_index, self.__config.get_inverted_index()
+            if not os.path.isfile(get_representation_path(output_path, *key, matrix_suffix)):
+                continue
+
+            if index_enabled:
+                build_index(output_path, *key)
+            elif os.path.isfile(get_representation_path(output_path, *key, index_suffix)):
+                os.remove(get_representation_path(output_path, *key, index_suffix))
+
     def fit(self):
         """
-        Processes the creation of the contents and serializes the contents
+        Processes the creation of the contents and serializes the contents.
+        In incremental mode only the contents that are new or changed since the previous run
+        are produced, the unchanged contents are copied from the previous store as they are stored
+        and the contents deleted from the source are removed.
+        The collections of the collection based techniques are still created on the whole source
+        when any content changed, but not when the contents were only deleted
         """
 
         output_path = self.__config.get_output_directory()
         if not DEVELOPING:
             output_path = os.path.join(home_path, 'contents', self.__config.get_output_directory())
-        os.mkdir(output_path)
+
+        update = None
+        raw_contents = self.__config.get_source()
+        if self.__config.get_incremental():
+            os.makedirs(output_path, exist_ok=True)
+            update = self.__get_incremental_update(output_path)
+            if update.is_empty():
+                logger.info("The contents in %s are up to date", output_path)
+                return
+
+            changed_id_set = update.get_changed_id_set()
+            raw_contents = (raw_content for raw_content in self.__config.get_source()
+                            if id_merger(raw_content, self.__config.get_id_field_name()) in changed_id_set)
+        else:
+            os.mkdir(output_path)
 
         indexer = None
         if self.__config.get_search_index():
             index_path = os.path.join(output_path, 'search_index')
             indexer = IndexInterface(index_path)
-            indexer.init_writing()
+            indexer.init_writing(update_existing=update is not None)
 
         contents_producer = ContentsProducer.get_instance()
         contents_producer.set_config(self.__config)
 
         interfaces = self.__config.get_interfaces()
         for interface in interfaces:
-            interface.init_writing()
-
-        self.__dataset_refactor()
-        contents_producer.set_indexer(indexer)
-        i = 0
-        for raw_content in self.__config.get_source():
-            logger.info("Processing item %d", i)
-            content = contents_producer.create_content(raw_content)
-            content.serialize(output_path)
-            i += 1
-
-        if self.__config.get_search_index():
-            indexer.stop_writing()
-
-        for interface in interfaces:
-            interface.stop_writing()
-
-        for field_name in self.__config.get_field_name_list():
-            for pipeline in self.__config.get_pipeline_list(field_name):
-                technique = pipeline.get_content_technique()
-                if isinstance(technique, CollectionBasedTechnique):
-                    technique.delete_refactored()
+            if update is not None and isinstance(interface, IndexInterface):
+                interface.init_writing(update_existing=True)
+            else:
+                interface.init_writing()
+
+        previous_store = None
+        try:
+            exported_matrices = {}
+            if update is not None:
+                self.__remove_contents(update, output_path, indexer, interfaces)
+                if os.path.isfile(os.path.join(output_path, STORE_FILE_NAME)):
+                    previous_store = ColumnarStoreReader(output_path)
+                if not update.get_refresh_collection():
+                    exported_matrices = self.__load_exported_matrices(output_path)
+
+            store_writer = None
+            if self.__config.get_columnar_store():
+                store_writer = ColumnarStoreWriter(output_path)
+
+            matrix_writers = self.__create_matrix_writers(output_path)
+            manifest_writer = ContentManifestWriter(output_path)
+
+            refactored = update is None or len(update.get_changed_id_set()) != 0 or update.get_refresh_collection()
+            if refactored:
+                self.__dataset_refactor()
+            contents_producer.set_indexer(indexer)
+
+            serialization_executor = None
+            pending_serializations = deque()
+            if store_writer is None and self.__config.get_n_jobs() > 1:
+                # compression releases the GIL, so contents can be serialized by threads
+                serialization_executor = ThreadPoolExecutor(self.__config.get_n_jobs())
+
+            # the unchanged contents are copied from the previous store as they are stored, without unpickling them,
+            # unless their collection based representations must be produced again
+            copy_unchanged = update is not None and previous_store is not None and store_writer is not None \
+                and not update.get_refresh_collection()
+
+            contents = self.__produce_contents(contents_producer, raw_contents)
+            if not copy_unchanged and (previous_store is not None or
+                                       (update is not None and update.get_refresh_collection())):
+                # the unchanged contents are written again, in the new store or with their refreshed representations
+                contents = chain(contents, self.__load_unchanged_contents(
+                    update, output_path, previous_store, contents_producer, indexer is not None))
+
+            for i, content in enumerate(contents):
+                logger.info("Processed item %d", i)
+                if store_writer is not None:
+                    store_writer.append(content)
+                elif serialization_executor is not None:
+                    pending_serializations.append(serialization_executor.submit(content.serialize, output_path,
+                                                                               self.__config.get_codec()))
+                    while len(pending_serializations) > 2 * self.__config.get_n_jobs():
+                        pending_serializations.popleft().result()
+                else:
+                    content.serialize(output_path, self.__config.get_codec())
+                manifest_writer.append(content.get_content_id())
+                self.__export_representations(content, matrix_writers, output_path)
+
+            if copy_unchanged:
+                for content_id in update.get_unchanged_id_list():
+                    if store_writer.append_copy(previous_store, content_id,
+                                                clear_index_document_id=indexer is not None):
+                        manifest_writer.append(content_id)
+                    else:
+                        logger.warning("Content %s of the previous run not found", content_id)
+
+            # the unchanged contents were copied, the previous store must be unmapped before it is replaced
+            if previous_store is not None:
+                previous_store.close()
+
+            # the unchanged contents that weren't written again keep their rows of the exported matrices
+            for key, exported_matrix in exported_matrices.items():
+                if key not in matrix_writers:
+                    if isinstance(exported_matrix, EmbeddingMatrix):
+                        matrix_writers[key] = EmbeddingMatrixWriter(output_path, *key)
+                    else:
+                        matrix_writers[key] = FeaturesBagMatrixWriter(output_path, *key)
+                matrix_writers[key].append_rows(exported_matrix, update.get_unchanged_id_list())
+
+            # the unchanged contents that weren't written again keep their files
+            if update is not None and previous_store is None and not update.get_refresh_collection():
+                for content_id in update.get_unchanged_id_list():
+                    manifest_writer.append(content_id)
+
+            if serialization_executor is not None:
+                for serialization in pending_serializations:
+                    serialization.result()
+                serialization_executor.shutdown()
+
+            if store_writer is not None:
+                store_writer.close()
+            manifest_writer.close()
+
+            for matrix_writer in matrix_writers.values():
+                matrix_writer.close()
+            self.__build_indexes(matrix_writers, output_path)
+
+            if self.__config.get_search_index():
+                indexer.stop_writing()
+                write_document_id_map(output_path, indexer.get_content_id_list())
+
+            for interface in interfaces:
+                interface.stop_writing()
+
+            if refactored:
+                for field_name in self.__config.get_field_name_list():
+                    for pipeline in self.__config.get_pipeline_list(field_name):
+                        technique = pipeline.get_content_technique()
+                        if isinstance(technique, CollectionBasedTechnique):
+                            technique.delete_refactored()
+
+            if update is not None:
+                update.save()
+        finally:
+            if previous_store is not None:
+                previous_store.close()
 
     def __str__(self):
         return "ContentAnalyzer"
@@ -155,7 +536,8 @@ class ContentsProducer:
 
         return timestamp
 
-    def __create_field(self, raw_content: Dict, field_name: str, content_id: str, timestamp: str):
+    def __create_field(self, raw_content: Dict, field_name: str, content_id: str, timestamp: str,
+                       precomputed_representations: Dict[str, object] = None):
         """
         Create a new field for the specified content
         Args:
@@ -163,15 +545,18 @@ class ContentsProducer:
             field_name (str): Name of the new field
             content_id (str): Id of the content to which add the field
             timestamp (str)
+            precomputed_representations (Dict<str, FieldRepresentation>): representations of the
+                single content techniques already produced, indexed by representation id
 
         Returns:
             field (ContentField)
         """
+        if precomputed_representations is None:
+            precomputed_representations = {}
+
         if isinstance(raw_content[field_name], list):
             timestamp = raw_content[field_name][1]
-            field_data = raw_content[field_name][0]
-        else:
-            field_data = raw_content[field_name]
+        field_data = _get_field_data(raw_content, field_name)
 
         # serialize for explanation
         memory_interface = self.__config.get_memory_interface(field_name)
@@ -190,7 +575,10 @@ class ContentsProducer:
                              (str(i), field_name, content_id, pipeline))
 
             elif isinstance(pipeline.get_content_technique(), SingleContentTechnique):
-                field.append(str(i), self.__create_representation(str(i), field_data, pipeline))
+                if str(i) in precomputed_representations:
+                    field.append(str(i), precomputed_representations[str(i)])
+                else:
+                    field.append(str(i), _produce_representation(str(i), field_data, pipeline))
             elif isinstance(pipeline.get_content_technique(), SearchIndexing):
                 self.__invoke_indexing_technique(field_name, field_data, pipeline)
             elif pipeline.get_content_technique() is None:
@@ -213,36 +601,35 @@ class ContentsProducer:
     def __create_representation_CBT(field_representation_name: str,
                                     field_name: str, content_id: str,
                                     pipeline: FieldRepresentationPipeline):
-        return pipeline.get_content_technique(). \
+        representation = pipeline.get_content_technique(). \
             produce_content(field_representation_name, content_id, field_name)
+        representation.compact()
+        return representation
 
-    @staticmethod
-    def __create_representation(field_representation_name: str, field_data,
-                                pipeline: FieldRepresentationPipeline):
+    def refresh_collection_representations(self, content: Content):
         """
-        Returns the specified representation for the specified field.
+        Produces again the representations of the collection based techniques of a content,
+        the other representations are kept. The collections of the techniques must be
+        already created
         Args:
-            field_representation_name: Name of the representation
-            field_data: Raw data contained in the field
-            pipeline: Preprocessing pipeline for the data
-
-        Returns:
-            (Content)
+            content (Content): content produced by a previous run
         """
-        preprocessor_list = pipeline.get_preprocessor_list()
-        processed_field_data = field_data
-        for preprocessor in preprocessor_list:
-            processed_field_data = preprocessor.process(processed_field_data)
-
-        return pipeline.get_content_technique(). \
-            produce_content(field_representation_name, processed_field_data)
+        for field_name in self.__config.get_field_name_list():
+            field = content.get_field(field_name)
+            for i, pipeline in enumerate(self.__config.get_pipeline_list(field_name)):
+                if isinstance(pipeline.get_content_technique(), CollectionBasedTechnique):
+                    field.append(str(i), self.__create_representation_CBT(
+                        str(i), field_name, content.get_content_id(), pipeline))
 
-    def create_content(self, raw_content: Dict):
+    def create_content(self, raw_content: Dict, precomputed_representations: Dict[str, Dict[str, object]] = None):
         """
         Creates a content processing every field in the specified way.
         This method is iteratively invoked by the fit method.
         Args:
             raw_content (dict): Raw data from which the content will be created
+            precomputed_representations (dict): representations already produced for the content,
+                for each field name the representations indexed by representation id.
+                The other representations are produced by this method
 
         Returns:
             content (Content): an instance of content with his fields
@@ -275,13 +662,17 @@ class ContentsProducer:
             interface.new_content()
             interface.new_field(CONTENT_ID, content_id)
 
+        if precomputed_representations is None:
+            precomputed_representations = {}
+
         # produce
         for field_name in self.__config.get_field_name_list():
             logger.info("Processing field: %s", field_name)
             # search for timestamp override on specific field
             content.append(field_name,
                            self.__create_field
-                           (raw_content, field_name, content_id, timestamp))
+                           (raw_content, field_name, content_id, timestamp,
+                            precomputed_representations.get(field_name)))
 
         if self.__indexer is not None:
             content.set_index_document_id(self.__indexer.serialize_content())
@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import \
+    EmbeddingMatrix, get_representation_path
+from orange_cb_recsys.utils.const import logger
+
+ANN_INDEX_SUFFIX = '_ivf.npz'
+
+# rows compared with the centroids at once while the index is built
+_ASSIGNMENT_CHUNK_SIZE = 1 << 16
+# rows of each list used to train the centroids
+_TRAINING_ROWS_PER_LIST = 64
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Finds the most similar centroid (cosine similarity) of each row of the matrix,
+    the rows are normalized and compared in chunks
+    """
+    assignment = np.empty(matrix.shape[0], dtype=np.int64)
+    for start in range(0, matrix.shape[0], _ASSIGNMENT_CHUNK_SIZE):
+        chunk = _normalize(np.asarray(matrix[start:start + _ASSIGNMENT_CHUNK_SIZE], dtype=np.float32))
+        assignment[start:start + chunk.shape[0]] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignment
+
+
+def build_ann_index(directory: str, field_name: str, representation_id: str, n_lists: int = None,
+                    n_iterations: int = 10, seed: int = 0):
+    """
+    Builds an inverted file (IVF) index on the embedding matrix exported for a document embedding
+    representation, and saves it next to the matrix.
+    The rows of the matrix are clustered with spherical k-means in n_lists lists, and each row
+    is stored in the list of its most similar centroid: a search compares the query with the centroids,
+    and then only with the rows of the lists whose centroids are the most similar to the query
+
+    Args:
+        directory (str): directory of the contents
+        field_name (str): name of the exported field
+        representation_id (str): id of the exported representation
+        n_lists (int): number of lists, if None the square root of the number of rows
+        n_iterations (int): number of k-means iterations
+        seed (int): seed of the random choice of the rows that train the centroids
+    """
+    matrix = EmbeddingMatrix(directory, field_name, representation_id).get_matrix()
+    n_rows = matrix.shape[0]
+    if n_lists is None:
+        n_lists = int(round(np.sqrt(n_rows)))
+    n_lists = max(1, min(n_lists, n_rows))
+
+    index_path = get_representation_path(directory, field_name, representation_id, ANN_INDEX_SUFFIX)
+    logger.info("Building ANN index %s with %d lists", index_path, n_lists)
+
+    random_state = np.random.RandomState(seed)
+    training_index = np.arange(n_rows)
+    if n_rows > _TRAINING_ROWS_PER_LIST * n_lists:
+        training_index = np.sort(random_state.choice(n_rows, _TRAINING_ROWS_PER_LIST * n_lists, replace=False))
+    training_matrix = _normalize(np.asarray(matrix[training_index], dtype=np.float32))
+
+    centroids = training_matrix[random_state.choice(training_matrix.shape[0], n_lists, replace=False)]
+    for _ in range(n_iterations):
+        assignment = np.argmax(training_matrix @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, training_matrix)
+        # the centroids of the empty lists are kept
+        non_empty = np.bincount(assignment, minlength=n_lists) > 0
+        centroids[non_empty] = _normalize(sums[non_empty])
+
+    assignment = _assign(matrix, centroids)
+    row_order = np.argsort(assignment, kind='stable')
+    list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))])
+
+    # np.savez adds the .npz extension to the paths that don't have it
+    temp_path = index_path[:-len('.npz')] + '.tmp.npz'
+    np.savez(temp_path, centroids=centroids, row_order=row_order, list_offsets=list_offsets)
+    os.replace(temp_path, index_path)
+
+
+class ANNIndex:
+    """
+    Class that gives access to an index built by build_ann_index.
+    The index finds the rows of the embedding matrix that are candidates to be the most similar
+    to a query, the candidates must then be compared with the query to get the exact ranking
+
+    Args:
+        directory (str): directory of the contents
+        field_name (str): name of the exported field
+        representation_id (str): id of the exported representation
+    """
+
+    def __init__(self, directory: str, field_name: str, representation_id: str):
+        with np.load(get_representation_path(directory, field_name, representation_id, ANN_INDEX_SUFFIX)) \
+                as index_file:
+            self.__centroids: np.ndarray = index_file['centroids']
+            self.__row_order: np.ndarray = index_file['row_order']
+            self.__list_offsets: np.ndarray = index_file['list_offsets']
+
+    def get_row_count(self) -> int:
+        """
+        Number of rows of the matrix on which the index was built
+        """
+        return len(self.__row_order)
+
+    def get_candidate_rows(self, query: np.ndarray, k: int, n_probe: int) -> np.ndarray:
+        """
+        Gets the rows of the n_probe lists whose centroids are the most similar to the query.
+        If those lists have less than k rows, the following lists are added until there are at least k rows
+
+        Args:
+            query (np.ndarray): one dimensional vector
+            k (int): minimum number of rows
+            n_probe (int): minimum number of lists searched
+
+        Returns:
+            rows (np.ndarray): sorted positions of the candidate rows in the matrix
+        """
+        list_order = np.argsort(-(self.__centroids @ _normalize(np.asarray(query, dtype=np.float32))),
+                                kind='stable')
+        list_sizes = np.diff(self.__list_offsets)[list_order]
+        n_lists = max(n_probe, int(np.searchsorted(np.cumsum(list_sizes), k)) + 1)
+
+        rows = np.concatenate([self.__row_order[self.__list_offsets[i]:self.__list_offsets[i + 1]]
+                               for i in list_order[:n_lists]])
+        # sorted rows are read from the memory mapped matrix with fewer page faults
+        return np.sort(rows)
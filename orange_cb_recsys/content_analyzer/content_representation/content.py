@@ -1,13 +1,22 @@
-import lzma
 import os
 from typing import Dict
-import pickle
 import re
 
-from orange_cb_recsys.content_analyzer.content_representation.content_field import ContentField
+from orange_cb_recsys.content_analyzer.content_representation.content_field import ContentField, \
+    COMPACT_FORMAT_VERSION, check_compact_format_version, intern_id, set_legacy_state
+from orange_cb_recsys.utils import serialization
 from orange_cb_recsys.utils.const import logger
 
 
+def _rebuild_content(version: int, content_id: str, field_dict: Dict[str, ContentField],
+                     lod_properties: Dict[str, str], index_document_id: int):
+    check_compact_format_version(version)
+    content = Content(content_id, {intern_id(field_name): field for field_name, field in field_dict.items()},
+                      lod_properties)
+    content.set_index_document_id(index_document_id)
+    return content
+
+
 class Content:
     """
     Class that represents a content. A content can be an item or a user.
@@ -20,6 +29,8 @@ class Content:
         lod_properties (Dict[str, str]): dictionary that contains
             exogenous knowledge from a ontology via LOD cloud
     """
+    __slots__ = ('__lod_properties', '__index_document_id', '__content_id', '__field_dict')
+
     def __init__(self, content_id: str,
                  field_dict: Dict[str, ContentField] = None,
                  lod_properties: Dict[str, str] = None):
@@ -30,6 +41,16 @@ class Content:
         self.__content_id: str = content_id
         self.__field_dict: Dict[str, ContentField] = field_dict
 
+    def __reduce__(self):
+        return _rebuild_content, (COMPACT_FORMAT_VERSION, self.__content_id, self.__field_dict,
+                                  self.__lod_properties, self.__index_document_id)
+
+    def __setstate__(self, state):
+        # attributes that older versions didn't have
+        self.__lod_properties = None
+        self.__index_document_id = None
+        set_legacy_state(self, state)
+
     def set_lod_properties(self, lod_properties: Dict[str, str]):
         self.__lod_properties = lod_properties
 
@@ -59,20 +80,21 @@ class Content:
         """
         self.__field_dict.pop(field_name)
 
-    def serialize(self, output_directory: str):
+    def serialize(self, output_directory: str, codec: str = 'lzma'):
         """
-        Serialize a content instance using lzma compression algorithm,
-        so the file extension is .xz
+        Serialize a content instance, compressed with the given codec.
+        The file has the extension of the codec, for example .xz for lzma
 
         Args:
             output_directory (str): Name of the directory in which serialize
+            codec (str): one of the codecs of orange_cb_recsys.utils.serialization:
+                'none', 'zlib', 'lzma', and 'lz4' or 'zstd' if their libraries are installed
         """
         logger.info("Serializing content %s in %s", self.__content_id, output_directory)
 
         file_name = re.sub(r'[^\w\s]', '', self.__content_id)
-        path = os.path.join(output_directory, file_name + '.xz')
-        with lzma.open(path, 'wb') as f:
-            pickle.dump(self, f)
+        path = os.path.join(output_directory, file_name + serialization.get_codec(codec).get_extension())
+        serialization.dump(self, path, codec)
 
     def __str__(self):
         content_string = "Content: %s" % self.__content_id
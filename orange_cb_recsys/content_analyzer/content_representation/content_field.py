@@ -1,8 +1,38 @@
+import sys
+import threading
 from abc import ABC, abstractmethod
+from numbers import Real
 
-from typing import Dict
+from typing import Dict, List
 import numpy as np
 
+# version of the format in which the representations, the fields and the contents are pickled
+COMPACT_FORMAT_VERSION = 1
+
+
+def check_compact_format_version(version: int):
+    if version != COMPACT_FORMAT_VERSION:
+        raise ValueError("Unknown compact format version %s, the version of this library is %d"
+                         % (version, COMPACT_FORMAT_VERSION))
+
+
+def intern_id(value):
+    """
+    Interns the ids that are strings, so the contents loaded in memory share them
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def set_legacy_state(instance, state: dict):
+    """
+    Restores an instance pickled before the classes had __slots__, whose state is the __dict__
+    of the instance. The keys of the __dict__ are the names of the slots
+    """
+    for attribute_name, value in state.items():
+        setattr(instance, attribute_name, value)
+
 
 class FieldRepresentation(ABC):
     """
@@ -12,40 +42,188 @@ class FieldRepresentation(ABC):
     Args:
         name (str): name of the representation's instance
     """
+    __slots__ = ('__name',)
 
     def __init__(self, name: str):
         self.__name = name
 
+    def __setstate__(self, state):
+        set_legacy_state(self, state)
+
     def get_name(self) -> str:
         return self.__name
 
     def __str__(self):
         raise NotImplementedError
 
+    def compact(self) -> bool:
+        """
+        Stores the representation in its compact form, if it has one
+
+        Returns:
+            compact (bool): True if the representation is compact
+        """
+        return False
+
     @abstractmethod
     def get_value(self):
         raise NotImplementedError
 
 
+# vocabulary of the terms of the features bags of the process, the compact features bags
+# store the ids of their terms, so every term is kept in memory once
+_term_id_dict: Dict[str, int] = {}
+_term_list: List[str] = []
+_term_lock = threading.Lock()
+
+
+def get_term_id_array(term_list) -> np.ndarray:
+    """
+    Gets the ids of the given terms in the vocabulary of the process, the new terms are added to it
+    """
+    with _term_lock:
+        term_id_list = []
+        for term in term_list:
+            term_id = _term_id_dict.get(term)
+            if term_id is None:
+                term_id = len(_term_list)
+                _term_id_dict[term] = term_id
+                _term_list.append(sys.intern(term))
+            term_id_list.append(term_id)
+    return np.array(term_id_list, dtype=np.int32)
+
+
+def get_term_list(term_id_array: np.ndarray) -> List[str]:
+    """
+    Gets the terms of the given ids of the vocabulary of the process
+    """
+    return [_term_list[term_id] for term_id in term_id_array.tolist()]
+
+
+def _rebuild_features_bag(version: int, name: str, term_list, weight_array: np.ndarray,
+                          keep_dtype: bool = False):
+    check_compact_format_version(version)
+    features_bag = FeaturesBagField(name, keep_dtype=keep_dtype)
+    # the weights keep the dtype with which they were pickled, float32 unless keep_dtype was set
+    features_bag.set_compact_value(term_list, weight_array)
+    return features_bag
+
+
 class FeaturesBagField(FieldRepresentation):
     """
     Class for field representation using a bag of features.
     This class can also be used to represent a bag of words: <keyword, score>;
-    this representation is produced by the EntityLinking and tf-idf techniques
+    this representation is produced by the EntityLinking and tf-idf techniques.
+
+    A features bag whose keys are strings and whose values are numbers can be made compact:
+    it is then stored as the array of the ids of its keys in the vocabulary of the process
+    and the float32 array of its values, and the dict is built only when it is requested.
+    The contents produced by the content analyzer are made compact when they are created,
+    and the compact features bags are pickled as the keys and the values array, so they are
+    compact also once loaded. Any other features bag is pickled as a dict.
+
+    With keep_dtype the values keep their type instead of being stored as float32,
+    if they are all of the same type: ints, floats or numpy numbers
 
     Args:
         features (dict<str, object>): the dictionary where features are stored
+        keep_dtype (bool): if True the compact values keep their dtype
     """
+    __slots__ = ('__features', '__term_id_array', '__weight_array', '__keep_dtype')
 
-    def __init__(self, name: str, features: Dict[str, object] = None):
+    def __init__(self, name: str, features: Dict[str, object] = None, keep_dtype: bool = False):
         super().__init__(name)
         if features is None:
             features = {}
         self.__features: Dict[str, object] = features
+        self.__term_id_array: np.ndarray = None
+        self.__weight_array: np.ndarray = None
+        self.__keep_dtype: bool = keep_dtype
+
+    def __reduce__(self):
+        if self.__term_id_array is None:
+            weight_array = self.__get_weight_array()
+            if weight_array is None:
+                return FeaturesBagField, (self.get_name(), self.__features, self.__keep_dtype)
+            term_tuple = tuple(self.__features.keys())
+        else:
+            term_tuple, weight_array = tuple(get_term_list(self.__term_id_array)), self.__weight_array
+
+        return _rebuild_features_bag, (COMPACT_FORMAT_VERSION, self.get_name(), term_tuple, weight_array,
+                                       self.__keep_dtype)
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.__term_id_array = None
+        self.__weight_array = None
+        self.__keep_dtype = False
+
+    def __get_weight_array(self) -> np.ndarray:
+        """
+        Gets the values of the features as an array, float32 or, with keep_dtype,
+        of the type of the values
+
+        Returns:
+            weight_array (np.ndarray): None if the keys are not strings or the values are not numbers
+                (of the same type, with keep_dtype)
+        """
+        if not all(type(key) is str for key in self.__features.keys()):
+            return None
+
+        if not self.__keep_dtype:
+            if not all(isinstance(value, Real) and not isinstance(value, bool) for value in self.__features.values()):
+                return None
+            return np.fromiter(self.__features.values(), dtype=np.float32, count=len(self.__features))
+
+        value_type_set = set(type(value) for value in self.__features.values())
+        if len(value_type_set) != 1:
+            return None
+        value_type = value_type_set.pop()
+        if value_type is int:
+            dtype = np.int64
+        elif value_type is float:
+            dtype = np.float64
+        elif issubclass(value_type, (np.integer, np.floating)):
+            dtype = value_type
+        else:
+            return None
+
+        try:
+            return np.fromiter(self.__features.values(), dtype=dtype, count=len(self.__features))
+        except OverflowError:
+            # ints that don't fit in 64 bits
+            return None
 
     def __str__(self):
         representation_string = "Representation: " + self.get_name()
-        return "%s \n %s" % (representation_string, str(self.__features))
+        return "%s \n %s" % (representation_string, str(self.get_value()))
+
+    def compact(self) -> bool:
+        """
+        Stores the features as the array of the ids of the keys and the array of the values,
+        if the keys are strings and the values are numbers
+
+        Returns:
+            compact (bool): True if the features bag is compact
+        """
+        if self.__term_id_array is None:
+            weight_array = self.__get_weight_array()
+            if weight_array is None:
+                return False
+            self.set_compact_value(tuple(self.__features.keys()), weight_array)
+        return True
+
+    def set_compact_value(self, term_tuple: tuple, weight_array: np.ndarray):
+        """
+        Replaces the features with the given keys and values, the values keep the dtype of the array
+
+        Args:
+            term_tuple (tuple<str>): keys of the features
+            weight_array (np.ndarray): value of each key
+        """
+        self.__features = None
+        self.__term_id_array = get_term_id_array(term_tuple)
+        self.__weight_array = np.asarray(weight_array)
 
     def append_feature(self, feature_key: str, feature_value):
         """
@@ -55,6 +233,10 @@ class FeaturesBagField(FieldRepresentation):
             feature_key (str): key, can be a url or a keyword
             feature_value: the value of the field
         """
+        if self.__term_id_array is not None:
+            self.__features = self.get_value()
+            self.__term_id_array = None
+            self.__weight_array = None
         self.__features[feature_key] = feature_value
 
     def get_feature(self, feature_key):
@@ -67,7 +249,7 @@ class FeaturesBagField(FieldRepresentation):
         Returns:
             feature_value: the value of the field
         """
-        return self.__features[feature_key]
+        return self.get_value()[feature_key]
 
     def get_value(self) -> Dict[str, object]:
         """
@@ -76,16 +258,23 @@ class FeaturesBagField(FieldRepresentation):
         Returns:
             features (dict<str, object>): the features dict
         """
+        if self.__term_id_array is not None:
+            term_list = get_term_list(self.__term_id_array)
+            if self.__keep_dtype and self.__weight_array.dtype not in (np.float64, np.int64):
+                # the values keep their numpy type
+                return dict(zip(term_list, self.__weight_array))
+            return dict(zip(term_list, self.__weight_array.tolist()))
         return self.__features
 
     def __eq__(self, other):
-        return self.__features == other.__features
+        return self.get_value() == other.get_value()
 
 
 class EmbeddingField(FieldRepresentation):
     """
     Class for field representation using embeddings (dense numeric vectors)
     this representation is produced by the EmbeddingTechnique.
+    The embeddings are stored as float32, unless keep_dtype is set
 
     Examples:
         shape (4) = [x,x,x,x]
@@ -95,11 +284,25 @@ class EmbeddingField(FieldRepresentation):
     Args:
         embedding_array (np.ndarray): embeddings array,
             it can be of different shapes according to the granularity of the technique
+        keep_dtype (bool): if True the array keeps its dtype
     """
+    __slots__ = ('__embedding_array',)
+
     def __init__(self, name: str,
-                 embedding_array: np.ndarray):
+                 embedding_array: np.ndarray,
+                 keep_dtype: bool = False):
         super().__init__(name)
-        self.__embedding_array: np.ndarray = embedding_array
+        if keep_dtype:
+            self.__embedding_array: np.ndarray = np.asarray(embedding_array)
+        else:
+            self.__embedding_array: np.ndarray = np.asarray(embedding_array, dtype=np.float32)
+
+    def __reduce__(self):
+        return _rebuild_embedding, (COMPACT_FORMAT_VERSION, self.get_name(), self.__embedding_array)
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.__embedding_array = np.asarray(self.__embedding_array, dtype=np.float32)
 
     def __str__(self):
         representation_string = "Representation: " + self.get_name()
@@ -109,7 +312,21 @@ class EmbeddingField(FieldRepresentation):
         return self.__embedding_array
 
     def __eq__(self, other):
-        return self.__embedding_array == other.__embedding_array
+        return np.array_equal(self.__embedding_array, other.__embedding_array)
+
+
+def _rebuild_embedding(version: int, name: str, embedding_array: np.ndarray):
+    check_compact_format_version(version)
+    # the array is float32 unless keep_dtype was set
+    return EmbeddingField(name, embedding_array, keep_dtype=True)
+
+
+def _rebuild_content_field(version: int, field_name: str, timestamp: str,
+                           representation_dict: Dict[str, FieldRepresentation]):
+    check_compact_format_version(version)
+    return ContentField(intern_id(field_name), timestamp,
+                        {intern_id(representation_id): representation
+                         for representation_id, representation in representation_dict.items()})
 
 
 class ContentField:
@@ -123,6 +340,8 @@ class ContentField:
             instances.
     """
 
+    __slots__ = ('__timestamp', '__field_name', '__representation_dict')
+
     def __init__(self, field_name: str,
                  timestamp: str = None,
                  representation_dict: Dict[str, FieldRepresentation] = None):
@@ -132,6 +351,13 @@ class ContentField:
         self.__field_name: str = field_name
         self.__representation_dict: Dict[str, object] = representation_dict
 
+    def __reduce__(self):
+        return _rebuild_content_field, (COMPACT_FORMAT_VERSION, self.__field_name, self.__timestamp,
+                                        self.__representation_dict)
+
+    def __setstate__(self, state):
+        set_legacy_state(self, state)
+
     def __eq__(self, other) -> bool:
         """
         override of the method __eq__ of object class,
@@ -157,5 +383,11 @@ class ContentField:
     def get_representation(self, representation_id: str):
         return self.__representation_dict[representation_id]
 
+    def get_representation_list(self):
+        return self.__representation_dict
+
+    def get_timestamp(self):
+        return self.__timestamp
+
     def get_name(self) -> str:
         return self.__field_name
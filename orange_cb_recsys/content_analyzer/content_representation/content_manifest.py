@@ -0,0 +1,96 @@
+import csv
+import os
+import re
+from typing import Dict, List, Set
+
+from orange_cb_recsys.utils.const import logger
+
+MANIFEST_FILE_NAME = 'contents_manifest.csv'
+
+
+class ContentManifestWriter:
+    """
+    Class that writes, next to the contents produced by the content analyzer, the manifest of the contents:
+    for each content its id, the file name that the content has if it is serialized with Content.serialize,
+    and its offset, the position of the content in the order in which the contents were written,
+    that is also its row in the columnar store and in the exported matrices.
+    The manifest lets the contents be listed without listing the directory and
+    without computing the file names again
+
+    Args:
+        directory (str): directory of the contents
+    """
+
+    def __init__(self, directory: str):
+        self.__path = os.path.join(directory, MANIFEST_FILE_NAME)
+        self.__temp_path = self.__path + '.tmp'
+        self.__file = open(self.__temp_path, 'w', newline='', encoding='utf-8')
+        self.__writer = csv.writer(self.__file)
+        self.__writer.writerow(['content_id', 'file_name', 'offset'])
+        self.__offset = 0
+
+    def append(self, content_id: str):
+        """
+        Adds a content to the manifest, with the next offset
+        """
+        self.__writer.writerow([content_id, re.sub(r'[^\w\s]', '', content_id), self.__offset])
+        self.__offset += 1
+
+    def close(self):
+        logger.info("Writing content manifest %s", self.__path)
+        self.__file.close()
+        os.replace(self.__temp_path, self.__path)
+
+
+class ContentManifest:
+    """
+    Class that gives access to the manifest written by ContentManifestWriter
+
+    Args:
+        directory (str): directory of the contents
+    """
+
+    def __init__(self, directory: str):
+        self.__content_id_list: List[str] = []
+        self.__file_name_list: List[str] = []
+        self.__offset_dict: Dict[str, int] = {}
+        with open(os.path.join(directory, MANIFEST_FILE_NAME), newline='', encoding='utf-8') as manifest_file:
+            reader = csv.reader(manifest_file)
+            next(reader)
+            for content_id, file_name, offset in reader:
+                self.__content_id_list.append(content_id)
+                self.__file_name_list.append(file_name)
+                self.__offset_dict[content_id] = int(offset)
+
+        self.__file_name_dict: Dict[str, str] = dict(zip(self.__content_id_list, self.__file_name_list))
+        self.__file_name_set = set(self.__file_name_list)
+
+    def get_content_id_list(self) -> List[str]:
+        return self.__content_id_list
+
+    def get_file_name_list(self) -> List[str]:
+        return self.__file_name_list
+
+    def get_file_name(self, content_id: str) -> str:
+        """
+        Gets the file name of a content, also if the content is not in the manifest
+        """
+        file_name = self.__file_name_dict.get(content_id)
+        if file_name is None:
+            file_name = re.sub(r'[^\w\s]', '', content_id)
+        return file_name
+
+    def get_offset(self, content_id: str) -> int:
+        """
+        Gets the offset of a content
+
+        Returns:
+            offset (int): None if the content is not in the manifest
+        """
+        return self.__offset_dict.get(content_id)
+
+    def get_file_name_set(self) -> Set[str]:
+        return self.__file_name_set
+
+    def __len__(self):
+        return len(self.__content_id_list)
@@ -0,0 +1,274 @@
+import mmap
+import os
+import pickle
+import re
+import shutil
+import struct
+import tempfile
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.content_field import ContentField
+from orange_cb_recsys.utils.const import logger
+
+STORE_FILE_NAME = 'contents.store'
+# version of the layout of the store, it changes when the stores written before can't be read anymore
+STORE_FORMAT_VERSION = 1
+
+_MAGIC = b'CBRSCOL' + str(STORE_FORMAT_VERSION).encode()
+_TRAILER = struct.Struct('<Q8s')
+_META_COLUMN = '__meta__'
+
+
+def _column_key(field_name: str, representation_id: str) -> str:
+    return field_name + '/' + representation_id
+
+
+class ColumnarStoreWriter:
+    """
+    Class that writes the contents produced by the content analyzer in a single file,
+    instead of one lzma compressed pickle per content.
+    Every field representation is a column of the store: the representations of the same
+    column are stored contiguously, and an index at the end of the file maps every content id
+    to the offset of its representations, so that they can be read with random access.
+
+    The representations of each column are spooled in a temporary file while the contents
+    are appended, the final store is assembled by the close method.
+
+    Args:
+        output_directory (str): directory in which the store will be created
+    """
+
+    def __init__(self, output_directory: str):
+        self.__output_directory: str = output_directory
+        self.__content_id_list: List[str] = []
+        self.__spool_dict: Dict[str, object] = {}
+        self.__position_dict: Dict[str, List[Tuple[int, int]]] = {}
+
+    def get_path(self) -> str:
+        return os.path.join(self.__output_directory, STORE_FILE_NAME)
+
+    def __write_blob(self, column: str, row: int, value):
+        self.__write_raw_blob(column, row, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def __write_raw_blob(self, column: str, row: int, blob):
+        if column not in self.__spool_dict:
+            self.__spool_dict[column] = tempfile.TemporaryFile(dir=self.__output_directory)
+            self.__position_dict[column] = []
+
+        positions = self.__position_dict[column]
+        # rows of contents that miss this column
+        positions.extend([(-1, 0)] * (row - len(positions)))
+
+        spool = self.__spool_dict[column]
+        positions.append((spool.tell(), len(blob)))
+        spool.write(blob)
+
+    def append(self, content: Content):
+        """
+        Add a content to the store
+
+        Args:
+            content (Content): content to add
+        """
+        logger.info("Storing content %s", content.get_content_id())
+        row = len(self.__content_id_list)
+        self.__content_id_list.append(content.get_content_id())
+
+        fields = {}
+        for field_name, field in content.get_field_list().items():
+            representation_dict = field.get_representation_list()
+            fields[field_name] = (field.get_timestamp(), list(representation_dict.keys()))
+            for representation_id, representation in representation_dict.items():
+                self.__write_blob(_column_key(field_name, representation_id), row, representation)
+
+        meta = {
+            'lod_properties': content.get_lod_properties(),
+            'index_document_id': content.get_index_document_id(),
+            'fields': fields,
+        }
+        self.__write_blob(_META_COLUMN, row, meta)
+
+    def append_copy(self, store: 'ColumnarStoreReader', content_id: str, clear_index_document_id: bool = False):
+        """
+        Add a content of another store, copying its representations as they are stored,
+        without unpickling them
+
+        Args:
+            store (ColumnarStoreReader): store that contains the content
+            content_id (str): id of the content
+            clear_index_document_id (bool): if True the id of the document of the content
+                in the search index is removed, only the metadata of the content is unpickled for it
+
+        Returns:
+            copied (bool): False if the content is not in the store
+        """
+        blob_dict = store.get_raw_blob_dict(content_id)
+        if blob_dict is None:
+            return False
+
+        logger.info("Copying content %s", content_id)
+        row = len(self.__content_id_list)
+        self.__content_id_list.append(content_id)
+        for column, blob in blob_dict.items():
+            if column == _META_COLUMN and clear_index_document_id:
+                meta = pickle.loads(blob)
+                meta['index_document_id'] = None
+                self.__write_blob(column, row, meta)
+            else:
+                self.__write_raw_blob(column, row, blob)
+        return True
+
+    def close(self):
+        """
+        Assemble the spooled columns and the index in the store file
+        """
+        rows = len(self.__content_id_list)
+        columns = {}
+        # the store is written in a temporary file and then moved, since the previous
+        # version of the store may still be memory mapped by a reader
+        temp_path = self.get_path() + '.tmp'
+        with open(temp_path, 'wb') as store_file:
+            store_file.write(_MAGIC)
+            for column, spool in self.__spool_dict.items():
+                base = store_file.tell()
+                positions = self.__position_dict[column]
+                positions.extend([(-1, 0)] * (rows - len(positions)))
+                positions = np.array(positions, dtype=np.int64).reshape(-1, 2)
+                offsets = np.where(positions[:, 0] >= 0, positions[:, 0] + base, -1)
+                columns[column] = (offsets, positions[:, 1])
+
+                spool.seek(0)
+                shutil.copyfileobj(spool, store_file)
+                spool.close()
+
+            index_offset = store_file.tell()
+            pickle.dump({'content_id_list': self.__content_id_list, 'columns': columns},
+                        store_file, protocol=pickle.HIGHEST_PROTOCOL)
+            store_file.write(_TRAILER.pack(index_offset, _MAGIC))
+        os.replace(temp_path, self.get_path())
+
+        self.__spool_dict = {}
+        self.__position_dict = {}
+
+
+class ColumnarStoreReader:
+    """
+    Class that gives random access to the contents of a store written by ColumnarStoreWriter.
+    Only the index is loaded when the store is opened, each representation is unpickled
+    only when it is requested.
+    Contents can be requested by their id or by the file name that the content
+    would have if it was serialized with Content.serialize
+
+    Args:
+        directory (str): directory that contains the store
+    """
+
+    def __init__(self, directory: str):
+        self.__path = os.path.join(directory, STORE_FILE_NAME)
+        with open(self.__path, 'rb') as store_file:
+            self.__buffer = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        index_offset, magic = _TRAILER.unpack(self.__buffer[-_TRAILER.size:])
+        if magic != _MAGIC or self.__buffer[:len(_MAGIC)] != _MAGIC:
+            raise ValueError("%s is not a valid content store" % self.__path)
+
+        index = pickle.loads(self.__buffer[index_offset:len(self.__buffer) - _TRAILER.size])
+        self.__content_id_list: List[str] = index['content_id_list']
+        self.__columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = index['columns']
+
+        self.__row_dict: Dict[str, int] = {}
+        for row, content_id in enumerate(self.__content_id_list):
+            self.__row_dict.setdefault(re.sub(r'[^\w\s]', '', content_id), row)
+        for row, content_id in enumerate(self.__content_id_list):
+            self.__row_dict[content_id] = row
+
+    def get_path(self) -> str:
+        return self.__path
+
+    def get_content_id_list(self) -> List[str]:
+        return self.__content_id_list
+
+    def __contains__(self, content_id: str):
+        return content_id in self.__row_dict
+
+    def __len__(self):
+        return len(self.__content_id_list)
+
+    def __read_blob(self, column: str, row: int):
+        offsets, lengths = self.__columns[column]
+        offset = int(offsets[row])
+        if offset < 0:
+            return None
+        return pickle.loads(self.__buffer[offset:offset + int(lengths[row])])
+
+    def get_raw_blob_dict(self, content_id: str):
+        """
+        Read the pickled representations and metadata of a content, without unpickling them
+
+        Args:
+            content_id (str): id of the content
+
+        Returns:
+            blob_dict (dict<str, bytes>): the pickled value of each column of the content,
+                None if the content is not in the store
+        """
+        if content_id not in self.__row_dict:
+            return None
+        row = self.__row_dict[content_id]
+
+        blob_dict = {}
+        for column, (offsets, lengths) in self.__columns.items():
+            offset = int(offsets[row])
+            if offset >= 0:
+                blob_dict[column] = self.__buffer[offset:offset + int(lengths[row])]
+        return blob_dict
+
+    def get_representation(self, content_id: str, field_name: str, representation_id: str):
+        """
+        Read a single field representation of a content, without loading the whole content
+
+        Args:
+            content_id (str): id of the content
+            field_name (str): name of the field
+            representation_id (str): id of the representation
+
+        Returns:
+            representation (FieldRepresentation): None if the content or the
+                representation are not in the store
+        """
+        column = _column_key(field_name, representation_id)
+        if content_id not in self.__row_dict or column not in self.__columns:
+            return None
+        return self.__read_blob(column, self.__row_dict[content_id])
+
+    def get_content(self, content_id: str):
+        """
+        Rebuild a content from its stored representations
+
+        Args:
+            content_id (str): id of the content
+
+        Returns:
+            content (Content): None if the content is not in the store
+        """
+        if content_id not in self.__row_dict:
+            return None
+        row = self.__row_dict[content_id]
+        meta = self.__read_blob(_META_COLUMN, row)
+
+        content = Content(self.__content_id_list[row], lod_properties=meta['lod_properties'])
+        content.set_index_document_id(meta['index_document_id'])
+        for field_name, (timestamp, representation_id_list) in meta['fields'].items():
+            field = ContentField(field_name, timestamp)
+            for representation_id in representation_id_list:
+                field.append(representation_id,
+                             self.__read_blob(_column_key(field_name, representation_id), row))
+            content.append(field_name, field)
+
+        return content
+
+    def close(self):
+        self.__buffer.close()
@@ -0,0 +1,92 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List
+
+from orange_cb_recsys.utils.const import logger
+
+DOCUMENT_ID_MAP_FILE_NAME = 'search_index_ids.db'
+
+# maximum number of parameters of a sqlite query
+_QUERY_CHUNK_SIZE = 500
+
+
+def write_document_id_map(directory: str, content_id_list: Iterable[str]):
+    """
+    Saves, next to the search index, the map from the id of each content to the id of its
+    document in the index, so the documents can be found without loading the contents.
+    Contents can be looked up also by the file name that they would have if they were
+    serialized with Content.serialize, content ids win over file names
+
+    Args:
+        directory (str): directory of the contents
+        content_id_list (Iterable<str>): content id of each document of the index, in document order.
+            If a content id is repeated the last document is kept
+    """
+    path = os.path.join(directory, DOCUMENT_ID_MAP_FILE_NAME)
+    temp_path = path + '.tmp'
+    if os.path.isfile(temp_path):
+        os.remove(temp_path)
+    logger.info("Writing document id map %s", path)
+
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.execute("CREATE TABLE document_id (content_id TEXT PRIMARY KEY, document_id INTEGER)")
+        row_list = []
+        file_name_row_list = []
+        for document_id, content_id in enumerate(content_id_list):
+            if content_id is None:
+                continue
+            row_list.append((content_id, document_id))
+            file_name = re.sub(r'[^\w\s]', '', content_id)
+            if file_name != content_id:
+                file_name_row_list.append((file_name, document_id))
+        connection.executemany("INSERT OR REPLACE INTO document_id VALUES (?, ?)", row_list)
+        # content ids win over file names, and the first content with a file name wins over the others
+        connection.executemany("INSERT OR IGNORE INTO document_id VALUES (?, ?)", file_name_row_list)
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(temp_path, path)
+
+
+class DocumentIdMap:
+    """
+    Class that gives access to the map written by write_document_id_map.
+    The map can be shared by more threads
+
+    Args:
+        directory (str): directory of the contents
+    """
+
+    def __init__(self, directory: str):
+        path = os.path.join(directory, DOCUMENT_ID_MAP_FILE_NAME)
+        self.__connection = sqlite3.connect('file:' + path + '?mode=ro', uri=True, check_same_thread=False)
+        self.__lock = threading.Lock()
+
+    def get_document_id_dict(self, content_id_list: List[str]) -> Dict[str, int]:
+        """
+        Finds the documents of the given contents, the contents that are not in the index are ignored
+
+        Args:
+            content_id_list (List<str>): ids of the contents
+
+        Returns:
+            document_id_dict (dict<str, int>): document id of each content found
+        """
+        content_id_list = [str(content_id) for content_id in content_id_list]
+        document_id_dict = {}
+        with self.__lock:
+            for start in range(0, len(content_id_list), _QUERY_CHUNK_SIZE):
+                chunk = content_id_list[start:start + _QUERY_CHUNK_SIZE]
+                cursor = self.__connection.execute(
+                    "SELECT content_id, document_id FROM document_id WHERE content_id IN (%s)"
+                    % ', '.join('?' * len(chunk)), chunk)
+                document_id_dict.update(cursor.fetchall())
+
+        return document_id_dict
+
+    def close(self):
+        self.__connection.close()
@@ -0,0 +1,202 @@
+import os
+from typing import Tuple
+
+import numpy as np
+from sklearn.preprocessing import normalize
+
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import \
+    FeaturesBagMatrix, get_representation_path
+from orange_cb_recsys.utils.const import logger
+
+INVERTED_INDEX_SUFFIX = '_inverted.npz'
+
+
+def build_inverted_index(directory: str, field_name: str, representation_id: str):
+    """
+    Builds an inverted index on the features bag matrix exported for a representation, and saves
+    it next to the matrix. The index keeps, for each feature, the postings of the contents that have it
+    with the weight of the feature in the normalized row of the content, and the maximum weight
+    of the feature, used to prune the contents that can't reach the top k
+    when all the weights are not negative
+
+    Args:
+        directory (str): directory of the contents
+        field_name (str): name of the exported field
+        representation_id (str): id of the exported representation
+    """
+    index_path = get_representation_path(directory, field_name, representation_id, INVERTED_INDEX_SUFFIX)
+    logger.info("Building inverted index %s", index_path)
+
+    # the columns of the normalized matrix are the postings lists, sorted by row
+    matrix = normalize(FeaturesBagMatrix(directory, field_name, representation_id).get_matrix()).tocsc()
+    matrix.sort_indices()
+    max_weights = np.asarray(matrix.max(axis=0).toarray(), dtype=np.float32).ravel()
+
+    # np.savez adds the .npz extension to the paths that don't have it
+    temp_path = index_path[:-len('.npz')] + '.tmp.npz'
+    np.savez(temp_path, indptr=matrix.indptr.astype(np.int64), indices=matrix.indices.astype(np.int32),
+             data=matrix.data.astype(np.float32), max_weights=max_weights, row_count=matrix.shape[0],
+             non_negative=len(matrix.data) == 0 or matrix.data.min() >= 0)
+    os.replace(temp_path, index_path)
+
+
+class InvertedIndex:
+    """
+    Class that gives access to an index built by build_inverted_index, that finds the contents
+    with the highest cosine similarity to a query scoring only the contents that share features with it
+
+    Args:
+        directory (str): directory of the contents
+        field_name (str): name of the exported field
+        representation_id (str): id of the exported representation
+    """
+
+    def __init__(self, directory: str, field_name: str, representation_id: str):
+        with np.load(get_representation_path(directory, field_name, representation_id, INVERTED_INDEX_SUFFIX)) \
+                as index_file:
+            self.__indptr: np.ndarray = index_file['indptr']
+            self.__indices: np.ndarray = index_file['indices']
+            self.__data: np.ndarray = index_file['data']
+            self.__max_weights: np.ndarray = index_file['max_weights']
+            self.__row_count: int = int(index_file['row_count'])
+            self.__non_negative: bool = bool(index_file['non_negative'])
+        self.__read_posting_count: int = 0
+
+    def get_row_count(self) -> int:
+        """
+        Number of rows of the matrix on which the index was built
+        """
+        return self.__row_count
+
+    def get_read_posting_count(self) -> int:
+        """
+        Number of postings read by the last call to get_top_k, the postings looked up
+        for the candidate rows count once each. It shows how much of the index the pruning skipped
+        """
+        return self.__read_posting_count
+
+    def __read_postings(self, columns: np.ndarray, query_weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reads the postings lists of the given columns at once
+
+        Returns:
+            rows (np.ndarray): row of each posting
+            contributions (np.ndarray): weight of each posting multiplied by the weight of its column in the query
+        """
+        starts = self.__indptr[columns]
+        lengths = self.__indptr[columns + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        self.__read_posting_count += len(positions)
+        return self.__indices[positions], self.__data[positions] * np.repeat(query_weights, lengths)
+
+    def __look_up_postings(self, column: int, query_weight: float, rows: np.ndarray) -> np.ndarray:
+        """
+        Finds the postings of the given rows in the postings list of a column, with a binary search
+        since the postings are sorted by row, without reading the rest of the list
+
+        Returns:
+            contributions (np.ndarray): contribution of the column to the score of each row,
+                0 for the rows that don't have the feature
+        """
+        start, end = self.__indptr[column], self.__indptr[column + 1]
+        postings = self.__indices[start:end]
+        positions = np.searchsorted(postings, rows)
+        found = positions < len(postings)
+        found[found] = postings[positions[found]] == rows[found]
+        self.__read_posting_count += len(rows)
+
+        contributions = np.zeros(len(rows))
+        contributions[found] = self.__data[start + positions[found]] * query_weight
+        return contributions
+
+    @staticmethod
+    def __accumulate(rows: np.ndarray, scores: np.ndarray, posting_rows: np.ndarray,
+                     contributions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Adds the contributions of the postings to the partial scores of the candidate rows,
+        the rows of the postings that are not candidates become candidates
+
+        Returns:
+            rows (np.ndarray): sorted candidate rows
+            scores (np.ndarray): partial score of each candidate row
+        """
+        rows, inverse = np.unique(np.concatenate([rows, posting_rows]), return_inverse=True)
+        return rows, np.bincount(inverse, weights=np.concatenate([scores, contributions]), minlength=len(rows))
+
+    @staticmethod
+    def __get_threshold(scores: np.ndarray, k: int) -> float:
+        """
+        k-th highest partial score, -inf if there are less than k candidates
+        """
+        if len(scores) < k:
+            return -np.inf
+        return np.partition(scores, len(scores) - k)[len(scores) - k]
+
+    def get_top_k(self, query: np.ndarray, k: int, excluded_rows: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k rows with the highest cosine similarity to the query, using max-score pruning:
+        the postings lists are read from the one whose features can give the highest score,
+        in blocks of lists that double at each step, and the partial scores are accumulated
+        only for the candidate rows found in the postings.
+        When the highest score that the unread lists can give is lower than the k-th partial score,
+        no new row can enter the top k: the rows that can't reach the k-th score are dropped,
+        and the candidates left are looked up in the unread lists with a binary search,
+        without reading the whole lists. Before each lookup the candidates that can't reach
+        the k-th score anymore are dropped, so the lookups get cheaper as the scores grow.
+
+        The bounds hold only if the weights of the query and of the index are not negative,
+        otherwise all the rows that share features with the query are scored.
+        Only the rows that share features with the query are returned, so there may be less than k rows
+
+        Args:
+            query (np.ndarray): one dimensional vector, with one element for each column of the matrix
+            k (int): number of rows
+            excluded_rows (np.ndarray): rows that must not be returned
+
+        Returns:
+            rows (np.ndarray): the best rows, sorted by similarity
+            similarities (np.ndarray): similarity of each row
+        """
+        self.__read_posting_count = 0
+        query = np.asarray(query, dtype=np.float64).ravel()
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        columns = np.flatnonzero(query)
+        query_weights = query[columns] / query_norm
+        upper_bounds = query_weights * self.__max_weights[columns]
+        order = np.argsort(-upper_bounds, kind='stable')
+        columns, query_weights = columns[order], query_weights[order]
+        # highest score that the lists after the i-th can add
+        remaining_bounds = np.concatenate([np.cumsum(upper_bounds[order][::-1])[::-1][1:], [0]])
+        can_prune = self.__non_negative and np.all(query_weights > 0)
+        if excluded_rows is not None:
+            excluded_rows = np.unique(np.asarray(excluded_rows, dtype=np.int64))
+
+        # candidate rows, sorted, and their partial scores
+        rows = np.empty(0, dtype=np.int64)
+        scores = np.empty(0)
+        block_start, block_end = 0, 1
+        while block_start < len(columns):
+            posting_rows, contributions = self.__read_postings(columns[block_start:block_end],
+                                                               query_weights[block_start:block_end])
+            if excluded_rows is not None:
+                kept = ~np.isin(posting_rows, excluded_rows)
+                posting_rows, contributions = posting_rows[kept], contributions[kept]
+            rows, scores = self.__accumulate(rows, scores, posting_rows, contributions)
+            remaining_bound = remaining_bounds[block_end - 1]
+            block_start, block_end = block_end, min(len(columns), 2 * block_end + 1)
+
+            if can_prune and block_start < len(columns) and remaining_bound < self.__get_threshold(scores, k):
+                break
+
+        # the unread lists can only change the scores of the candidates
+        for position in range(block_start, len(columns)):
+            threshold = self.__get_threshold(scores, k)
+            candidates = scores + remaining_bounds[position - 1] >= threshold
+            rows, scores = rows[candidates], scores[candidates]
+            scores = scores + self.__look_up_postings(columns[position], query_weights[position], rows)
+
+        top_index = np.argsort(-scores, kind='stable')[:k]
+        return rows[top_index].astype(np.int64), scores[top_index]
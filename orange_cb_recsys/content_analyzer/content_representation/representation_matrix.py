@@ -0,0 +1,402 @@
+import json
+import os
+import re
+import tempfile
+from array import array
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+from orange_cb_recsys.utils.const import logger
+
+REPRESENTATIONS_DIRECTORY = 'representations'
+
+
+def get_representation_path(directory: str, field_name: str, representation_id: str, suffix: str) -> str:
+    """
+    Path of a file in which a field representation is exported
+
+    Args:
+        directory (str): directory of the contents
+        field_name (str): name of the exported field
+        representation_id (str): id of the exported representation
+        suffix (str): suffix that identifies the file, for example its extension
+    """
+    file_name = re.sub(r'[^\w\s]', '', field_name) + '_' + representation_id + suffix
+    return os.path.join(directory, REPRESENTATIONS_DIRECTORY, file_name)
+
+
+def _get_row_dict(content_id_list: List[str]) -> Dict[str, int]:
+    """
+    Maps each content id, and the file name that the content would have if it was serialized
+    with Content.serialize, to the row of the content. Content ids win over file names
+    """
+    row_dict = {}
+    for row, content_id in enumerate(content_id_list):
+        row_dict.setdefault(re.sub(r'[^\w\s]', '', content_id), row)
+    for row, content_id in enumerate(content_id_list):
+        row_dict[content_id] = row
+    return row_dict
+
+
+def _write_json_temp(path: str, value) -> str:
+    """
+    Writes value in a temporary json file next to path, that is moved to path once the matrix
+    it describes is in place, so a sidecar file is never partial
+
+    Returns:
+        temp_path (str): path of the temporary file
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as json_file:
+        json.dump(value, json_file)
+    return temp_path
+
+
+class EmbeddingMatrixWriter:
+    """
+    Class that exports a document embedding representation of a field as a single
+    float32 matrix, saved in .npy format, with one row for each content.
+    The ids of the contents, in row order, are saved in a json file next to the matrix.
+
+    The rows are spooled in a temporary file while they are appended, so the memory used
+    doesn't depend on the number of contents
+
+    Args:
+        output_directory (str): directory of the contents, the matrix will be saved in
+            its representations sub directory
+        field_name (str): name of the exported field
+        representation_id (str): id of the exported representation
+    """
+
+    def __init__(self, output_directory: str, field_name: str, representation_id: str):
+        self.__output_directory: str = output_directory
+        self.__field_name: str = field_name
+        self.__representation_id: str = representation_id
+        self.__content_id_list: List[str] = []
+        self.__dimension: int = None
+        self.__spool = None
+
+    def get_field_name(self) -> str:
+        return self.__field_name
+
+    def get_representation_id(self) -> str:
+        return self.__representation_id
+
+    def append(self, content_id: str, embedding_array: np.ndarray):
+        """
+        Add the row of a content to the matrix
+
+        Args:
+            content_id (str): id of the content
+            embedding_array (np.ndarray): one dimensional embedding of the content
+        """
+        row = np.asarray(embedding_array, dtype=np.float32)
+        if row.ndim != 1:
+            raise ValueError("Only document embeddings can be exported in a matrix")
+        if self.__dimension is None:
+            self.__dimension = row.shape[0]
+            self.__spool = tempfile.TemporaryFile(dir=self.__output_directory)
+        elif row.shape[0] != self.__dimension:
+            raise ValueError("All the embeddings of a representation must have the same size")
+
+        self.__spool.write(row.tobytes())
+        self.__content_id_list.append(content_id)
+
+    def append_rows(self, matrix: 'EmbeddingMatrix', content_id_list: List[str]):
+        """
+        Add the rows of the given contents taken from a matrix exported before,
+        the ids that are not in the matrix are ignored
+
+        Args:
+            matrix (EmbeddingMatrix): the exported matrix
+            content_id_list (List<str>): ids of the contents
+        """
+        for content_id in content_id_list:
+            if content_id in matrix:
+                self.append(content_id, matrix.get_matrix()[matrix.get_row_index(content_id)])
+
+    def close(self):
+        """
+        Write the matrix and the ids of the contents
+        """
+        if self.__spool is None:
+            return
+
+        os.makedirs(os.path.join(self.__output_directory, REPRESENTATIONS_DIRECTORY), exist_ok=True)
+        matrix_path = get_representation_path(
+            self.__output_directory, self.__field_name, self.__representation_id, '.npy')
+        logger.info("Exporting embedding matrix %s", matrix_path)
+
+        # the matrix is written in a temporary file and then moved, since the previous
+        # version of the matrix may still be memory mapped by a reader
+        temp_path = matrix_path + '.tmp'
+        matrix = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.float32,
+                                           shape=(len(self.__content_id_list), self.__dimension))
+        self.__spool.seek(0)
+        rows_per_chunk = max(1, (1 << 24) // (4 * self.__dimension))
+        for start in range(0, len(self.__content_id_list), rows_per_chunk):
+            chunk = np.frombuffer(self.__spool.read(rows_per_chunk * 4 * self.__dimension), dtype=np.float32)
+            chunk = chunk.reshape(-1, self.__dimension)
+            matrix[start:start + chunk.shape[0]] = chunk
+        matrix.flush()
+        del matrix
+        self.__spool.close()
+        self.__spool = None
+
+        # the ids are moved after the matrix, the readers load the matrix again when the ids change
+        ids_path = get_representation_path(
+            self.__output_directory, self.__field_name, self.__representation_id, '_ids.json')
+        temp_ids_path = _write_json_temp(ids_path, self.__content_id_list)
+        os.replace(temp_path, matrix_path)
+        os.replace(temp_ids_path, ids_path)
+
+
+class EmbeddingMatrix:
+    """
+    Class that gives access to an embedding matrix exported by EmbeddingMatrixWriter.
+    The matrix is memory mapped, so it is never entirely loaded and its pages can be
+    shared between processes.
+    Rows can be found by content id or by the file name that the content
+    would have if it was serialized with Content.serialize
+
+    Args:
+        directory (str): directory of the contents
+        field_name (str): name of the exported field
+        representation_id (str): id of the exported representation
+    """
+
+    def __init__(self, directory: str, field_name: str, representation_id: str):
+        self.__matrix: np.ndarray = np.load(
+            get_representation_path(directory, field_name, representation_id, '.npy'), mmap_mode='r')
+        with open(get_representation_path(directory, field_name, representation_id, '_ids.json')) as ids_file:
+            self.__content_id_list: List[str] = json.load(ids_file)
+        self.__row_dict: Dict[str, int] = _get_row_dict(self.__content_id_list)
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, content_id_list: List[str]) -> 'EmbeddingMatrix':
+        """
+        Creates an embedding matrix kept in memory, instead of reading an exported one
+
+        Args:
+            matrix (np.ndarray): matrix with one row for each content
+            content_id_list (List<str>): ids of the contents, in row order
+        """
+        embedding_matrix = cls.__new__(cls)
+        embedding_matrix.__matrix = matrix
+        embedding_matrix.__content_id_list = content_id_list
+        embedding_matrix.__row_dict = _get_row_dict(content_id_list)
+        return embedding_matrix
+
+    def get_matrix(self) -> np.ndarray:
+        return self.__matrix
+
+    def get_content_id_list(self) -> List[str]:
+        return self.__content_id_list
+
+    def __contains__(self, content_id: str):
+        return content_id in self.__row_dict
+
+    def get_row_index(self, content_id: str) -> int:
+        return self.__row_dict[content_id]
+
+    def get_rows(self, content_id_list: List[str]) -> np.ndarray:
+        """
+        Get the embeddings of the given contents, the ids that are not
+        in the matrix are ignored
+
+        Args:
+            content_id_list (List<str>): ids of the contents
+
+        Returns:
+            rows (np.ndarray): matrix with one row for each content found
+        """
+        row_index_list = [self.__row_dict[content_id] for content_id in content_id_list
+                          if content_id in self.__row_dict]
+        return self.__matrix[row_index_list]
+
+
+class FeaturesBagMatrixWriter:
+    """
+    Class that exports a features bag representation of a field as a single
+    scipy CSR matrix, saved in .npz format, with one row for each content.
+    The vocabulary of the representation, that maps every feature to its column,
+    and the ids of the contents, in row order, are saved in json files next to the matrix.
+
+    Only numeric features can be exported, if a content has a feature whose value is
+    not a number the export of the representation is abandoned
+
+    Args:
+        output_directory (str): directory of the contents, the matrix will be saved in
+            its representations sub directory
+        field_name (str): name of the exported field
+        representation_id (str): id of the exported representation
+    """
+
+    def __init__(self, output_directory: str, field_name: str, representation_id: str):
+        self.__output_directory: str = output_directory
+        self.__field_name: str = field_name
+        self.__representation_id: str = representation_id
+        self.__content_id_list: List[str] = []
+        self.__vocabulary: Dict[str, int] = {}
+        self.__indptr = array('q', [0])
+        self.__indices = array('i')
+        self.__data = array('f')
+        self.__valid: bool = True
+
+    def get_field_name(self) -> str:
+        return self.__field_name
+
+    def get_representation_id(self) -> str:
+        return self.__representation_id
+
+    def append(self, content_id: str, features: Dict[str, object]):
+        """
+        Add the row of a content to the matrix
+
+        Args:
+            content_id (str): id of the content
+            features (dict<str, object>): features bag of the content
+        """
+        if not self.__valid:
+            return
+
+        try:
+            values = [float(value) for value in features.values()]
+        except (TypeError, ValueError):
+            logger.warning("Representation %s of field %s has non numeric features, it won't be exported",
+                           self.__representation_id, self.__field_name)
+            self.__valid = False
+            return
+
+        for feature in features.keys():
+            self.__indices.append(self.__vocabulary.setdefault(feature, len(self.__vocabulary)))
+        self.__data.extend(values)
+        self.__indptr.append(len(self.__indices))
+        self.__content_id_list.append(content_id)
+
+    def append_rows(self, matrix: 'FeaturesBagMatrix', content_id_list: List[str]):
+        """
+        Add the rows of the given contents taken from a matrix exported before,
+        the ids that are not in the matrix are ignored
+
+        Args:
+            matrix (FeaturesBagMatrix): the exported matrix
+            content_id_list (List<str>): ids of the contents
+        """
+        feature_list = [None] * len(matrix.get_vocabulary())
+        for feature, column in matrix.get_vocabulary().items():
+            feature_list[column] = feature
+
+        csr_matrix = matrix.get_matrix()
+        for content_id in content_id_list:
+            if content_id in matrix:
+                row = matrix.get_row_index(content_id)
+                start, end = csr_matrix.indptr[row], csr_matrix.indptr[row + 1]
+                self.append(content_id, {feature_list[column]: value for column, value in
+                                         zip(csr_matrix.indices[start:end], csr_matrix.data[start:end])})
+
+    def close(self):
+        """
+        Write the matrix, the vocabulary and the ids of the contents
+        """
+        if not self.__valid or len(self.__content_id_list) == 0:
+            return
+
+        os.makedirs(os.path.join(self.__output_directory, REPRESENTATIONS_DIRECTORY), exist_ok=True)
+        matrix_path = get_representation_path(
+            self.__output_directory, self.__field_name, self.__representation_id, '.npz')
+        logger.info("Exporting features bag matrix %s", matrix_path)
+
+        matrix = sparse.csr_matrix(
+            (np.frombuffer(self.__data, dtype=np.float32),
+             np.frombuffer(self.__indices, dtype=np.int32),
+             np.frombuffer(self.__indptr, dtype=np.int64)),
+            shape=(len(self.__content_id_list), len(self.__vocabulary)))
+        matrix.sum_duplicates()
+        temp_path = matrix_path[:-len('.npz')] + '.tmp.npz'
+        sparse.save_npz(temp_path, matrix)
+
+        # the vocabulary and the ids are moved after the matrix, the readers load the matrix again
+        # when they change
+        vocabulary_path = get_representation_path(
+            self.__output_directory, self.__field_name, self.__representation_id, '_vocabulary.json')
+        temp_vocabulary_path = _write_json_temp(vocabulary_path, self.__vocabulary)
+        ids_path = get_representation_path(
+            self.__output_directory, self.__field_name, self.__representation_id, '_ids.json')
+        temp_ids_path = _write_json_temp(ids_path, self.__content_id_list)
+        os.replace(temp_path, matrix_path)
+        os.replace(temp_vocabulary_path, vocabulary_path)
+        os.replace(temp_ids_path, ids_path)
+
+
+class FeaturesBagMatrix:
+    """
+    Class that gives access to a features bag matrix exported by FeaturesBagMatrixWriter.
+    Rows can be found by content id or by the file name that the content
+    would have if it was serialized with Content.serialize
+
+    Args:
+        directory (str): directory of the contents
+        field_name (str): name of the exported field
+        representation_id (str): id of the exported representation
+    """
+
+    def __init__(self, directory: str, field_name: str, representation_id: str):
+        self.__matrix: sparse.csr_matrix = sparse.load_npz(
+            get_representation_path(directory, field_name, representation_id, '.npz')).tocsr()
+        with open(get_representation_path(directory, field_name, representation_id, '_vocabulary.json')) \
+                as vocabulary_file:
+            self.__vocabulary: Dict[str, int] = json.load(vocabulary_file)
+        with open(get_representation_path(directory, field_name, representation_id, '_ids.json')) as ids_file:
+            self.__content_id_list: List[str] = json.load(ids_file)
+        self.__row_dict: Dict[str, int] = _get_row_dict(self.__content_id_list)
+
+    @classmethod
+    def from_matrix(cls, matrix: sparse.csr_matrix, vocabulary: Dict[str, int],
+                    content_id_list: List[str]) -> 'FeaturesBagMatrix':
+        """
+        Creates a features bag matrix kept in memory, instead of reading an exported one
+
+        Args:
+            matrix (sparse.csr_matrix): matrix with one row for each content
+            vocabulary (dict<str, int>): column of each feature
+            content_id_list (List<str>): ids of the contents, in row order
+        """
+        features_bag_matrix = cls.__new__(cls)
+        features_bag_matrix.__matrix = matrix
+        features_bag_matrix.__vocabulary = vocabulary
+        features_bag_matrix.__content_id_list = content_id_list
+        features_bag_matrix.__row_dict = _get_row_dict(content_id_list)
+        return features_bag_matrix
+
+    def get_matrix(self) -> sparse.csr_matrix:
+        return self.__matrix
+
+    def get_vocabulary(self) -> Dict[str, int]:
+        return self.__vocabulary
+
+    def get_content_id_list(self) -> List[str]:
+        return self.__content_id_list
+
+    def __contains__(self, content_id: str):
+        return content_id in self.__row_dict
+
+    def get_row_index(self, content_id: str) -> int:
+        return self.__row_dict[content_id]
+
+    def get_rows(self, content_id_list: List[str]) -> sparse.csr_matrix:
+        """
+        Get the features of the given contents, the ids that are not
+        in the matrix are ignored
+
+        Args:
+            content_id_list (List<str>): ids of the contents
+
+        Returns:
+            rows (sparse.csr_matrix): matrix with one row for each content found
+        """
+        row_index_list = [self.__row_dict[content_id] for content_id in content_id_list
+                          if content_id in self.__row_dict]
+        return self.__matrix[row_index_list]
@@ -262,6 +262,9 @@ class EmbeddingTechnique(SingleContentTechnique):
 
         self.__granularity: str = granularity.lower()
 
+    def get_granularity(self) -> str:
+        return self.__granularity
+
     def produce_content(self, field_representation_name: str, field_data) -> EmbeddingField:
         """
         Method that builds the semantic content starting from the embeddings contained in
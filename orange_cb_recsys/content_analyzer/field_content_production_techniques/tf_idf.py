@@ -1,3 +1,6 @@
+from array import array
+from typing import Dict, List
+
 from sklearn.feature_extraction.text import TfidfVectorizer
 
 from orange_cb_recsys.content_analyzer.content_representation.content_field import FeaturesBagField
@@ -80,11 +83,24 @@ class SkLearnTfIdf(TfIdfTechnique):
 class LuceneTfIdf(TfIdfTechnique):
     """
     Class that produces a Bag of words with tf-idf metric using Lucene
+
+    Args:
+        bulk (bool): if True the tf-idf of every content is extracted from the index in a single pass
+            when the index is created, and kept in a sparse structure until the contents are produced;
+            if False the index is searched for each content
     """
 
-    def __init__(self):
+    def __init__(self, bulk: bool = True):
         super().__init__()
         self.__index = IndexInterface('./frequency-index')
+        if type(bulk) is str:
+            bulk = bulk.lower() == 'true'
+        self.__bulk: bool = bulk
+        self.__row_dict: Dict[str, int] = {}
+        self.__feature_list: List[str] = []
+        self.__indptr = array('q', [0])
+        self.__indices = array('i')
+        self.__data = array('d')
 
     def __str__(self):
         return "LuceneTfIdf"
@@ -94,9 +110,34 @@ class LuceneTfIdf(TfIdfTechnique):
 
     def produce_content(self, field_representation_name: str, content_id: str,
                         field_name: str) -> FeaturesBagField:
+        if not self.__bulk:
+            return FeaturesBagField(
+                field_representation_name, self.__index.get_tf_idf(field_name, content_id))
 
+        row = self.__row_dict[content_id]
+        start, end = self.__indptr[row], self.__indptr[row + 1]
         return FeaturesBagField(
-            field_representation_name, self.__index.get_tf_idf(field_name, content_id))
+            field_representation_name, {self.__feature_list[column]: tf_idf for column, tf_idf in
+                                        zip(self.__indices[start:end], self.__data[start:end])})
+
+    def __extract_tf_idf(self, field_name: str):
+        """
+        Extracts the tf-idf of every content from the index, the features bags are stored
+        as the rows of a sparse matrix
+        """
+        feature_dict = {}
+        self.__row_dict = {}
+        self.__indptr = array('q', [0])
+        self.__indices = array('i')
+        self.__data = array('d')
+        for content_id, words_bag in self.__index.get_tf_idf_bulk(field_name):
+            self.__row_dict[content_id] = len(self.__indptr) - 1
+            for term, tf_idf in words_bag.items():
+                self.__indices.append(feature_dict.setdefault(term, len(feature_dict)))
+                self.__data.append(tf_idf)
+            self.__indptr.append(len(self.__indices))
+
+        self.__feature_list = list(feature_dict.keys())
 
     def dataset_refactor(self, information_source: RawInformationSource, id_field_names: str):
         """
@@ -127,8 +168,16 @@ class LuceneTfIdf(TfIdfTechnique):
 
         self.__index.stop_writing()
 
+        if self.__bulk:
+            self.__extract_tf_idf(field_name)
+
     def delete_refactored(self):
         """
         Delete the index used for term vectors and relative frequencies
         """
         self.__index.delete_index()
+        self.__row_dict = {}
+        self.__feature_list = []
+        self.__indptr = array('q', [0])
+        self.__indices = array('i')
+        self.__data = array('d')
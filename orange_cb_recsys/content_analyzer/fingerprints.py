@@ -0,0 +1,210 @@
+import hashlib
+import inspect
+import json
+import os
+from typing import Dict, List, Set
+
+from orange_cb_recsys.content_analyzer.content_representation.content_field import COMPACT_FORMAT_VERSION
+from orange_cb_recsys.content_analyzer.content_representation.content_store import STORE_FORMAT_VERSION
+from orange_cb_recsys.utils.const import logger
+
+FINGERPRINTS_FILE_NAME = 'fingerprints.json'
+
+# containers bigger than this are described only by their type and length
+_MAX_DESCRIBED_LENGTH = 100
+_MAX_DESCRIBED_DEPTH = 3
+
+
+def _get_parameters(obj) -> Dict[str, object]:
+    """
+    Gets the attributes of an object that store the parameters of its constructor,
+    also if their names are mangled. The other attributes are ignored, since they hold
+    the state of the object, for example the collection of a technique
+    """
+    try:
+        parameter_names = [name for name, parameter in inspect.signature(type(obj).__init__).parameters.items()
+                           if name != 'self' and parameter.kind not in
+                           (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)]
+    except (TypeError, ValueError):
+        return {}
+
+    parameters = {}
+    for name in parameter_names:
+        for attribute_name, value in vars(obj).items():
+            if attribute_name.lstrip('_') == name or attribute_name.endswith('__' + name):
+                parameters[name] = value
+                break
+
+    return parameters
+
+
+def _describe(obj, depth: int = 0):
+    """
+    Builds a json serializable description of an object from its constructor parameters,
+    used to detect if the configuration of a technique changed between two runs.
+    Big containers and deeply nested objects, like the models loaded by the techniques,
+    are described only by their type
+    """
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+
+    type_name = type(obj).__module__ + '.' + type(obj).__qualname__
+    if depth >= _MAX_DESCRIBED_DEPTH:
+        return type_name
+
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        if len(obj) > _MAX_DESCRIBED_LENGTH:
+            return [type_name, len(obj)]
+        description = [_describe(element, depth + 1) for element in obj]
+        if isinstance(obj, (set, frozenset)):
+            description.sort(key=repr)
+        return description
+
+    if isinstance(obj, dict):
+        if len(obj) > _MAX_DESCRIBED_LENGTH:
+            return [type_name, len(obj)]
+        return {str(key): _describe(value, depth + 1) for key, value in obj.items()}
+
+    if hasattr(obj, '__dict__'):
+        return [type_name, {name: _describe(value, depth + 1) for name, value in _get_parameters(obj).items()}]
+
+    return type_name
+
+
+def _digest(description) -> str:
+    return hashlib.sha1(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def config_fingerprint(config) -> str:
+    """
+    Computes the fingerprint of the parts of a ContentAnalyzerConfig that change the produced contents:
+    content type, id fields, search index, columnar store, serialization codec, lod properties retrieval and,
+    for each field, language, memory interface, preprocessors and technique of every pipeline.
+    The versions of the formats of the store and of the serialized contents are part of the fingerprint,
+    so the contents written in an older format are produced again
+
+    Args:
+        config (ContentAnalyzerConfig): the configuration
+
+    Returns:
+        fingerprint (str): hexadecimal sha1 digest
+    """
+    field_description_dict = {}
+    for field_name in config.get_field_name_list():
+        field_config = config.get_field_config(field_name)
+        field_description_dict[field_name] = [
+            field_config.get_lang(),
+            _describe(field_config.get_memory_interface()),
+            [[_describe(pipeline.get_content_technique()),
+              [_describe(preprocessor) for preprocessor in pipeline.get_preprocessor_list()]]
+             for pipeline in config.get_pipeline_list(field_name)]
+        ]
+
+    return _digest([config.get_content_type(), _describe(config.get_id_field_name()), config.get_search_index(),
+                    config.get_columnar_store(), config.get_codec(), STORE_FORMAT_VERSION, COMPACT_FORMAT_VERSION,
+                    _describe(config.get_lod_properties_retrieval()), field_description_dict])
+
+
+def raw_content_fingerprint(raw_content: Dict) -> str:
+    """
+    Computes the fingerprint of a raw content, that changes if any of its fields changes
+
+    Args:
+        raw_content (dict): raw content extracted from the source
+
+    Returns:
+        fingerprint (str): hexadecimal sha1 digest
+    """
+    return _digest(raw_content)
+
+
+class IncrementalUpdate:
+    """
+    Class that compares the contents of the source with the ones produced by the previous run
+    of the content analyzer in the same directory, using the fingerprints saved by that run.
+    If the configuration changed every content must be produced again.
+
+    The representations of collection based techniques, like tf-idf, of an unchanged content depend
+    on the whole collection: they are produced again only when the contents changed since
+    they were last produced are more than collection_update_threshold of the collection
+
+    Args:
+        output_directory (str): directory of the contents
+        config_fingerprint (str): fingerprint of the current configuration
+        content_fingerprint_dict (dict<str, str>): fingerprint of each content in the source,
+            indexed by content id
+        collection_update_threshold (float): fraction of the collection
+        has_collection_techniques (bool): True if the configuration uses collection based techniques
+    """
+
+    def __init__(self, output_directory: str, config_fingerprint: str, content_fingerprint_dict: Dict[str, str],
+                 collection_update_threshold: float, has_collection_techniques: bool):
+        self.__path: str = os.path.join(output_directory, FINGERPRINTS_FILE_NAME)
+        self.__config_fingerprint: str = config_fingerprint
+        self.__content_fingerprint_dict: Dict[str, str] = content_fingerprint_dict
+
+        previous = {'config': None, 'contents': {}, 'collection_changes': 0}
+        if os.path.isfile(self.__path):
+            with open(self.__path) as fingerprints_file:
+                previous = json.load(fingerprints_file)
+        previous_content_dict = previous['contents']
+
+        self.__config_changed: bool = previous['config'] != config_fingerprint
+        if self.__config_changed:
+            self.__changed_id_set: Set[str] = set(content_fingerprint_dict.keys())
+        else:
+            self.__changed_id_set: Set[str] = set(
+                content_id for content_id, fingerprint in content_fingerprint_dict.items()
+                if previous_content_dict.get(content_id) != fingerprint)
+        self.__deleted_id_list: List[str] = [content_id for content_id in previous_content_dict.keys()
+                                             if content_id not in content_fingerprint_dict]
+        self.__unchanged_id_list: List[str] = [content_id for content_id in content_fingerprint_dict.keys()
+                                               if content_id not in self.__changed_id_set]
+
+        self.__collection_changes: int = previous['collection_changes'] + \
+            len(self.__changed_id_set) + len(self.__deleted_id_list)
+        self.__refresh_collection: bool = False
+        if has_collection_techniques and not self.__config_changed and len(self.__unchanged_id_list) != 0:
+            self.__refresh_collection = \
+                self.__collection_changes > collection_update_threshold * len(content_fingerprint_dict)
+        if self.__config_changed or self.__refresh_collection:
+            self.__collection_changes = 0
+
+        logger.info("Incremental update: %d new or changed contents, %d deleted, %d unchanged",
+                    len(self.__changed_id_set), len(self.__deleted_id_list), len(self.__unchanged_id_list))
+
+    def is_config_changed(self) -> bool:
+        return self.__config_changed
+
+    def is_empty(self) -> bool:
+        """
+        True if there is nothing to update
+        """
+        return len(self.__changed_id_set) == 0 and len(self.__deleted_id_list) == 0 \
+            and not self.__config_changed
+
+    def get_changed_id_set(self) -> Set[str]:
+        return self.__changed_id_set
+
+    def get_deleted_id_list(self) -> List[str]:
+        return self.__deleted_id_list
+
+    def get_unchanged_id_list(self) -> List[str]:
+        return self.__unchanged_id_list
+
+    def get_refresh_collection(self) -> bool:
+        """
+        True if the collection based representations of the unchanged contents must be produced again
+        """
+        return self.__refresh_collection
+
+    def save(self):
+        """
+        Saves the fingerprints of the current contents, it should be called after the update succeeded
+        """
+        temp_path = self.__path + '.tmp'
+        with open(temp_path, 'w') as fingerprints_file:
+            json.dump({'config': self.__config_fingerprint,
+                       'contents': self.__content_fingerprint_dict,
+                       'collection_changes': self.__collection_changes}, fingerprints_file)
+        os.replace(temp_path, self.__path)
@@ -10,7 +10,7 @@ from org.apache.lucene.search import IndexSearcher, BooleanQuery, BooleanClause
 from org.apache.lucene.document import Document, Field, StringField, FieldType, TextField
 from org.apache.lucene.store import SimpleFSDirectory
 from org.apache.lucene.util import BytesRefIterator
-from org.apache.lucene.index import DirectoryReader, Term
+from org.apache.lucene.index import DirectoryReader, Term, MultiFields
 
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import TextInterface
 
@@ -30,12 +30,21 @@ class IndexInterface(TextInterface):
         self.__writer = None
         self.__field_type_frequency = None
         self.__field_type_searching = None
+        self.__update_existing = False
 
     def __str__(self):
         return "IndexInterface"
 
-    def init_writing(self):
+    def init_writing(self, update_existing: bool = False):
+        """
+        Args:
+            update_existing (bool): if True the documents already in the index are kept,
+                and a serialized document replaces the one with the same content_id
+        """
+        self.__update_existing = update_existing
         self.__field_type_searching = FieldType(TextField.TYPE_STORED)
+        # term vectors let the search engine recommender build its queries without analyzing the text again
+        self.__field_type_searching.setStoreTermVectors(True)
         self.__field_type_frequency = FieldType(StringField.TYPE_STORED)
         self.__field_type_frequency.setStored(True)
         self.__field_type_frequency.setTokenized(False)
@@ -78,10 +87,29 @@ class IndexInterface(TextInterface):
     def serialize_content(self):
         """
         Serialize the content
+
+        Returns:
+            document_id (int): id of the document in the index. The writer returns a sequence number,
+                that is the document id only when every operation adds a document to a new index.
+                When the existing documents are updated the ids change with the deletions,
+                so None is returned and the ids must be read from the committed index
+                with get_content_id_list
         """
+        if self.__update_existing:
+            self.__writer.updateDocument(Term("content_id", self.__doc.get("content_id")), self.__doc)
+            return None
         doc_index = self.__writer.addDocument(self.__doc)
         return doc_index - 1
 
+    def delete_content(self, content_id: str):
+        """
+        Delete from the index the document of a content
+
+        Args:
+            content_id (str): id of the content
+        """
+        self.__writer.deleteDocuments(Term("content_id", content_id))
+
     def stop_writing(self):
         """
         Stop the index writer and commit the operations
@@ -89,6 +117,24 @@ class IndexInterface(TextInterface):
         self.__writer.commit()
         self.__writer.close()
 
+    def get_content_id_list(self):
+        """
+        Reads the content id of every document of the index. The documents deleted or replaced
+        by an update, that are kept by the index until its segments are merged, have None as content id
+
+        Returns:
+            content_id_list (List<str>): content id of each document, in document order
+        """
+        reader = DirectoryReader.open(SimpleFSDirectory(Paths.get(self.get_directory())))
+        try:
+            # None if the index has no deleted documents
+            live_docs = MultiFields.getLiveDocs(reader)
+            return [reader.document(document_offset).get("content_id")
+                    if live_docs is None or live_docs.get(document_offset) else None
+                    for document_offset in range(reader.maxDoc())]
+        finally:
+            reader.close()
+
     def get_tf_idf(self, field_name: str, content_id: str):
         """
         Calculates the tf-idf for the words contained in the field of the content whose id
@@ -127,5 +173,41 @@ class IndexInterface(TextInterface):
         reader.close()
         return words_bag
 
+    def get_tf_idf_bulk(self, field_name: str):
+        """
+        Calculates the tf-idf for the words contained in the field of every content in the index.
+        The index is opened once, the term vectors are read in document order and the
+        document frequency of each term is looked up only once
+        Args:
+            field_name (str): Name of the field containing the words for which calculate the tf-idf
+
+        Returns:
+            generator of (content_id, words_bag) for each document, where words_bag is the same
+            dictionary returned by get_tf_idf
+        """
+        reader = DirectoryReader.open(SimpleFSDirectory(Paths.get(self.get_directory())))
+        try:
+            max_doc = reader.maxDoc()
+            inverse_document_frequency_dict = {}
+            for document_offset in range(max_doc):
+                content_id = reader.document(document_offset).get("content_id")
+                words_bag = {}
+                term_vector = reader.getTermVector(document_offset, field_name)
+                if term_vector is not None:
+                    term_enum = term_vector.iterator()
+                    for term in BytesRefIterator.cast_(term_enum):
+                        term_text = term.utf8ToString()
+                        postings = term_enum.postings(None)
+                        postings.nextDoc()
+                        term_frequency = 1 + math.log(postings.freq())  # normalized term frequency
+                        if term_text not in inverse_document_frequency_dict:
+                            inverse_document_frequency_dict[term_text] = \
+                                math.log10(max_doc / reader.docFreq(Term(field_name, term)))
+                        words_bag[term_text] = term_frequency * inverse_document_frequency_dict[term_text]
+
+                yield content_id, words_bag
+        finally:
+            reader.close()
+
     def delete_index(self):
         shutil.rmtree(self.get_directory(), ignore_errors=True)
@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
 
 
 class RatingProcessor(ABC):
@@ -11,6 +14,19 @@ class RatingProcessor(ABC):
     def fit(self, field_data: object):
         raise NotImplementedError
 
+    def fit_batch(self, field_data_list: List[object]) -> np.ndarray:
+        """
+        Processes the ratings of many raw ratings at once, the default implementation
+        calls fit for each one
+
+        Args:
+            field_data_list (List<object>): data of the rating field of each raw rating
+
+        Returns:
+            (np.ndarray): the scores, in the same order
+        """
+        return np.array([self.fit(field_data) for field_data in field_data_list], dtype=float)
+
 
 class SentimentAnalysis(RatingProcessor):
     """
@@ -51,3 +67,20 @@ class NumberNormalizer(RatingProcessor):
         if float(field_data) > self.__max:
             return self.__max
         return (float(float(field_data) - self.__min) / float(self.__scale_span)) * 2 - 1
+
+    def fit_batch(self, field_data_list: List[float]) -> np.ndarray:
+        """
+        Vectorized version of fit
+
+        Args:
+            field_data_list: rating fields that will be
+                normalized
+
+        Returns:
+            (np.ndarray): each field_data normalized in the interval [-1, 1]
+        """
+        field_data_array = np.asarray(field_data_list, dtype=float)
+        normalized_array = (field_data_array - self.__min) / float(self.__scale_span) * 2 - 1
+        normalized_array[field_data_array < self.__min] = self.__min
+        normalized_array[field_data_array > self.__max] = self.__max
+        return normalized_array
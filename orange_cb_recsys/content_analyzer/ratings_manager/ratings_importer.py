@@ -1,7 +1,9 @@
+from itertools import islice
 from typing import List
 
 import time
 
+import numpy as np
 import pandas as pd
 
 from orange_cb_recsys.content_analyzer.ratings_manager.rating_processor import RatingProcessor
@@ -76,49 +78,111 @@ class RatingsImporter:
     def get_timestamp_field_name(self) -> str:
         return self.__timestamp_field_name
 
-    def import_ratings(self) -> pd.DataFrame:
+    def __get_output_path(self, extension: str) -> str:
+        if not DEVELOPING:
+            return "{}/ratings/{}_{}.{}".format(home_path, self.__file_name, int(time.time()), extension)
+        return "{}_{}.{}".format(self.__file_name, int(time.time()), extension)
+
+    def __import_chunks(self, chunk_size: int):
+        """
+        Generator of the frames of the ratings, each one built from chunk_size raw ratings at most.
+        The rating processors and the score combiner process a whole chunk at once
+        """
+        source_iterator = iter(show_progress(self.__source))
+        while True:
+            raw_rating_list = list(islice(source_iterator, chunk_size))
+            if len(raw_rating_list) == 0:
+                return
+
+            columns = {
+                "from_id": [raw_rating[self.__from_field_name] for raw_rating in raw_rating_list],
+                "to_id": [raw_rating[self.__to_field_name] for raw_rating in raw_rating_list],
+                "timestamp": [raw_rating[self.__timestamp_field_name] for raw_rating in raw_rating_list]
+            }
+
+            score_list = []
+            for preference in self.__rating_configs:
+                field_data_list = [raw_rating[preference.get_field_name()] for raw_rating in raw_rating_list]
+                score_list.append(preference.get_processor().fit_batch(field_data_list))
+                columns[preference.get_field_name()] = field_data_list
+            columns["score"] = self.__score_combiner.combine_batch(np.column_stack(score_list))
+
+            yield pd.DataFrame(columns, columns=self.__columns)
+
+    def import_ratings(self, chunk_size: int = 100000) -> pd.DataFrame:
         """
         Imports the ratings from the source and stores in a dataframe
+        Args:
+            chunk_size (int): number of raw ratings processed at once
+
         Returns:
             ratings_frame: pd.DataFrame
         """
-        ratings_frame = pd.DataFrame(columns=list(self.__columns))
-
-        dicts = \
-            [
-                {
-                    **{
-                        "from_id": raw_rating[self.__from_field_name],
-                        "to_id": raw_rating[self.__to_field_name],
-                        "timestamp": raw_rating[self.__timestamp_field_name],
-                        "score": self.__score_combiner.combine(
-                            [preference.get_processor().fit(raw_rating[preference.get_field_name()])
-                             for preference in self.__rating_configs])
-                    },
-                    **{
-                        preference.get_field_name():
-                            raw_rating[preference.get_field_name()]
-                        for preference in self.__rating_configs
-                    }
-                }
-                for raw_rating in show_progress(self.__source)
-            ]
-
-        ratings_frame = ratings_frame.append(dicts, ignore_index=True)
+        frame_list = list(self.__import_chunks(chunk_size))
+        if len(frame_list) == 0:
+            ratings_frame = pd.DataFrame(columns=list(self.__columns))
+        else:
+            ratings_frame = pd.concat(frame_list, ignore_index=True)
 
         if self.__file_name is not None:
-            if not DEVELOPING:
-                ratings_frame.to_csv(
-                    "{}/ratings/{}_{}.csv".format(
-                        home_path, self.__file_name, int(time.time())),
-                    index=False, header=True)
-            else:
-                ratings_frame.to_csv(
-                    "{}_{}.csv".format(
-                        self.__file_name, int(time.time())), index=False, header=True)
+            ratings_frame.to_csv(self.__get_output_path('csv'), index=False, header=True)
 
         return ratings_frame
 
+    def import_ratings_streaming(self, chunk_size: int = 100000, output_format: str = 'csv') -> str:
+        """
+        Imports the ratings from the source writing them in the output file one chunk at a time,
+        so the memory used doesn't depend on the number of ratings.
+        In parquet format the from_id and to_id columns are dictionary encoded, this requires pyarrow
+
+        Args:
+            chunk_size (int): number of raw ratings processed and written at once
+            output_format (str): format of the output file, 'csv' or 'parquet'
+
+        Returns:
+            path (str): path of the output file
+        """
+        if self.__file_name is None:
+            raise ValueError("An output directory is needed to import the ratings in streaming mode")
+        output_format = output_format.lower()
+        if output_format not in ['csv', 'parquet']:
+            raise ValueError("Output format must be 'csv' or 'parquet'")
+
+        path = self.__get_output_path(output_format)
+        if output_format == 'csv':
+            for i, ratings_frame in enumerate(self.__import_chunks(chunk_size)):
+                ratings_frame.to_csv(path, mode='w' if i == 0 else 'a', index=False, header=i == 0)
+            return path
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError("pyarrow is needed to import the ratings in parquet format")
+
+        writer = None
+        schema = None
+        try:
+            for ratings_frame in self.__import_chunks(chunk_size):
+                for column in ["from_id", "to_id"]:
+                    ratings_frame[column] = ratings_frame[column].astype(str).astype('category')
+
+                if writer is None:
+                    # the ids are stored with the same dictionary type in every row group,
+                    # whatever the number of categories of the chunk
+                    schema = pyarrow.Table.from_pandas(ratings_frame, preserve_index=False).schema
+                    for column in ["from_id", "to_id"]:
+                        schema = schema.set(schema.get_field_index(column),
+                                            pyarrow.field(column, pyarrow.dictionary(pyarrow.int32(),
+                                                                                     pyarrow.string())))
+                    writer = pyarrow.parquet.ParquetWriter(path, schema)
+                writer.write_table(pyarrow.Table.from_pandas(ratings_frame, schema=schema, preserve_index=False))
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return path
+
 
 def show_progress(coll, milestones=100):
     """
@@ -1,5 +1,8 @@
+from itertools import groupby
 from typing import List
 
+import numpy as np
+
 
 def avg(score_list: List[float]) -> float:
     """
@@ -10,9 +13,41 @@ def avg(score_list: List[float]) -> float:
 
 def mode(score_list: List[float]) -> float:
     """
-    Return the mode between the ratings
+    Return the mode between the ratings, if more scores are the most frequent the lowest one is returned
+    """
+    # runs of equal scores in increasing order, max keeps the first of the longest runs
+    run_list = [(score, len(list(run))) for score, run in groupby(sorted(score_list))]
+    return max(run_list, key=lambda score_run: score_run[1])[0]
+
+
+def avg_batch(score_matrix: np.ndarray) -> np.ndarray:
+    """
+    Compute the average score of each row
+    """
+    return score_matrix.mean(axis=1)
+
+
+def mode_batch(score_matrix: np.ndarray) -> np.ndarray:
+    """
+    Return the mode of each row, if more scores are the most frequent the lowest one is returned
     """
-    return max(set(score_list), key=score_list.count)
+    sorted_matrix = np.sort(score_matrix, axis=1)
+    column_index = np.arange(sorted_matrix.shape[1])
+    run_start = np.ones(sorted_matrix.shape, dtype=bool)
+    run_start[:, 1:] = sorted_matrix[:, 1:] != sorted_matrix[:, :-1]
+    # run_length_matrix[i, j] is the number of scores equal to sorted_matrix[i, j] up to column j,
+    # the first maximum of a row is the end of the first of the longest runs, that has the lowest score
+    run_length_matrix = column_index - np.maximum.accumulate(np.where(run_start, column_index, 0), axis=1) + 1
+    return sorted_matrix[np.arange(sorted_matrix.shape[0]), run_length_matrix.argmax(axis=1)]
+
+
+# vectorized version of each function, used when many ratings are combined at once
+_BATCH_FUNCTION_DICT = {
+    "avg": avg_batch,
+    "mode": mode_batch,
+    "min": lambda score_matrix: score_matrix.min(axis=1),
+    "max": lambda score_matrix: score_matrix.max(axis=1),
+}
 
 
 class ScoreCombiner:
@@ -23,6 +58,25 @@ class ScoreCombiner:
     """
     def __init__(self, function: str):
         self.__function = eval(function)
+        self.__batch_function = _BATCH_FUNCTION_DICT.get(function)
 
     def combine(self, score_list: List[float], **kwargs) -> float:
         return self.__function(score_list, **kwargs)
+
+    def combine_batch(self, score_matrix: np.ndarray, **kwargs) -> np.ndarray:
+        """
+        Combines the scores of many ratings at once, with NumPy if the function
+        has a vectorized version
+
+        Args:
+            score_matrix (np.ndarray): matrix with a row for each rating
+                and a column for each score of the rating
+
+        Returns:
+            (np.ndarray): the combined score of each rating
+        """
+        score_matrix = np.asarray(score_matrix, dtype=float)
+        if self.__batch_function is not None and len(kwargs) == 0:
+            return self.__batch_function(score_matrix)
+        return np.array([self.__function(score_list, **kwargs) for score_list in score_matrix.tolist()],
+                        dtype=float)
@@ -1,3 +1,6 @@
+from typing import List
+
+import numpy as np
 from textblob import TextBlob
 
 from orange_cb_recsys.content_analyzer.ratings_manager.rating_processor import SentimentAnalysis
@@ -22,3 +25,17 @@ class TextBlobSentimentAnalysis(SentimentAnalysis):
         """
 
         return TextBlob(field_data).sentiment.polarity
+
+    def fit_batch(self, field_data_list: List[str]) -> np.ndarray:
+        """
+        Calculates the sentiment analysis score of many textual reviews,
+        the score of a text repeated in more reviews is calculated once
+        Returns:
+            sentiment_data: array of sentiment analysis scores
+        """
+        polarity_dict = {}
+        for field_data in field_data_list:
+            if field_data not in polarity_dict:
+                polarity_dict[field_data] = self.fit(field_data)
+
+        return np.array([polarity_dict[field_data] for field_data in field_data_list], dtype=float)
@@ -124,13 +124,48 @@ def content_config_run(config_list: List[Dict]):
         if 'search_index' in content_config.keys():
             search_index = content_config['search_index']
 
+        columnar_store = False
+        if 'columnar_store' in content_config.keys():
+            columnar_store = content_config['columnar_store']
+
+        n_jobs = 1
+        if 'n_jobs' in content_config.keys():
+            n_jobs = content_config['n_jobs']
+
+        incremental = False
+        if 'incremental' in content_config.keys():
+            incremental = content_config['incremental']
+
+        collection_update_threshold = 0.1
+        if 'collection_update_threshold' in content_config.keys():
+            collection_update_threshold = content_config['collection_update_threshold']
+
+        ann_index = False
+        if 'ann_index' in content_config.keys():
+            ann_index = content_config['ann_index']
+
+        inverted_index = False
+        if 'inverted_index' in content_config.keys():
+            inverted_index = content_config['inverted_index']
+
+        codec = 'lzma'
+        if 'codec' in content_config.keys():
+            codec = content_config['codec']
+
         content_analyzer_config = ContentAnalyzerConfig(
             content_config["content_type"],
             runnable_instances[content_config['source_type']]
             (file_path=content_config["raw_source_path"]),
             content_config['id_field_name'],
             content_config['output_directory'],
-            search_index)
+            search_index,
+            columnar_store=columnar_store,
+            n_jobs=n_jobs,
+            incremental=incremental,
+            collection_update_threshold=collection_update_threshold,
+            ann_index=ann_index,
+            inverted_index=inverted_index,
+            codec=codec)
 
         if 'get_lod_properties' in content_config.keys():
             class_name = content_config['get_lod_properties'].pop('class')
@@ -194,7 +229,7 @@ def rating_config_run(config_dict: Dict):
         args = {}
         if config_dict["source_type"] == 'sql':
             pass
-    RatingsImporter(
+    ratings_importer = RatingsImporter(
         source=runnable_instances[
             config_dict["source_type"]](file_path=config_dict["raw_source_path"], **args),
         output_directory=config_dict["output_directory"],
@@ -202,7 +237,16 @@ def rating_config_run(config_dict: Dict):
         from_field_name=config_dict["from_field_name"],
         to_field_name=config_dict["to_field_name"],
         timestamp_field_name=config_dict["timestamp_field_name"]
-    ).import_ratings()
+    )
+
+    chunk_size = 100000
+    if 'chunk_size' in config_dict.keys():
+        chunk_size = int(config_dict['chunk_size'])
+
+    if 'output_format' in config_dict.keys():
+        ratings_importer.import_ratings_streaming(chunk_size, config_dict['output_format'])
+    else:
+        ratings_importer.import_ratings(chunk_size)
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ from typing import Dict, Set
 
 import pandas as pd
 
+from orange_cb_recsys.evaluation.utils import mean_by_user
 from orange_cb_recsys.utils.const import logger
 
 
@@ -24,7 +25,8 @@ def get_avg_pop(items: pd.Series, pop_by_items: Dict[str, object]) -> float:
 def get_avg_pop_by_users(data: pd.DataFrame, pop_by_items: Dict[str, object],
                          group: Set[str] = None) -> Dict[str, float]:
     """
-    Get the average popularity for each user in the DataFrame
+    Get the average popularity for each user in the DataFrame, with a single pass over the rows.
+    The users of the group that have no rows in the DataFrame are skipped
     Args:
         data (pd.DataFrame): a pandas dataframe with columns = ['from_id', 'to_id', 'rating']
         pop_by_items (Dict<str, object>): popularity for each label ('label', 'popularity')
@@ -33,28 +35,16 @@ def get_avg_pop_by_users(data: pd.DataFrame, pop_by_items: Dict[str, object],
     Returns:
         avg_pop_by_users (Dict<str, float>): average popularity by user
     """
+    if group is not None:
+        data = data[data['from_id'].isin(group)]
+    logger.info("Group length: %d", data['from_id'].nunique())
 
-    def show_progress(coll, milestones=10):
-        processed = 0
-        for element in coll:
-            yield element
-            processed += 1
-            if processed % milestones == 0:
-                logger.info('Processed %s user in the group', processed)
-
-    if group is None:
-        group = data[['from_id']].values.flatten()
-    logger.info("Group length: %d", len(group))
-    series_by_user = {
-        user: data[data.from_id == user].to_id.values.flatten()
-        for user in show_progress(group)
-    }
-    avg_pop_by_users = {
-        user: get_avg_pop(series_by_user[user], pop_by_items)
-        for user in show_progress(group)
-    }
-
-    return avg_pop_by_users
+    # a Counter gives popularity 0 to the missing items, as when it is indexed
+    popularities = data['to_id'].map(pop_by_items)
+    if popularities.isna().any():
+        raise KeyError(data['to_id'][popularities.isna()].iloc[0])
+
+    return mean_by_user(data['from_id'], popularities.values).to_dict()
 
 
 # pop_by_items = Counter(group['item_id'].to_numpy())
@@ -1,6 +1,7 @@
 import os
 from abc import abstractmethod
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
 
 import pandas as pd
 
@@ -12,6 +13,29 @@ from orange_cb_recsys.recsys.recsys import RecSys
 from orange_cb_recsys.utils.const import logger
 from orange_cb_recsys.utils.load_content import remove_not_existent_items
 
+# number of folds that each process of the pool receives at once
+_CHUNK_SIZE_PER_JOB = 4
+
+# eval model and recommender system used by each process of the pool
+_worker_eval_model = None
+_worker_recsys = None
+
+
+def _init_worker(eval_model: 'EvalModel'):
+    global _worker_eval_model, _worker_recsys
+    _worker_eval_model = eval_model
+    _worker_recsys = RecSys(eval_model.get_config())
+
+
+def _evaluate_fold(fold: tuple) -> Dict[str, object]:
+    """
+    Evaluates, in a process of the pool, a fold of the ratings of a user
+
+    Args:
+        fold (tuple): user id, train set and test set
+    """
+    return _worker_eval_model.evaluate_fold(_worker_recsys, *fold)
+
 
 class EvalModel:
     """
@@ -22,22 +46,35 @@ class EvalModel:
         recommender system that will be internally created
         partitioning (Partitioning): Partitioning technique
         metric_list (list<Metric>): List of metrics that eval model will compute
+        n_jobs (int): number of processes used to evaluate the folds of the users,
+            -1 means one process for each cpu
     """
     def __init__(self, config: RecSysConfig,
                  partitioning: Partitioning,
-                 metric_list: List[Metric] = None):
+                 metric_list: List[Metric] = None,
+                 n_jobs: int = 1):
         if metric_list is None:
             metric_list = {}
         self.__metric_list = metric_list
         self.__config: RecSysConfig = config
         self.__partitioning = partitioning
 
+        n_jobs = int(n_jobs)
+        if n_jobs == -1:
+            n_jobs = os.cpu_count()
+        if n_jobs < 1:
+            raise ValueError("n_jobs must be a positive number or -1")
+        self.__n_jobs: int = n_jobs
+
     def get_partitioning(self):
         return self.__partitioning
 
     def get_config(self):
         return self.__config
 
+    def get_n_jobs(self):
+        return self.__n_jobs
+
     def append_metric(self, metric: Metric):
         self.__metric_list.append(metric)
 
@@ -45,6 +82,83 @@ class EvalModel:
         for metric in self.__metric_list:
             yield metric
 
+    def get_user_id_list(self) -> List[str]:
+        """
+        Gets the ids of the users in the users directory of the config
+        """
+        logger.info("Loading user instances")
+        return [os.path.splitext(filename)[0]
+                for filename in os.listdir(self.get_config().get_users_directory())]
+
+    def get_folds(self, sort_ratings: bool = False):
+        """
+        Generator of the folds of the ratings of every user, the rating frame is grouped by user once.
+        The users without ratings, or whose ratings can't be partitioned, are skipped
+
+        Args:
+            sort_ratings (bool): if True the ratings of each user are sorted by item before they are partitioned
+
+        Returns:
+            folds: tuples (user id, train set, test set)
+        """
+        user_ratings_dict = {user_id: user_ratings for user_id, user_ratings in
+                             self.get_config().get_rating_frame().groupby('from_id', sort=False)}
+        for user_id in self.get_user_id_list():
+            user_ratings = user_ratings_dict.get(user_id)
+            if user_ratings is None:
+                continue
+            if sort_ratings:
+                user_ratings = user_ratings.sort_values(['to_id'], ascending=True)
+
+            try:
+                self.get_partitioning().set_dataframe(user_ratings)
+            except ValueError:
+                continue
+
+            for partition_index in self.get_partitioning():
+                yield user_id, user_ratings.iloc[partition_index[0]], user_ratings.iloc[partition_index[1]]
+
+    def evaluate_folds(self, folds) -> pd.DataFrame:
+        """
+        Evaluates the folds with evaluate_fold, in a pool of n_jobs processes if n_jobs is greater than 1,
+        and averages the results of the folds of each user
+
+        Args:
+            folds: tuples (user id, train set, test set)
+
+        Returns:
+            metric_results (pd.DataFrame): has a 'from' column, representing the user_ids for
+                which the metrics was computed, and then one different column for every metric
+                performed
+        """
+        if self.__n_jobs == 1:
+            recsys = RecSys(self.get_config())
+            result_list = [self.evaluate_fold(recsys, *fold) for fold in folds]
+        else:
+            with ProcessPoolExecutor(self.__n_jobs, initializer=_init_worker, initargs=(self,)) as executor:
+                result_list = list(executor.map(_evaluate_fold, folds, chunksize=_CHUNK_SIZE_PER_JOB))
+
+        if len(result_list) == 0:
+            return pd.DataFrame(columns=['from'] + [str(metric) for metric in self.get_metrics()])
+
+        return pd.DataFrame(result_list).groupby('from').mean().reset_index()
+
+    def evaluate_fold(self, recsys: RecSys, user_id: str, train: pd.DataFrame, test: pd.DataFrame) \
+            -> Dict[str, object]:
+        """
+        Computes the metrics on a fold of the ratings of a user
+
+        Args:
+            recsys (RecSys): recommender system built on the config
+            user_id (str): id of the user
+            train (pd.DataFrame): ratings used to fit the algorithm
+            test (pd.DataFrame): ratings used as truth
+
+        Returns:
+            result_dict (dict): the user id, with key 'from', and the result of each metric
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def fit(self):
         raise NotImplementedError
@@ -60,9 +174,26 @@ class RankingAlgEvalModel(EvalModel):
         recommender system that will be internally created
         partitioning (Partitioning): Partitioning technique
         metric_list (list<Metric>): List of metrics that eval model will compute
+        n_jobs (int): number of processes used to evaluate the folds of the users,
+            -1 means one process for each cpu
     """
-    def __init__(self, config, partitioning, metric_list: List[Metric] = None):
-        super().__init__(config, partitioning, metric_list)
+    def __init__(self, config, partitioning, metric_list: List[Metric] = None, n_jobs: int = 1):
+        super().__init__(config, partitioning, metric_list, n_jobs)
+
+    def evaluate_fold(self, recsys: RecSys, user_id: str, train: pd.DataFrame, test: pd.DataFrame) \
+            -> Dict[str, object]:
+        logger.info("Computing ranking metrics for user %s", user_id)
+        truth = test.loc[:, 'to_id':'score']
+        truth.columns = ["to_id", "rating"]
+
+        recs_number = len(truth['rating'].values)
+        predictions = recsys.fit_eval_ranking(
+            user_id, train, truth['to_id'].tolist(), recs_number)
+
+        result_dict = {'from': user_id}
+        for metric in self.get_metrics():
+            result_dict[str(metric)] = metric.perform(predictions, truth)
+        return result_dict
 
     def fit(self):
         """
@@ -73,6 +204,7 @@ class RankingAlgEvalModel(EvalModel):
         The evaluation is performed by creating a training set,
         and a test set with its corresponding
         truth base. The ranking algorithm will use the test set as candidate items list.
+        The folds of the users are evaluated by n_jobs processes
 
         Returns:
             ranking_metric_results: has a 'from' column, representing the user_ids for
@@ -80,54 +212,11 @@ class RankingAlgEvalModel(EvalModel):
                 performed. The returned DataFrames contain one row per user, and the corresponding
                 metric values are given by the mean of the values obtained for that user.
         """
-        # initialize recommender to call for prediction computing
-        recsys = RecSys(self.get_config())
-
-        # get all users in specified directory
-        logger.info("Loading user instances")
-        user_id_list = \
-            [os.path.splitext(filename)[0]
-             for filename in os.listdir(self.get_config().get_users_directory())]
-
-        # define results structure
-        ranking_alg_metrics_results = pd.DataFrame()
-
         # calculate metrics on ranking algorithm results
         if self.get_config().get_ranking_algorithm() is None:
             raise ValueError("You must set ranking algorithm to compute ranking metrics")
-        for user_id in user_id_list:
-            logger.info("Computing ranking metrics for user %s", user_id)
-            user_ratings = self.get_config().get_rating_frame()[
-                self.get_config().get_rating_frame()['from_id'] == user_id]
-
-            try:
-                self.get_partitioning().set_dataframe(user_ratings)
-            except ValueError:
-                continue
-
-            for partition_index in self.get_partitioning():
-                result_dict = {}
-                train = user_ratings.iloc[partition_index[0]]
-                test = user_ratings.iloc[partition_index[1]]
-
-                truth = test.loc[:, 'to_id':'score']
-                truth.columns = ["to_id", "rating"]
-
-                recs_number = len(truth['rating'].values)
-                predictions = recsys.fit_eval_ranking(
-                    user_id, train, truth['to_id'].tolist(), recs_number)
 
-                for metric in self.get_metrics():
-                    result_dict['from'] = user_id
-                    result_dict[str(metric)] = metric.perform(predictions, truth)
-
-                ranking_alg_metrics_results = \
-                    ranking_alg_metrics_results.append(result_dict, ignore_index=True)
-
-        ranking_alg_metrics_results = \
-            ranking_alg_metrics_results.groupby('from').mean().reset_index()
-
-        return ranking_alg_metrics_results
+        return self.evaluate_folds(self.get_folds())
 
 
 class PredictionAlgEvalModel(EvalModel):
@@ -143,9 +232,23 @@ class PredictionAlgEvalModel(EvalModel):
         recommender system that will be internally created
         partitioning (Partitioning): Partitioning technique
         metric_list (list<Metric>): List of metrics that eval model will compute
+        n_jobs (int): number of processes used to evaluate the folds of the users,
+            -1 means one process for each cpu
     """
-    def __init__(self, config, partitioning, metric_list: List[Metric] = None):
-        super().__init__(config, partitioning, metric_list)
+    def __init__(self, config, partitioning, metric_list: List[Metric] = None, n_jobs: int = 1):
+        super().__init__(config, partitioning, metric_list, n_jobs)
+
+    def evaluate_fold(self, recsys: RecSys, user_id: str, train: pd.DataFrame, test: pd.DataFrame) \
+            -> Dict[str, object]:
+        logger.info("Computing prediction metrics for user %s", user_id)
+        test = remove_not_existent_items(test, self.get_config().get_items_directory())
+
+        predictions = recsys.fit_eval_predict(user_id, train, test)
+
+        result_dict = {'from': user_id}
+        for metric in self.get_metrics():
+            result_dict[str(metric)] = metric.perform(predictions, test)
+        return result_dict
 
     def fit(self):
         """
@@ -155,6 +258,7 @@ class PredictionAlgEvalModel(EvalModel):
             The evaluation is performed by creating a training set,
             and a test set with its corresponding
             truth base. The rating prediction will be computed on every item in the test eet.
+            The folds of the users are evaluated by n_jobs processes
 
         Returns:
             prediction_metric_results: has a 'from' column, representing the user_ids for
@@ -162,51 +266,11 @@ class PredictionAlgEvalModel(EvalModel):
                 performed. The returned DataFrames contain one row per user, and the corresponding
                 metric values are given by the mean of the values obtained for that user.
         """
-        # initialize recommender to call for prediction computing
-        recsys = RecSys(self.get_config())
-
-        # get all users in specified directory
-        logger.info("Loading user instances")
-        user_id_list = [
-            os.path.splitext(filename)[0]
-            for filename in os.listdir(self.get_config().get_users_directory())]
-
-        # define results structure
-        prediction_metric_results = pd.DataFrame()
-
         # calculate metrics on prediction algorithm results
         if self.get_config().get_score_prediction_algorithm() is None:
             raise ValueError("You must set score prediction algorithm to compute this eval model")
 
-        for user_id in user_id_list:
-            logger.info("User %s", user_id)
-            logger.info("Loading user ratings")
-
-            user_ratings = self.get_config().get_rating_frame()[
-                self.get_config().get_rating_frame()['from_id'] == user_id]
-            user_ratings = user_ratings.sort_values(['to_id'], ascending=True)
-
-            try:
-                self.get_partitioning().set_dataframe(user_ratings)
-            except ValueError:
-                continue
-
-            for partition_index in self.get_partitioning():
-                result_dict = {}
-                logger.info("Computing prediction metrics")
-                train = user_ratings.iloc[partition_index[0]]
-                test = user_ratings.iloc[partition_index[1]]
-                test = remove_not_existent_items(test, self.get_config().get_items_directory())
-
-                predictions = recsys.fit_eval_predict(user_id, train, test)
-                for metric in self.get_metrics():
-                    result_dict[str(metric)] = metric.perform(predictions, test)
-
-                prediction_metric_results.append(result_dict, ignore_index=True)
-
-        prediction_metric_results = prediction_metric_results.groupby('from').mean().reset_index()
-
-        return prediction_metric_results
+        return self.evaluate_folds(self.get_folds(sort_ratings=True))
 
 
 class ReportEvalModel(EvalModel):
@@ -245,10 +309,7 @@ class ReportEvalModel(EvalModel):
         recsys = RecSys(self.get_config())
 
         # get all users in specified directory
-        logger.info("Loading user instances")
-        user_id_list = [
-            os.path.splitext(filename)[0]
-            for filename in os.listdir(self.get_config().get_users_directory())]
+        user_id_list = self.get_user_id_list()
 
         # define results structure
         no_truth_metrics_results = []
@@ -259,19 +320,8 @@ class ReportEvalModel(EvalModel):
         if isinstance(self.get_config().get_score_prediction_algorithm(), ScorePredictionAlgorithm):
             raise ValueError("You must set ranking algorithm to compute this metrics")
 
-        columns = ["from_id", "to_id", "rating"]
-        score_frame = pd.DataFrame(columns=columns)
-        for user_id in user_id_list:
-            logger.info("User %s", user_id)
-            fit_result = recsys.fit_ranking(user_id, self.__recs_number)
-
-            fit_result_with_user = pd.DataFrame(columns=columns)
-            fit_result.columns = ["to_id", "rating"]
-            for i, row in fit_result.iterrows():
-                fit_result_with_user = pd.concat([fit_result_with_user, pd.DataFrame.from_records(
-                    [(user_id, row["to_id"], row["rating"])], columns=columns)], ignore_index=True)
-
-            score_frame = pd.concat([fit_result_with_user, score_frame], ignore_index=True)
+        logger.info("Computing rankings")
+        score_frame = recsys.fit_ranking_batch(user_id_list, self.__recs_number)
 
         logger.info("Computing no truth metrics")
         for metric in self.get_metrics():
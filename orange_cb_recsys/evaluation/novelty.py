@@ -1,6 +1,4 @@
-import math
-from collections import Counter
-
+import numpy as np
 import pandas as pd
 
 from orange_cb_recsys.evaluation.metrics import Metric
@@ -33,18 +31,13 @@ class Novelty(Metric):
             novelty (float): Novelty score
         """
         total_ratings = len(truth.index)
-        ratings_by_item = Counter(truth[['to_id']].values.flatten())
-        users = set(predictions[['from_id']].values.flatten())
-
-        users_log_popularity = 0
-        for user in users:
-            user_recs = set(predictions.query('from_id == @user')[['to_id']].values.flatten())
-            user_log_popularity = 0
-            for item in user_recs:
-                item_pop = (ratings_by_item[item] + 1) / total_ratings
-                user_log_popularity += math.log2(item_pop)
-            users_log_popularity += user_log_popularity
-
-        novelty = - (users_log_popularity / (len(users) * self.__num_of_recs))
+        ratings_by_item = truth['to_id'].value_counts()
+
+        # every distinct item recommended to a user counts once for that user
+        user_recs = predictions[['from_id', 'to_id']].drop_duplicates()
+        item_pop = (user_recs['to_id'].map(ratings_by_item).fillna(0).values + 1) / total_ratings
+        users_log_popularity = np.log2(item_pop).sum()
+
+        novelty = - (users_log_popularity / (predictions['from_id'].nunique() * self.__num_of_recs))
 
         return novelty
@@ -48,6 +48,9 @@ class RMSE(PredictionMetric):
         sq = np.square(diff)
         return np.sqrt(np.mean(sq))
 
+    def __str__(self):
+        return "RMSE"
+
 
 class MAE(PredictionMetric):
     """
@@ -78,3 +81,6 @@ class MAE(PredictionMetric):
             raise Exception
         abs_diff = (predictions - truth).apply(abs)
         return np.mean(abs_diff)
+
+    def __str__(self):
+        return "MAE"
@@ -1,4 +1,3 @@
-import statistics
 from abc import abstractmethod
 from typing import List, Dict, Tuple
 import pandas as pd
@@ -25,6 +24,26 @@ class RankingMetric(Metric):
     def perform(self, predictions: pd.DataFrame, truth: pd.DataFrame):
         raise NotImplementedError
 
+    def perform_batch(self, predictions: pd.DataFrame, truth: pd.DataFrame) -> pd.DataFrame:
+        """
+        Computes the metric on the rankings of many users at once.
+        The rows of the predictions of each user must be in ranking order
+
+        Args:
+            predictions (pd.DataFrame): rankings of the users, whose columns are: from_id, to_id, rating
+            truth (pd.DataFrame): truth of the users, whose columns are: from_id, to_id, rating
+
+        Returns:
+            results (pd.DataFrame): has a 'from_id' column, with the users that have predictions,
+                and a column named as the metric with the result of each user
+        """
+        truth_dict = {user_id: user_truth for user_id, user_truth in truth.groupby('from_id', sort=False)}
+        user_id_list, result_list = [], []
+        for user_id, user_predictions in predictions.groupby('from_id', sort=False):
+            user_id_list.append(user_id)
+            result_list.append(self.perform(user_predictions, truth_dict.get(user_id, truth.iloc[:0])))
+        return pd.DataFrame({'from_id': user_id_list, str(self): result_list})
+
 
 class NDCG(RankingMetric):
     """
@@ -46,6 +65,15 @@ class NDCG(RankingMetric):
     def __str__(self):
         return "NDCG"
 
+    @staticmethod
+    def __get_discounts(positions: np.ndarray) -> np.ndarray:
+        """
+        Discount of each position of a ranking: 1 for the first position, log2(i + 1) for the i-th one
+        """
+        discounts = np.log2(positions + 1.0)
+        discounts[positions == 0] = 1.0
+        return discounts
+
     @staticmethod
     def perform_DCG(gain_values: pd.Series) -> List[float]:
         """
@@ -56,15 +84,33 @@ class NDCG(RankingMetric):
         Returns:
             dcg (List<float>): array of dcg
         """
-        if gain_values.size == 0:
-            return []
-        dcg = []
-        for i, gain in enumerate(gain_values):
-            if i == 0:
-                dcg.append(gain)
-            else:
-                dcg.append((gain / np.log2(i + 1)) + dcg[i - 1])
-        return dcg
+        gain_values = np.asarray(gain_values, dtype=float)
+        return np.cumsum(gain_values / NDCG.__get_discounts(np.arange(len(gain_values)))).tolist()
+
+    def __discretize(self, scores: np.ndarray) -> np.ndarray:
+        """
+        Maps each truth score to its relevance judgement: the class of the split range that contains it,
+        shifted to be positive, or the score shifted from range (-1, 1) to range (0, 2) if there is no split
+        """
+        scores = np.asarray(scores, dtype=float)
+        if self.__relevance_split is None or len(self.__relevance_split.keys()) == 0:
+            return scores + 1  # no negative, shift to range(0,2) from range (-1, 1)
+
+        non_negative_classes = [class_ for class_ in self.__relevance_split.keys()
+                                if class_ >= 0 and class_ == int(class_)]
+        if len(non_negative_classes) == 0:
+            raise ValueError("The relevance split must have a non negative class")
+        shift_class = min(non_negative_classes) + 1  # no negative
+
+        # if score not in split ranges
+        gains = np.where(scores > 0.0, max(self.__relevance_split.keys()), min(self.__relevance_split.keys()))
+        gains = gains.astype(float)
+        assigned = np.zeros(len(scores), dtype=bool)
+        for class_, (min_, max_) in self.__relevance_split.items():
+            in_range = ~assigned & (min_ <= scores) & (scores <= max_)  # assumption
+            gains[in_range] = class_ + shift_class
+            assigned |= in_range
+        return gains
 
     def perform(self, predictions: pd.DataFrame, truth: pd.DataFrame) -> float:
         """
@@ -76,40 +122,57 @@ class NDCG(RankingMetric):
         """
         logger.info("Computing NDCG")
 
-        def discrete(score_: float):
-            if self.__relevance_split is not None and len(self.__relevance_split.keys()) != 0:
-
-                shift_class = 0
-                while 0 + shift_class not in self.__relevance_split.keys():
-                    shift_class += 1
-                shift_class += 1  # no negative
-                for class_ in self.__relevance_split.keys():
-                    min_, max_ = self.__relevance_split[class_]
-                    if min_ <= score_ <= max_:  # assumption
-                        return class_ + shift_class
-
-                # if score_ not in split ranges
-                if score_ > 0.0:
-                    return max(self.__relevance_split.keys())
-                return min(self.__relevance_split.keys())
-
-            return score_ + 1  # no negative, shift to range(0,2) from range (-1, 1)
-
-        gain = []
-        for idx, row in predictions.iterrows():
-            label = row['to_id']
-            score = discrete(truth.rating[truth['to_id'] == label].values[0])
-            gain.append(score)
-        gain = np.array(gain)
-
-        igain = gain.copy()
-        igain[::-1].sort()
-        idcg = NDCG.perform_DCG(pd.Series(igain))
-        dcg = NDCG.perform_DCG(pd.Series(gain))
-        ndcg = [dcg[x] / (idcg[x]) for x in range(len(idcg))]
-        if len(ndcg) == 0:
+        if not predictions['to_id'].isin(truth['to_id']).all():
+            raise ValueError("Every predicted item must be in the truth")
+        if len(predictions) == 0:
             return 0.0
-        return statistics.mean(ndcg)
+
+        truth_scores = truth.drop_duplicates('to_id').set_index('to_id')['rating']
+        gain = self.__discretize(predictions['to_id'].map(truth_scores).values)
+        igain = np.sort(gain)[::-1]
+
+        discounts = self.__get_discounts(np.arange(len(gain)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ndcg = np.cumsum(gain / discounts) / np.cumsum(igain / discounts)
+        return float(np.mean(ndcg))
+
+    def perform_batch(self, predictions: pd.DataFrame, truth: pd.DataFrame) -> pd.DataFrame:
+        """
+        Computes the NDCG of the rankings of many users with a single join between predictions
+        and truth: the DCG and the ideal DCG of all the rankings are cumulative sums grouped by user
+
+        Args:
+            predictions (pd.DataFrame): rankings of the users, whose columns are: from_id, to_id, rating
+            truth (pd.DataFrame): truth of the users, whose columns are: from_id, to_id, rating
+
+        Returns:
+            results (pd.DataFrame): has a 'from_id' column, with the users that have predictions,
+                and a 'NDCG' column
+        """
+        logger.info("Computing NDCG")
+
+        frame = predictions[['from_id', 'to_id']].merge(
+            truth[['from_id', 'to_id', 'rating']].drop_duplicates(['from_id', 'to_id']),
+            on=['from_id', 'to_id'], how='left', indicator=True)
+        if (frame['_merge'] != 'both').any():
+            raise ValueError("Every predicted item must be in the truth of its user")
+
+        codes, users = pd.factorize(frame['from_id'])
+        gain = self.__discretize(frame['rating'].values)
+        positions = frame.groupby(codes, sort=False).cumcount().values
+
+        # both orders group the rows by user, in ranking order and in ideal order
+        order = np.lexsort((positions, codes))
+        ideal_order = np.lexsort((-gain, codes))
+        discounts = self.__get_discounts(positions[order])
+        sorted_codes = codes[order]
+        dcg = pd.Series(gain[order] / discounts).groupby(sorted_codes).cumsum().values
+        idcg = pd.Series(gain[ideal_order] / discounts).groupby(sorted_codes).cumsum().values
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ndcg = np.bincount(sorted_codes, weights=dcg / idcg, minlength=len(users)) / \
+                np.bincount(sorted_codes, minlength=len(users))
+        return pd.DataFrame({'from_id': users, str(self): ndcg})
 
 
 class Correlation(RankingMetric):
@@ -135,17 +198,29 @@ class Correlation(RankingMetric):
         """
         logger.info("Computing correlation")
 
-        truth_labels = pd.Series(truth['to_id'].values)
-        prediction_labels = pd.Series(predictions['to_id'].values)
-
-        t_series = pd.Series()
-        p_series = pd.Series()
-        for t_index, t_value in truth_labels.iteritems():
-            for p_index, p_value in prediction_labels.iteritems():
-                if t_value == p_value:
-                    t_series = t_series.append(pd.Series(int(t_index)))
-                    p_series = p_series.append(pd.Series(int(p_index)))
-        if t_series.size > 1:
+        pairs = self.__get_position_pairs(predictions.assign(from_id=0), truth.assign(from_id=0))
+        return self.__get_coefficient(pairs['t_index'].values, pairs['p_index'].values)
+
+    @staticmethod
+    def __get_position_pairs(predictions: pd.DataFrame, truth: pd.DataFrame) -> pd.DataFrame:
+        """
+        Joins the positions that each item has in the truth and in the predictions of a user,
+        with a single merge for all the users
+
+        Returns:
+            pairs (pd.DataFrame): whose columns are from_id, t_index (position in the truth)
+                and p_index (position in the predictions), sorted by user and positions
+        """
+        truth_positions = pd.DataFrame({'from_id': truth['from_id'].values, 'to_id': truth['to_id'].values,
+                                        't_index': truth.groupby('from_id', sort=False).cumcount().values})
+        prediction_positions = pd.DataFrame({'from_id': predictions['from_id'].values,
+                                             'to_id': predictions['to_id'].values,
+                                             'p_index': predictions.groupby('from_id', sort=False).cumcount().values})
+        pairs = truth_positions.merge(prediction_positions, on=['from_id', 'to_id'])
+        return pairs.sort_values(['from_id', 't_index', 'p_index'], kind='stable')
+
+    def __get_coefficient(self, t_series: np.ndarray, p_series: np.ndarray) -> float:
+        if len(t_series) > 1:
             coef, p = 0, 0
             if self.__method == 'pearson':
                 coef, p = pearsonr(t_series, p_series)
@@ -156,3 +231,53 @@ class Correlation(RankingMetric):
 
             return coef
         return 0.0
+
+    def perform_batch(self, predictions: pd.DataFrame, truth: pd.DataFrame) -> pd.DataFrame:
+        """
+        Computes the correlation of the rankings of many users, joining the positions of the items
+        in the truth and in the predictions of all the users with a single merge
+
+        Args:
+            predictions (pd.DataFrame): rankings of the users, whose columns are: from_id, to_id, rating
+            truth (pd.DataFrame): truth of the users, whose columns are: from_id, to_id, rating
+
+        Returns:
+            results (pd.DataFrame): has a 'from_id' column, with the users that have predictions,
+                and a column named as the method with the correlation of each user
+        """
+        logger.info("Computing correlation")
+
+        pairs = self.__get_position_pairs(predictions, truth)
+        if self.__method in ['pearson', 'spearman']:
+            return self.__get_grouped_coefficients(pairs, list(predictions['from_id'].unique()))
+
+        coefficient_dict = {
+            user_id: self.__get_coefficient(user_pairs['t_index'].values, user_pairs['p_index'].values)
+            for user_id, user_pairs in pairs.groupby('from_id', sort=False)}
+        user_id_list = list(predictions['from_id'].unique())
+        return pd.DataFrame({'from_id': user_id_list,
+                             str(self): [coefficient_dict.get(user_id, 0.0) for user_id in user_id_list]})
+
+    def __get_grouped_coefficients(self, pairs: pd.DataFrame, user_id_list: List) -> pd.DataFrame:
+        """
+        Computes the pearson correlation of the positions of every user at once, with sums grouped by user.
+        The spearman correlation is the pearson correlation of the ranks of the positions
+        """
+        if self.__method == 'spearman':
+            pairs = pairs.assign(t_index=pairs.groupby('from_id', sort=False)['t_index'].rank(),
+                                 p_index=pairs.groupby('from_id', sort=False)['p_index'].rank())
+
+        codes = pd.Categorical(pairs['from_id'], categories=user_id_list).codes
+        counts = np.bincount(codes, minlength=len(user_id_list))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_deviations = pairs['t_index'].values - (np.bincount(codes, pairs['t_index'].values,
+                                                                  minlength=len(user_id_list)) / counts)[codes]
+            p_deviations = pairs['p_index'].values - (np.bincount(codes, pairs['p_index'].values,
+                                                                  minlength=len(user_id_list)) / counts)[codes]
+            coefficients = np.bincount(codes, t_deviations * p_deviations, minlength=len(user_id_list)) / np.sqrt(
+                np.bincount(codes, t_deviations ** 2, minlength=len(user_id_list)) *
+                np.bincount(codes, p_deviations ** 2, minlength=len(user_id_list)))
+
+        # users with less than two pairs have correlation 0
+        coefficients = np.where(counts > 1, np.clip(coefficients, -1.0, 1.0), 0.0)
+        return pd.DataFrame({'from_id': user_id_list, str(self): coefficients})
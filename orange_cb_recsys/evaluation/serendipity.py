@@ -29,18 +29,11 @@ class Serendipity(Metric):
         """
 
         most_popular_items = popular_items(score_frame=truth)
-        users = set(predictions[['from_id']].values.flatten())
 
-        pop_ratios_sum = 0
-        for user in users:
-            recommended_items = predictions.query('from_id == @user')[['to_id']].values.flatten()
-            pop_items_count = 0
-            for item in recommended_items:
-                if item not in most_popular_items:
-                    pop_items_count += 1
+        # every user contributes the number of its not popular recommendations divided by num_of_recs
+        unexpected_recs_count = (~predictions['to_id'].isin(most_popular_items)).sum()
+        pop_ratios_sum = unexpected_recs_count / self.__num_of_recs
 
-            pop_ratios_sum += pop_items_count / self.__num_of_recs
-
-        serendipity = pop_ratios_sum / len(users)
+        serendipity = pop_ratios_sum / predictions['from_id'].nunique()
 
         return serendipity
@@ -29,9 +29,30 @@ def popular_items(score_frame: pd.DataFrame) -> Set[str]:
     return set(map(lambda x: x[0], most_common))
 
 
+def mean_by_user(from_id: pd.Series, values: np.ndarray) -> pd.Series:
+    """
+    Averages the values of the rows of each user in a single pass: the users are encoded
+    as integer codes, and the sums and the counts of the rows of every user are computed at once
+
+    Args:
+        from_id (pd.Series): user of each row
+        values (np.ndarray): value of each row
+
+    Returns:
+        (pd.Series): mean of the values of each user, indexed by 'from_id' in order of first appearance
+    """
+    codes, users = pd.factorize(from_id)
+    values = np.asarray(values, dtype=float)[codes >= 0]
+    codes = codes[codes >= 0]
+    sums = np.bincount(codes, weights=values, minlength=len(users))
+    counts = np.bincount(codes, minlength=len(users))
+    return pd.Series(sums / counts, index=users)
+
+
 def pop_ratio_by_user(score_frame: pd.DataFrame, most_pop_items: Set[str]) -> pd.DataFrame:
     """
-    Perform the popularity ratio for each user
+    Perform the popularity ratio for each user, that is the fraction of the distinct items
+    of the user that are popular
     Args:
         score_frame (pd.DataFrame): each row contains index(the rank position), label, value predicted
         most_pop_items (Set[str]): set of most popular 'to_id' labels
@@ -39,22 +60,11 @@ def pop_ratio_by_user(score_frame: pd.DataFrame, most_pop_items: Set[str]) -> pd
     Returns:
         (pd.DataFrame): contains the 'popularity_ratio' for each 'from_id' (user)
     """
-
-    # Splitting users by popularity
-    users = set(score_frame[['from_id']].values.flatten())
-
-    popularity_ratio_by_user = {}
-
-    for user in users:
-        # filters by the current user and returns all the items he has rated
-        rated_items = set(score_frame.query('from_id == @user')[['to_id']].values.flatten())
-        # interesects rated_items with popular_items
-        popular_rated_items = rated_items.intersection(most_pop_items)
-        popularity_ratio = len(popular_rated_items) / len(rated_items)
-
-        popularity_ratio_by_user[user] = popularity_ratio
-    return pd.DataFrame.from_dict({'from_id': list(popularity_ratio_by_user.keys()),
-                                   'popularity_ratio': list(popularity_ratio_by_user.values())})
+    rated_items = score_frame[['from_id', 'to_id']].drop_duplicates()
+    popularity_ratio_by_user = mean_by_user(rated_items['from_id'],
+                                            rated_items['to_id'].isin(most_pop_items).values)
+    return pd.DataFrame({'from_id': popularity_ratio_by_user.index,
+                         'popularity_ratio': popularity_ratio_by_user.values})
 
 
 def split_user_in_groups(score_frame: pd.DataFrame, groups: Dict[str, float], pop_items: Set[str]
@@ -102,11 +112,7 @@ def get_profile_avg_pop_ratio(users: Set[str], pop_ratio_by_users: pd.DataFrame)
     Returns:
         (float): average profile popularity ratio
     """
-    profile_pop_ratios = np.array([])
-    for user in users:
-        user_pop_ratio = pop_ratio_by_users.query('from_id == @user')[['popularity_ratio']].values.flatten()[0]
-        profile_pop_ratios = np.append(profile_pop_ratios, user_pop_ratio)
-    return profile_pop_ratios.mean()  # potrebbe essere sbagliato
+    return pop_ratio_by_users[pop_ratio_by_users['from_id'].isin(users)]['popularity_ratio'].mean()
 
 
 def get_recs_avg_pop_ratio(users: Set[str], recommendations: pd.DataFrame, most_popular_items: Set[str]) -> float:
@@ -120,15 +126,6 @@ def get_recs_avg_pop_ratio(users: Set[str], recommendations: pd.DataFrame, most_
     Returns:
         score (float): avg popularity ratio for recommendations
     """
-    pop_ratios = np.array([])
-    for user in users:
-        recommended_items = recommendations.query('from_id == @user')[['to_id']].values.flatten()
-
-        if len(recommended_items) > 0:
-            pop_items_count = 0
-            for item in recommended_items:
-                if item in most_popular_items:
-                    pop_items_count += 1
-
-            pop_ratios = np.append(pop_ratios, pop_items_count / len(recommended_items))
-    return pop_ratios.mean()  # potrebbe essere sbagliato
+    recommendations = recommendations[recommendations['from_id'].isin(users)]
+    pop_ratios = mean_by_user(recommendations['from_id'], recommendations['to_id'].isin(most_popular_items).values)
+    return pop_ratios.mean()
@@ -1,7 +1,9 @@
 from .config import RecSysConfig
+from .item_catalog import ItemCatalog
 from .recsys import RecSys
 from .ranking_algorithms import CentroidVector
 from .ranking_algorithms import ClassifierRecommender
 from .ranking_algorithms import CosineSimilarity
 from .ranking_algorithms import IndexQuery
 from .algorithm import Algorithm, RankingAlgorithm, ScorePredictionAlgorithm
+from .profile_cache import ProfileCache
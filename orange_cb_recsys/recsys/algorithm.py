@@ -1,8 +1,13 @@
+import os
 from abc import ABC
-from typing import Dict, List
+from typing import Dict, List, Tuple, Union
 import pandas as pd
 
 from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import EmbeddingMatrix, \
+    FeaturesBagMatrix
+from orange_cb_recsys.recsys.item_catalog import ItemCatalog
+from orange_cb_recsys.utils.load_content import load_representation_matrix
 
 
 class Algorithm(ABC):
@@ -26,6 +31,7 @@ class Algorithm(ABC):
         self.__additional_user_fields = additional_user_fields
         self.__item_field: str = item_field
         self.__item_field_representation: str = item_field_representation
+        self.__item_catalog: ItemCatalog = None
 
     def append_item_field(self, field: str, field_representation: str):
         self.__additional_item_fields[field] = field_representation
@@ -51,6 +57,37 @@ class Algorithm(ABC):
     def set_item_field_representation(self, item_field_representation: str):
         self.__item_field_representation = item_field_representation
 
+    def get_item_catalog(self) -> ItemCatalog:
+        return self.__item_catalog
+
+    def set_item_catalog(self, item_catalog: ItemCatalog):
+        self.__item_catalog = item_catalog
+
+    def get_representation_matrix(self, items_directory: str) \
+            -> Tuple[Union[EmbeddingMatrix, FeaturesBagMatrix], str]:
+        """
+        Gets the matrix of the item field representation: from the item catalog, if the algorithm
+        has one for items_directory, otherwise the matrix exported by the content analyzer
+
+        Args:
+            items_directory (str): Name of the directory where the items are stored.
+
+        Returns:
+            matrix (EmbeddingMatrix or FeaturesBagMatrix): None if there is no catalog and
+                the representation wasn't exported
+            source (str): 'matrix' if the matrix was exported by the content analyzer,
+                'catalog' if it was built by the item catalog from the items
+        """
+        if self.__item_catalog is not None and \
+                os.path.abspath(self.__item_catalog.get_items_directory()) == os.path.abspath(items_directory):
+            matrix = self.__item_catalog.get_matrix(self.__item_field, self.__item_field_representation)
+            if self.__item_catalog.is_exported(self.__item_field, self.__item_field_representation):
+                return matrix, "matrix"
+            return matrix, "catalog"
+
+        return load_representation_matrix(items_directory, self.__item_field, self.__item_field_representation), \
+            "matrix"
+
 
 class RankingAlgorithm(Algorithm):
     """
@@ -69,6 +106,40 @@ class RankingAlgorithm(Algorithm):
         """
         raise NotImplementedError
 
+    def predict_batch(self, user_id_list: List[str], ratings: pd.DataFrame, recs_number: int,
+                      items_directory: str) -> pd.DataFrame:
+        """
+        Computes the rankings of many users, using all the items that each user didn't rate as candidates.
+        The default implementation calls predict for each user, algorithms that can share the work
+        between the users (for example loading the items only once) should override it
+
+        Args:
+            user_id_list (List<str>): users for which recommendations will be computed
+            ratings (pd.DataFrame): ratings of the users in user_id_list
+            recs_number (int): How long the ranking of each user will be
+            items_directory (str): Name of the directory where the items are stored.
+
+        Returns:
+            score_frame (pd.DataFrame): DataFrame whose columns are the ids of the users (from_id),
+                the ids of the recommended items (to_id) and their scores (rating)
+        """
+        user_ratings_dict = {user_id: user_ratings for user_id, user_ratings in ratings.groupby('from_id')}
+
+        frame_list = []
+        for user_id in user_id_list:
+            user_ratings = user_ratings_dict.get(user_id, ratings.iloc[0:0])
+            user_ratings = user_ratings.sort_values(['to_id'], ascending=True)
+            score_frame = self.predict(user_id, user_ratings, recs_number, items_directory)
+            if score_frame is None:
+                continue
+            frame_list.append(pd.DataFrame({'from_id': user_id,
+                                            'to_id': score_frame.iloc[:, 0].values,
+                                            'rating': score_frame.iloc[:, 1].values}))
+
+        if len(frame_list) == 0:
+            return pd.DataFrame(columns=['from_id', 'to_id', 'rating'])
+        return pd.concat(frame_list, ignore_index=True)
+
 
 class ScorePredictionAlgorithm(Algorithm):
     """
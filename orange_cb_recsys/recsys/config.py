@@ -1,7 +1,11 @@
+from typing import List
+
 from orange_cb_recsys.recsys.algorithm import RankingAlgorithm, ScorePredictionAlgorithm
+from orange_cb_recsys.recsys.item_catalog import ItemCatalog
 
 from orange_cb_recsys.utils.load_ratings import load_ratings
 
+import numpy as np
 import pandas as pd
 
 
@@ -15,12 +19,15 @@ class RecSysConfig:
         ranking_algorithm (RankingAlgorithm): Ranking algorithm to use
         rating_frame: Can be the path to the directory in which the ratings .csv is stored, or a DataFrame
             that contains the ratings
+        item_catalog (ItemCatalog): catalog of the items of items_directory, shared by the algorithms
+            so that the representations of the items are loaded once for all the requests
     """
     def __init__(self, users_directory: str,
                  items_directory: str,
                  score_prediction_algorithm: ScorePredictionAlgorithm = None,
                  ranking_algorithm: RankingAlgorithm = None,
-                 rating_frame=None):
+                 rating_frame=None,
+                 item_catalog: ItemCatalog = None):
         self.__users_directory: str = users_directory
         self.__items_directory: str = items_directory
 
@@ -30,6 +37,9 @@ class RecSysConfig:
         if self.__score_prediction_algorithm is None and self.__ranking_algorithm is None:
             raise ValueError("You must set at least one algorithm")
 
+        self.__item_catalog: ItemCatalog = None
+        self.set_item_catalog(item_catalog)
+
         if type(rating_frame) is str:
             self.__rating_frame = load_ratings(rating_frame)
         else:
@@ -37,6 +47,10 @@ class RecSysConfig:
 
         self.__rating_frame['score'] = pd.to_numeric(self.__rating_frame["score"], downcast="float")
 
+        # built on first use by __build_user_index
+        self.__sorted_rating_frame: pd.DataFrame = None
+        self.__user_index: dict = None
+
     def get_users_directory(self):
         return self.__users_directory
 
@@ -52,17 +66,96 @@ class RecSysConfig:
     def get_rating_frame(self):
         return self.__rating_frame
 
+    def get_item_catalog(self) -> ItemCatalog:
+        return self.__item_catalog
+
+    def __build_user_index(self):
+        """
+        Sorts the rating frame by user, keeping the order of the ratings of each user, and maps
+        each user to the slice of its ratings. The user ids of the sorted frame are categorical,
+        so they are stored once
+        """
+        user_codes, user_id_array = pd.factorize(self.__rating_frame['from_id'])
+        # the ratings without user (code -1) are left out
+        order = np.argsort(user_codes, kind='stable')[np.count_nonzero(user_codes < 0):]
+
+        sorted_rating_frame = self.__rating_frame.iloc[order].reset_index(drop=True)
+        sorted_rating_frame['from_id'] = pd.Categorical.from_codes(user_codes[order], user_id_array)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(user_codes[order], minlength=len(user_id_array)))])
+
+        self.__sorted_rating_frame = sorted_rating_frame
+        self.__user_index = {user_id: (offsets[i], offsets[i + 1]) for i, user_id in enumerate(user_id_array)}
+
+    def __get_rows(self, row_index) -> pd.DataFrame:
+        rows = self.__sorted_rating_frame.iloc[row_index]
+        # the ratings are returned with the user ids of the rating frame, not with the categorical ones
+        return rows.assign(from_id=np.asarray(rows['from_id']))
+
+    def get_user_ratings(self, user_id: str) -> pd.DataFrame:
+        """
+        Gets the ratings of a user, as a slice of the rating frame sorted by user.
+        The index of the users is built on the first call
+
+        Args:
+            user_id (str): id of the user
+
+        Returns:
+            user_ratings (pd.DataFrame): ratings of the user, empty if the user has no ratings
+        """
+        if self.__user_index is None:
+            self.__build_user_index()
+
+        start, end = self.__user_index.get(user_id, (0, 0))
+        return self.__get_rows(slice(start, end))
+
+    def get_users_ratings(self, user_id_list: List[str]) -> pd.DataFrame:
+        """
+        Gets the ratings of many users, grouped by user in the order of user_id_list
+
+        Args:
+            user_id_list (List<str>): ids of the users
+
+        Returns:
+            users_ratings (pd.DataFrame): ratings of the users
+        """
+        if self.__user_index is None:
+            self.__build_user_index()
+
+        slice_list = [self.__user_index[user_id] for user_id in dict.fromkeys(user_id_list)
+                      if user_id in self.__user_index]
+        starts = np.array([start for start, _ in slice_list], dtype=np.int64)
+        lengths = np.array([end - start for start, end in slice_list], dtype=np.int64)
+        row_index = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return self.__get_rows(row_index)
+
     def set_users_directory(self, users_directory: str):
         self.__users_directory = users_directory
 
     def set_ranking_algorithm(self, ranking_algorithm: str):
         self.__ranking_algorithm = ranking_algorithm
+        self.__share_item_catalog()
 
     def set_score_prediction_algorithm(self, score_prediction_algorithm: str):
         self.__score_prediction_algorithm = score_prediction_algorithm
+        self.__share_item_catalog()
+
+    def set_item_catalog(self, item_catalog: ItemCatalog):
+        self.__item_catalog = item_catalog
+        self.__share_item_catalog()
+
+    def __share_item_catalog(self):
+        """
+        Gives the item catalog to the algorithms, the algorithms without a catalog
+        load the items from the items directory
+        """
+        for algorithm in [self.__ranking_algorithm, self.__score_prediction_algorithm]:
+            if algorithm is not None:
+                algorithm.set_item_catalog(self.__item_catalog)
 
     def set_items_directory(self, items_directory: str):
         self.__items_directory = items_directory
 
     def set_rating_frame(self, rating_frame: str):
         self.__rating_frame = rating_frame
+        self.__sorted_rating_frame = None
+        self.__user_index = None
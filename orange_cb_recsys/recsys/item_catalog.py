@@ -0,0 +1,200 @@
+import os
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+from sklearn.feature_extraction import DictVectorizer
+
+from orange_cb_recsys.content_analyzer.content_representation.content_field import EmbeddingField, \
+    FeaturesBagField
+from orange_cb_recsys.content_analyzer.content_representation.content_manifest import MANIFEST_FILE_NAME
+from orange_cb_recsys.content_analyzer.content_representation.content_store import STORE_FILE_NAME
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import EmbeddingMatrix, \
+    FeaturesBagMatrix, REPRESENTATIONS_DIRECTORY
+from orange_cb_recsys.utils.const import logger
+from orange_cb_recsys.utils.load_content import load_representation_matrix, load_content_store, iter_items
+
+
+class ItemCatalog:
+    """
+    Class that keeps in memory the representations of all the items of a directory, as matrices
+    with one row for each item, so that the ranking algorithms find the rated and the candidate items
+    without reading the items directory at each request.
+    The matrices exported by the content analyzer are used as they are, the other representations
+    are read from the items once and stacked (document embeddings) or vectorized (features bags).
+    When the items directory changes the matrices are loaded again.
+
+    The catalog can be held by a RecSysConfig, that shares it with its algorithms
+
+    Args:
+        items_directory (str): Path to the directory in which the items are stored
+        field_representation_list (List<Tuple<str, str>>): (field name, representation id) of the
+            representations loaded when the catalog is created, with a single read of the items.
+            Other representations are loaded when they are first requested
+    """
+
+    def __init__(self, items_directory: str, field_representation_list: List[Tuple[str, str]] = None):
+        self.__items_directory: str = items_directory
+        self.__field_representation_list: List[Tuple[str, str]] = []
+        self.__matrix_dict: Dict[Tuple[str, str], Union[EmbeddingMatrix, FeaturesBagMatrix]] = {}
+        self.__signature: tuple = self.__get_signature()
+
+        if field_representation_list is not None:
+            self.__load([(field_name, str(representation_id))
+                         for field_name, representation_id in field_representation_list])
+
+    def __getstate__(self):
+        # the matrices are loaded again by the copies, for example in the processes of a pool
+        return {'items_directory': self.__items_directory,
+                'field_representation_list': self.__field_representation_list}
+
+    def __setstate__(self, state):
+        self.__items_directory = state['items_directory']
+        self.__field_representation_list = list(state['field_representation_list'])
+        self.__matrix_dict = {}
+        self.__signature = None
+
+    def get_items_directory(self) -> str:
+        return self.__items_directory
+
+    def get_field_representation_list(self) -> List[Tuple[str, str]]:
+        return self.__field_representation_list
+
+    def __get_signature(self) -> tuple:
+        """
+        Modification times of the items directory and of the files that the content analyzer
+        writes again at every run, a different signature means that the items changed
+        """
+        signature = []
+        for path in [self.__items_directory,
+                     os.path.join(self.__items_directory, MANIFEST_FILE_NAME),
+                     os.path.join(self.__items_directory, STORE_FILE_NAME),
+                     os.path.join(self.__items_directory, REPRESENTATIONS_DIRECTORY)]:
+            try:
+                signature.append(os.path.getmtime(path))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def refresh(self) -> bool:
+        """
+        Loads again the representations of the catalog if the items directory changed
+        since they were loaded
+
+        Returns:
+            refreshed (bool): True if the representations were loaded again
+        """
+        signature = self.__get_signature()
+        if signature == self.__signature:
+            return False
+
+        logger.info("Items directory %s changed, reloading the item catalog", self.__items_directory)
+        self.__signature = signature
+        self.__matrix_dict = {}
+        self.__load(self.__field_representation_list)
+        return True
+
+    def __read_representations(self, field_representation_list: List[Tuple[str, str]]) -> Dict[tuple, tuple]:
+        """
+        Reads the given representations of all the items, reading each item once
+
+        Returns:
+            representation_dict: for each (field name, representation id), the list of the ids of the items
+                that have the representation and the list of the representations
+        """
+        representation_dict = {key: ([], []) for key in field_representation_list}
+        store = load_content_store(self.__items_directory)
+        if store is not None:
+            # only the requested representations are read from the store
+            for content_id in store.get_content_id_list():
+                for field_name, representation_id in field_representation_list:
+                    representation = store.get_representation(content_id, field_name, representation_id)
+                    if representation is not None:
+                        representation_dict[(field_name, representation_id)][0].append(content_id)
+                        representation_dict[(field_name, representation_id)][1].append(representation)
+            return representation_dict
+
+        for item in iter_items(self.__items_directory):
+            for field_name, representation_id in field_representation_list:
+                try:
+                    representation = item.get_field(field_name).get_representation(representation_id)
+                except KeyError:
+                    continue
+                representation_dict[(field_name, representation_id)][0].append(item.get_content_id())
+                representation_dict[(field_name, representation_id)][1].append(representation)
+
+        return representation_dict
+
+    def __load(self, field_representation_list: List[Tuple[str, str]]):
+        """
+        Loads the given representations: the exported matrices are opened, the representations
+        that weren't exported are read from the items with a single read and turned into matrices
+        """
+        try:
+            self.__load_matrices(field_representation_list)
+        finally:
+            # the representations that can't be loaded aren't loaded again at each refresh
+            for key in field_representation_list:
+                if key in self.__matrix_dict and key not in self.__field_representation_list:
+                    self.__field_representation_list.append(key)
+
+    def __load_matrices(self, field_representation_list: List[Tuple[str, str]]):
+        not_exported_list = []
+        for key in field_representation_list:
+            matrix = load_representation_matrix(self.__items_directory, *key)
+            if matrix is not None:
+                self.__matrix_dict[key] = matrix
+            else:
+                not_exported_list.append(key)
+
+        if len(not_exported_list) == 0:
+            return
+
+        logger.info("Loading the items of %s in the item catalog", self.__items_directory)
+        for key, (item_id_list, representation_list) in self.__read_representations(not_exported_list).items():
+            if len(representation_list) == 0:
+                raise ValueError("The representation %s of the field %s could not be found!" % (key[1], key[0]))
+
+            if all(isinstance(representation, EmbeddingField) for representation in representation_list):
+                item_matrix = np.array([representation.get_value() for representation in representation_list],
+                                       dtype=np.float32)
+                if item_matrix.ndim != 2:
+                    raise ValueError("The representation %s of the field %s is not a document embedding"
+                                     % (key[1], key[0]))
+                self.__matrix_dict[key] = EmbeddingMatrix.from_matrix(item_matrix, item_id_list)
+            elif all(isinstance(representation, FeaturesBagField) for representation in representation_list):
+                vectorizer = DictVectorizer(dtype=np.float32, sparse=True)
+                item_matrix = vectorizer.fit_transform(
+                    [representation.get_value() for representation in representation_list]).tocsr()
+                self.__matrix_dict[key] = FeaturesBagMatrix.from_matrix(
+                    item_matrix, dict(vectorizer.vocabulary_), item_id_list)
+            else:
+                raise ValueError("The representation %s of the field %s must be an embedding or a features bag"
+                                 % (key[1], key[0]))
+
+    def get_matrix(self, field_name: str, representation_id: str) -> Union[EmbeddingMatrix, FeaturesBagMatrix]:
+        """
+        Gets the matrix of a representation of the items, the representation is loaded if it
+        wasn't loaded yet, and all the representations are loaded again if the items directory changed
+
+        Args:
+            field_name (str): name of the field
+            representation_id (str): id of the representation
+
+        Returns:
+            matrix (EmbeddingMatrix or FeaturesBagMatrix): matrix with one row for each item
+
+        Raises:
+            ValueError: if the representation is not a document embedding or a features bag
+        """
+        self.refresh()
+        key = (field_name, str(representation_id))
+        if key not in self.__matrix_dict:
+            self.__load([key])
+        return self.__matrix_dict[key]
+
+    def is_exported(self, field_name: str, representation_id: str) -> bool:
+        """
+        Checks if the matrix of a representation is the one exported by the content analyzer
+        """
+        return load_representation_matrix(self.__items_directory, field_name, str(representation_id)) is \
+            self.get_matrix(field_name, representation_id)
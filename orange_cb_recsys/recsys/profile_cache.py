@@ -0,0 +1,200 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import List
+
+import pandas as pd
+
+from orange_cb_recsys.content_analyzer.content_representation.content_manifest import MANIFEST_FILE_NAME
+from orange_cb_recsys.content_analyzer.content_representation.content_store import STORE_FILE_NAME
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import REPRESENTATIONS_DIRECTORY
+from orange_cb_recsys.utils.const import logger
+
+_NOT_LOADED = object()
+_PROFILE_SUFFIX = '.profile'
+
+
+class ProfileCache:
+    """
+    Cache of the user profiles computed by the ranking algorithms, for example the centroid
+    of the positive rated items or a fitted classifier. A profile is identified by a key derived
+    from the user, the configuration of the algorithm, a hash of the user ratings and the version
+    of the item catalog, so the profile is computed again only if the ratings of the user
+    or the items change.
+
+    When the cache is full the least recently used profile is evicted.
+    If a directory is given every profile is also saved in it, so that the cache survives
+    the process; the profiles saved in the directory are loaded only when requested
+
+    Args:
+        max_size (int): maximum number of profiles in the cache
+        cache_directory (str): directory in which the profiles are saved,
+            if None the cache is kept only in memory
+    """
+
+    def __init__(self, max_size: int = 1000, cache_directory: str = None):
+        if max_size < 1:
+            raise ValueError("The size of the cache must be positive")
+        self.__max_size: int = max_size
+        self.__cache_directory: str = cache_directory
+        self.__profile_dict: OrderedDict = OrderedDict()
+
+        if cache_directory is not None:
+            os.makedirs(cache_directory, exist_ok=True)
+            file_name_list = [file_name for file_name in os.listdir(cache_directory)
+                              if file_name.endswith(_PROFILE_SUFFIX)]
+            file_name_list.sort(key=lambda file_name: os.path.getmtime(os.path.join(cache_directory, file_name)))
+            for file_name in file_name_list:
+                self.__profile_dict[file_name[:-len(_PROFILE_SUFFIX)]] = _NOT_LOADED
+            self.__evict()
+
+    def get_max_size(self) -> int:
+        return self.__max_size
+
+    def get_cache_directory(self) -> str:
+        return self.__cache_directory
+
+    @staticmethod
+    def get_catalog_version(items_directory: str) -> tuple:
+        """
+        Computes the version of the items of a directory from the modification times and sizes
+        of the files that the content analyzer writes again at every run: the manifest,
+        the columnar store and the exported matrices.
+        An incremental run rewrites the items in the same directory, so the version changes
+
+        Args:
+            items_directory (str): Path to the directory in which the items are stored
+
+        Returns:
+            catalog_version (tuple): for each file, its modification time in nanoseconds and its size,
+                None if the file doesn't exist
+        """
+        path_list = [items_directory,
+                     os.path.join(items_directory, MANIFEST_FILE_NAME),
+                     os.path.join(items_directory, STORE_FILE_NAME)]
+        representations_directory = os.path.join(items_directory, REPRESENTATIONS_DIRECTORY)
+        if os.path.isdir(representations_directory):
+            path_list.extend(os.path.join(representations_directory, file_name)
+                             for file_name in sorted(os.listdir(representations_directory)))
+
+        catalog_version = []
+        for path in path_list:
+            try:
+                stat = os.stat(path)
+                catalog_version.append((os.path.basename(path), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                catalog_version.append(None)
+        return tuple(catalog_version)
+
+    @staticmethod
+    def get_key(user_id: str, algorithm_key_parts: List, ratings: pd.DataFrame,
+                catalog_version: tuple = None) -> str:
+        """
+        Computes the key of a profile
+
+        Args:
+            user_id (str): id of the user
+            algorithm_key_parts (list): parameters of the algorithm that change the profile,
+                for example the item field and its representation
+            ratings (pd.DataFrame): ratings of the user, only the to_id and score columns are
+                considered and the order of the rows doesn't matter
+            catalog_version (tuple): version of the items from which the profile is computed,
+                computed by get_catalog_version
+
+        Returns:
+            key (str): hexadecimal sha1 digest
+        """
+        rating_rows = ratings[['to_id', 'score']].astype({'to_id': str, 'score': float})
+        rating_rows = rating_rows.sort_values(['to_id', 'score']).reset_index(drop=True)
+
+        digest = hashlib.sha1()
+        digest.update(repr((str(user_id), [str(part) for part in algorithm_key_parts])).encode())
+        if catalog_version is not None:
+            digest.update(repr(catalog_version).encode())
+        digest.update(pd.util.hash_pandas_object(rating_rows, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def __get_path(self, key: str) -> str:
+        return os.path.join(self.__cache_directory, key + _PROFILE_SUFFIX)
+
+    def __evict(self):
+        while len(self.__profile_dict) > self.__max_size:
+            key, _ = self.__profile_dict.popitem(last=False)
+            if self.__cache_directory is not None:
+                try:
+                    os.remove(self.__get_path(key))
+                except FileNotFoundError:
+                    pass
+
+    def get(self, key: str):
+        """
+        Gets a profile and marks it as the most recently used
+
+        Args:
+            key (str): key of the profile, computed by get_key
+
+        Returns:
+            profile: None if the profile is not in the cache
+        """
+        if key not in self.__profile_dict:
+            return None
+
+        profile = self.__profile_dict[key]
+        if profile is _NOT_LOADED:
+            try:
+                with open(self.__get_path(key), 'rb') as profile_file:
+                    profile = pickle.load(profile_file)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                logger.warning("Profile %s could not be loaded from the cache", key)
+                del self.__profile_dict[key]
+                return None
+            self.__profile_dict[key] = profile
+
+        self.__profile_dict.move_to_end(key)
+        if self.__cache_directory is not None:
+            try:
+                os.utime(self.__get_path(key))
+            except OSError:
+                pass
+
+        return profile
+
+    def put(self, key: str, profile):
+        """
+        Adds a profile to the cache, evicting the least recently used profile if the cache is full
+
+        Args:
+            key (str): key of the profile, computed by get_key
+            profile: the profile, it must be picklable if the cache has a directory
+        """
+        self.__profile_dict[key] = profile
+        self.__profile_dict.move_to_end(key)
+
+        if self.__cache_directory is not None:
+            # the profile is written in a temporary file and then moved, so a profile file is never partial
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.__cache_directory)
+            with os.fdopen(file_descriptor, 'wb') as profile_file:
+                pickle.dump(profile, profile_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.__get_path(key))
+
+        self.__evict()
+
+    def clear(self):
+        """
+        Removes all the profiles from the cache
+        """
+        if self.__cache_directory is not None:
+            for key in self.__profile_dict.keys():
+                try:
+                    os.remove(self.__get_path(key))
+                except FileNotFoundError:
+                    pass
+        self.__profile_dict.clear()
+
+    def __contains__(self, key: str):
+        return key in self.__profile_dict
+
+    def __len__(self):
+        return len(self.__profile_dict)
@@ -1,16 +1,26 @@
-from typing import List
+import os
+import re
+from itertools import islice
+from typing import List, Union
 
 from sklearn.feature_extraction import DictVectorizer
 from scipy import sparse
 from orange_cb_recsys.content_analyzer.content_representation.content import Content
 from orange_cb_recsys.recsys.algorithm import RankingAlgorithm
-from orange_cb_recsys.recsys.ranking_algorithms.similarities import Similarity, DenseVector, SparseVector
+from orange_cb_recsys.recsys.profile_cache import ProfileCache
+from orange_cb_recsys.recsys.ranking_algorithms.similarities import Similarity, CosineSimilarity
 from orange_cb_recsys.content_analyzer.content_representation.content_field import EmbeddingField, FeaturesBagField
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import EmbeddingMatrix, \
+    FeaturesBagMatrix
 import pandas as pd
 import numpy as np
 
 from orange_cb_recsys.utils.const import logger
-from orange_cb_recsys.utils.load_content import get_unrated_items, get_rated_items, load_content_instance
+from orange_cb_recsys.utils.load_content import get_unrated_items, get_rated_items, load_content_instance, \
+    get_all_items, load_ann_index, load_inverted_index
+
+# maximum number of similarities computed at once by predict_batch
+_SIMILARITIES_CHUNK_SIZE = 1 << 22
 
 
 class CentroidVector(RankingAlgorithm):
@@ -23,64 +33,369 @@ class CentroidVector(RankingAlgorithm):
         similarity (Similarity): Kind of similarity to use
         threshold (int): Threshold for the ratings. If the rating is greater than the threshold, it will be considered
         as positive
+        profile_cache (ProfileCache): cache in which the centroids of the users are stored,
+            if None the centroid is computed at every prediction
+        ann_n_probe (int): if the content analyzer built an ANN index on the embedding matrix of the
+            representation, predict compares the centroid only with the items of the ann_n_probe
+            lists of the index most similar to it. If None the centroid is compared with every item
     """
 
-    def __init__(self, item_field: str, field_representation: str, similarity: Similarity, threshold: int = 0):
+    def __init__(self, item_field: str, field_representation: str, similarity: Similarity, threshold: int = 0,
+                 profile_cache: ProfileCache = None, ann_n_probe: int = None):
         super().__init__(item_field, field_representation)
         self.__similarity = similarity
         self.__threshold = threshold
+        self.__profile_cache: ProfileCache = profile_cache
+        if ann_n_probe is not None and int(ann_n_probe) < 1:
+            raise ValueError("ann_n_probe must be positive")
+        self.__ann_n_probe: int = None if ann_n_probe is None else int(ann_n_probe)
+
+    def get_profile_cache(self) -> ProfileCache:
+        return self.__profile_cache
 
-    def __get_centroid_with_vectorizer(self, ratings: pd.DataFrame, rated_items, unrated_items):
+    def set_profile_cache(self, profile_cache: ProfileCache):
+        self.__profile_cache = profile_cache
+
+    def __get_profile(self, user_id: str, ratings: pd.DataFrame, items_directory: str, source: str,
+                      compute_profile):
+        """
+        Gets the centroid of the user from the profile cache, computing it with compute_profile
+        if it is not cached or if there is no cache
+
+        Args:
+            source (str): where the centroid is computed from, centroids computed from the exported
+                matrices and from the items are not interchangeable
+            compute_profile: function without arguments that computes the centroid
+        """
+        if self.__profile_cache is None:
+            return compute_profile()
+
+        key = ProfileCache.get_key(user_id, ["CentroidVector", self.get_item_field(),
+                                             self.get_item_field_representation(), self.__threshold,
+                                             os.path.abspath(items_directory), source], ratings,
+                                   ProfileCache.get_catalog_version(items_directory))
+        profile = self.__profile_cache.get(key)
+        if profile is None:
+            profile = compute_profile()
+            self.__profile_cache.put(key, profile)
+        else:
+            logger.info("Centroid of user %s found in the profile cache", user_id)
+
+        return profile
+
+    def __get_centroid(self, ratings: pd.DataFrame, items_directory: str):
         """
-        1) For each rated item, checks if its rating is bigger than threshold. If false, skips
-            to the next item, if True add the item embedding array in a dictionary list taht will be
-            transformed in a scipy  csr_matrix (sparse) using sklearn DictVectorizer
-        2) Computes the centroid of the obtained sparse matrix
+        1) Loads the rated items and checks that the representation exists and is a document embedding
+            or a features bag
+        2) For each rated item, checks if its rating is bigger than threshold. If false, skips
+            to the next item, if True adds the item representation to the positive ones
+        3) Computes the centroid of the positive representations
 
         Args:
             ratings (pd.DataFrame): DataFrame containing the ratings.
+            items_directory (str): Name of the directory where the items are stored.
 
         Returns:
-            centroid (sparse.csr_matrix): Sparse matrix that represents the centroid vector of the
-            given item representations
+            centroid (np.ndarray or dict<str, float>): numpy array that represents the centroid of
+                document embeddings, or dict that represents the centroid of features bags
         """
+        logger.info("Retrieving rated items")
+        rated_items = [item for item in get_rated_items(items_directory, ratings) if item is not None]
+        if len(rated_items) == 0:
+            raise ValueError("The user has no rated items, so the centroid can not be calculated")
+
+        first_item = rated_items[0]
+        if self.get_item_field() not in first_item.get_field_list():
+            raise ValueError("The field name specified could not be found!")
+        try:
+            representation = first_item.get_field(self.get_item_field()).get_representation(
+                self.get_item_field_representation())
+        except KeyError:
+            raise ValueError("The given representation id wasn't found for the specified field")
+
+        if not isinstance(representation, EmbeddingField) and not isinstance(representation, FeaturesBagField):
+            raise ValueError("The given representation must be an embedding or a tf-idf vector")
 
-        dv = DictVectorizer(sparse=True)
+        if isinstance(representation, EmbeddingField):
+            if len(representation.get_value().shape) != 1:
+                raise ValueError("The specified representation is not a document embedding, so the centroid"
+                                 " can not be calculated")
 
-        positive_rated_items = [
+        logger.info("Computing centroid")
+        score_dict = dict(zip([re.sub(r'[^\w\s]', '', item_id) for item_id in ratings.to_id],
+                              pd.to_numeric(ratings.score)))
+        positive_rated_list = [
             item.get_field(self.get_item_field()).get_representation(self.get_item_field_representation()).get_value()
             for item in rated_items
-            if float(ratings[ratings['to_id'] == item.get_content_id()].score) >= self.__threshold]
+            if score_dict[re.sub(r'[^\w\s]', '', item.get_content_id())] >= self.__threshold]
+        if len(positive_rated_list) == 0:
+            raise ValueError("The user has no positive rated items, so the centroid can not be calculated")
 
-        dicts = positive_rated_items + \
-                [item.get_field(self.get_item_field()).get_representation(
-                    self.get_item_field_representation()).get_value() for item in unrated_items]
+        if isinstance(representation, EmbeddingField):
+            return np.array(positive_rated_list).mean(axis=0)
 
-        matrix = dv.fit_transform(dicts)
-        return sparse.csr_matrix(matrix.mean(axis=0).getA()), matrix[
-                                                              len(rated_items):len(rated_items) + len(unrated_items)]
+        centroid = {}
+        for features in positive_rated_list:
+            for feature, value in features.items():
+                centroid[feature] = centroid.get(feature, 0) + value
+        return {feature: value / len(positive_rated_list) for feature, value in centroid.items()}
 
-    def __get_centroid_without_vectorizer(self, ratings: pd.DataFrame, rated_items) -> np.ndarray:
+    @staticmethod
+    def __get_top_k_index(similarities: np.ndarray, recs_number: int) -> np.ndarray:
         """
-        1) For each rated item, checks if its rating is bigger than threshold. If false, skips
-            to the next item, if True add the item embedding array in a matrix
-        2) Computes the centroid of the obtained matrix
+        Selects the positions of the recs_number highest similarities using np.argpartition,
+        so that only the selected positions are sorted
 
         Args:
-            ratings (pd.DataFrame): DataFrame containing the ratings.
+            similarities (np.ndarray): similarity of each item
+            recs_number (int): How long the ranking will be
 
         Returns:
-            centroid (np.array): numpy array that represents the centroid vector of the
-            given item representations
+            top_index (np.ndarray): positions of the best similarities, sorted by similarity
+        """
+        k = max(0, min(recs_number, len(similarities)))
+        if 0 < k < len(similarities):
+            top_index = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top_index = np.arange(k)
+        return top_index[np.argsort(-similarities[top_index], kind='stable')]
+
+    def __get_top_k(self, item_id_list: List[str], similarities: np.ndarray, recs_number: int) -> pd.DataFrame:
         """
+        Builds the ranking of the recs_number items with the highest similarity
 
-        arrays = []
-        for item in rated_items:
-            representation = item.get_field(self.get_item_field()).get_representation(
-                self.get_item_field_representation())
-            if float(ratings[ratings['to_id'] == item.get_content_id()].score) >= self.__threshold:
-                arrays.append(representation.get_value())
-        return np.array(arrays).mean(axis=0)
+        Returns:
+             scores (pd.DataFrame): DataFrame whose columns are the ids of the items (to_id), and the similarities
+                between the items and the centroid (rating), sorted by similarity
+        """
+        top_index = self.__get_top_k_index(similarities, recs_number)
+        return pd.DataFrame({"to_id": [item_id_list[i] for i in top_index],
+                             "rating": similarities[top_index]})
+
+    def __get_item_matrix(self, items_directory: str):
+        """
+        Gets the representations of all the items as a single matrix: the matrix exported by the content
+        analyzer if it exists, otherwise the items are loaded once and their representations are stacked
+        (document embeddings) or vectorized (features bags)
+
+        Returns:
+            item_id_list (List<str>): ids of the items, in row order
+            item_matrix (np.ndarray or sparse.csr_matrix): matrix with one row for each item
+        """
+        matrix, _ = self.get_representation_matrix(items_directory)
+        if matrix is not None:
+            return matrix.get_content_id_list(), matrix.get_matrix()
+
+        items = [item for item in get_all_items(items_directory) if item is not None]
+        try:
+            representation_list = [item.get_field(self.get_item_field()).get_representation(
+                self.get_item_field_representation()) for item in items]
+        except KeyError:
+            raise ValueError("The field name or the representation id specified could not be found!")
+
+        item_id_list = [item.get_content_id() for item in items]
+        if all(isinstance(representation, EmbeddingField) for representation in representation_list):
+            item_matrix = np.array([representation.get_value() for representation in representation_list])
+            if item_matrix.ndim != 2:
+                raise ValueError("The specified representation is not a document embedding, so the centroid"
+                                 " can not be calculated")
+        elif all(isinstance(representation, FeaturesBagField) for representation in representation_list):
+            item_matrix = DictVectorizer(sparse=True).fit_transform(
+                [representation.get_value() for representation in representation_list])
+        else:
+            raise ValueError("The given representation must be an embedding or a tf-idf vector")
+
+        return item_id_list, item_matrix
+
+    def __get_ann_index(self, matrix: Union[EmbeddingMatrix, FeaturesBagMatrix], items_directory: str):
+        """
+        Gets the ANN index of the representation if it must be used: ann_n_probe is set, the matrix is
+        an embedding matrix and the index was built on the current version of the matrix
+
+        Returns:
+            index (ANNIndex): None if the index must not be used
+        """
+        if self.__ann_n_probe is None or not isinstance(matrix, EmbeddingMatrix):
+            return None
+
+        index = load_ann_index(items_directory, self.get_item_field(), self.get_item_field_representation())
+        if index is not None and index.get_row_count() != matrix.get_matrix().shape[0]:
+            logger.warning("The ANN index doesn't match the embedding matrix, it won't be used")
+            return None
+        return index
+
+    def __get_top_k_with_inverted_index(self, matrix: FeaturesBagMatrix, centroid: np.ndarray,
+                                        ratings: pd.DataFrame, recs_number: int, items_directory: str):
+        """
+        Builds the ranking with the inverted index of the features bag matrix, if the content analyzer built it
+        and the similarity is the cosine similarity: only the items that share features with the centroid
+        are scored. If they are less than recs_number, the ranking is completed with other unrated items,
+        whose similarity is 0, as when all the items are scored
+
+        Returns:
+             scores (pd.DataFrame): the ranking, None if the index can't be used
+        """
+        if not isinstance(self.__similarity, CosineSimilarity) or not isinstance(matrix, FeaturesBagMatrix):
+            return None
+        index = load_inverted_index(items_directory, self.get_item_field(), self.get_item_field_representation())
+        if index is None:
+            return None
+        if index.get_row_count() != matrix.get_matrix().shape[0]:
+            logger.warning("The inverted index doesn't match the features bag matrix, it won't be used")
+            return None
+
+        rated_rows = np.array([matrix.get_row_index(item_id) for item_id in ratings.to_id if item_id in matrix],
+                              dtype=np.int64)
+        rows, similarities = index.get_top_k(centroid, recs_number, rated_rows)
+        content_id_list = matrix.get_content_id_list()
+        item_id_list = [content_id_list[row] for row in rows]
+
+        if len(item_id_list) < recs_number:
+            excluded_rows = set(rated_rows) | set(rows)
+            padding = list(islice((content_id for row, content_id in enumerate(content_id_list)
+                                   if row not in excluded_rows), recs_number - len(item_id_list)))
+            item_id_list.extend(padding)
+            similarities = np.concatenate([similarities, np.zeros(len(padding))])
+
+        return pd.DataFrame({"to_id": item_id_list, "rating": similarities})
+
+    def __predict_with_matrix(self, user_id: str, matrix: Union[EmbeddingMatrix, FeaturesBagMatrix], source: str,
+                              ratings: pd.DataFrame, recs_number: int, items_directory: str,
+                              candidate_item_id_list: List = None) -> pd.DataFrame:
+        """
+        Computes the ranking using the matrix exported by the content analyzer or built by the item catalog,
+        instead of loading the items: the centroid is the mean of the rows of the positive rated items,
+        and all the candidate items are scored with a single call to the similarity.
+        The indexes built by the content analyzer are used only with the exported matrix
+
+        Args:
+            user_id: user for which recommendations will be computed
+            matrix (EmbeddingMatrix or FeaturesBagMatrix): matrix of the item field representation
+            source (str): 'matrix' if the matrix was exported, 'catalog' if it was built by the item catalog
+            ratings (pd.DataFrame): ratings of the user
+            recs_number (int): How long the ranking will be
+            items_directory (str): Name of the directory where the items are stored.
+            candidate_item_id_list: list of the items that can be recommended, if None
+                all unrated items will be used
+
+        Returns:
+             scores (pd.DataFrame): DataFrame whose columns are the ids of the items (to_id), and the similarities
+                between the items and the centroid (rating)
+        """
+        def compute_centroid():
+            logger.info("Computing centroid")
+            positive_ratings = ratings[pd.to_numeric(ratings['score']) >= self.__threshold]
+            positive_rated_rows = matrix.get_rows(list(positive_ratings.to_id))
+            if positive_rated_rows.shape[0] == 0:
+                raise ValueError("The user has no positive rated items, so the centroid can not be calculated")
+            return np.asarray(positive_rated_rows.mean(axis=0)).ravel()
+
+        centroid = self.__get_profile(user_id, ratings, items_directory, source, compute_centroid)
+
+        logger.info("Retrieving candidate items")
+        if candidate_item_id_list is None:
+            rated_items_filename_list = set([re.sub(r'[^\w\s]', '', item_id) for item_id in ratings.to_id])
+            candidate_item_id_list = matrix.get_content_id_list()
+
+            scores = None
+            if source == "matrix":
+                scores = self.__get_top_k_with_inverted_index(matrix, centroid, ratings, recs_number,
+                                                              items_directory)
+            if scores is not None:
+                return scores
+
+            index = self.__get_ann_index(matrix, items_directory) if source == "matrix" else None
+            if index is not None:
+                # the rated items found by the index are excluded, so they are added to the items asked for
+                candidate_rows = index.get_candidate_rows(
+                    centroid, recs_number + len(rated_items_filename_list), self.__ann_n_probe)
+                candidate_item_id_list = [candidate_item_id_list[row] for row in candidate_rows]
+
+            candidate_item_id_list = [item_id for item_id in candidate_item_id_list
+                                      if re.sub(r'[^\w\s]', '', item_id) not in rated_items_filename_list]
+        candidate_item_id_list = [item_id for item_id in candidate_item_id_list if item_id in matrix]
+
+        logger.info("Computing similarities")
+        similarities = self.__similarity.perform_batch(centroid, matrix.get_rows(candidate_item_id_list))
+
+        return self.__get_top_k(candidate_item_id_list, similarities, recs_number)
+
+    def predict_batch(self, user_id_list: List[str], ratings: pd.DataFrame, recs_number: int,
+                      items_directory: str) -> pd.DataFrame:
+        """
+        Computes the rankings of many users loading the items only once.
+        The centroids of all the users are computed as a single matrix, and they are compared
+        with all the items in chunks of users, with a single call to the similarity for each chunk.
+        The items rated by a user are never recommended to them; users without positive rated
+        items are skipped
+
+        Args:
+            user_id_list (List<str>): users for which recommendations will be computed
+            ratings (pd.DataFrame): ratings of the users in user_id_list
+            recs_number (int): How long the ranking of each user will be
+            items_directory (str): Name of the directory where the items are stored.
+
+        Returns:
+            score_frame (pd.DataFrame): DataFrame whose columns are the ids of the users (from_id),
+                the ids of the recommended items (to_id) and the similarities between the items
+                and the centroid of the user (rating)
+        """
+        logger.info("Loading items")
+        item_id_list, item_matrix = self.__get_item_matrix(items_directory)
+
+        row_dict = {}
+        for row, item_id in enumerate(item_id_list):
+            row_dict.setdefault(re.sub(r'[^\w\s]', '', item_id), row)
+        for row, item_id in enumerate(item_id_list):
+            row_dict[item_id] = row
+
+        logger.info("Computing centroids")
+        user_ratings_dict = {user_id: user_ratings for user_id, user_ratings in ratings.groupby('from_id')}
+        scored_user_list = []
+        rated_index_list = []
+        weight_rows, weight_columns, weight_values = [], [], []
+        for user_id in user_id_list:
+            user_ratings = user_ratings_dict.get(user_id)
+            if user_ratings is None:
+                logger.warning("User %s has no ratings, no ranking will be computed", user_id)
+                continue
+
+            positive_ratings = user_ratings[pd.to_numeric(user_ratings['score']) >= self.__threshold]
+            positive_index = [row_dict[item_id] for item_id in positive_ratings.to_id if item_id in row_dict]
+            if len(positive_index) == 0:
+                logger.warning("User %s has no positive rated items, so the centroid can not be calculated", user_id)
+                continue
+
+            weight_rows.extend([len(scored_user_list)] * len(positive_index))
+            weight_columns.extend(positive_index)
+            weight_values.extend([1 / len(positive_index)] * len(positive_index))
+            rated_index_list.append([row_dict[item_id] for item_id in user_ratings.to_id if item_id in row_dict])
+            scored_user_list.append(user_id)
+
+        # each centroid is the mean of the rows of the positive rated items
+        weights = sparse.csr_matrix((weight_values, (weight_rows, weight_columns)),
+                                    shape=(len(scored_user_list), len(item_id_list)))
+        centroid_matrix = weights @ item_matrix
+
+        logger.info("Computing similarities")
+        # the items are compared with every chunk of users, so they are prepared once
+        prepared_item_matrix = self.__similarity.prepare_matrix(item_matrix)
+        from_id_list, to_id_list, rating_list = [], [], []
+        chunk_size = max(1, _SIMILARITIES_CHUNK_SIZE // max(1, len(item_id_list)))
+        for start in range(0, len(scored_user_list), chunk_size):
+            similarities = self.__similarity.perform_pairwise(centroid_matrix[start:start + chunk_size],
+                                                              prepared_item_matrix, other_prepared=True)
+            for offset, user_similarities in enumerate(similarities):
+                user_similarities = user_similarities.astype(np.float64)
+                user_similarities[rated_index_list[start + offset]] = -np.inf
+                top_index = self.__get_top_k_index(user_similarities, recs_number)
+                top_index = top_index[np.isfinite(user_similarities[top_index])]
+
+                from_id_list.extend([scored_user_list[start + offset]] * len(top_index))
+                to_id_list.extend([item_id_list[i] for i in top_index])
+                rating_list.extend(user_similarities[top_index])
+
+        return pd.DataFrame({'from_id': from_id_list, 'to_id': to_id_list, 'rating': rating_list})
 
     def predict(self, user_id: str, ratings: pd.DataFrame, recs_number: int, items_directory: str,
                 candidate_item_id_list: List = None) -> pd.DataFrame:
@@ -93,11 +408,18 @@ class CentroidVector(RankingAlgorithm):
         representation of each "Plot" field is a document embedding or a tf-idf words bag, and then use the embedding
         or the frequency vector for algorithm computation.
 
-        Computes the centroid of the positive rated items representations
+        Computes the centroid of the positive rated items representations, or gets it from the profile cache
+        if the ratings of the user didn't change.
+        If the content analyzer exported the matrix of the representation (embedding or features bag), the centroid
+        and the similarities are computed on the matrix, without loading the items
 
-        For each candidate item:
-        1) Takes the embedding arrays
-        2) Determines the similarity between the centroid and the field_representation of the item_field in candidate item.
+        The representations of the candidate items are stacked in a matrix, and the similarities between
+        the centroid and all the candidate items are computed with a single call to the similarity.
+        Only the best recs_number items are sorted.
+        If ann_n_probe is set and no candidate list is given, only the items found by the ANN index
+        of the embedding matrix are compared with the centroid. In the same way, if the content analyzer
+        built the inverted index of the features bag matrix and the similarity is the cosine similarity,
+        only the items that share features with the centroid are scored.
 
         Args:
             candidate_item_id_list: list of the items that can be recommended, if None
@@ -113,67 +435,35 @@ class CentroidVector(RankingAlgorithm):
         """
 
         try:
+            matrix, source = self.get_representation_matrix(items_directory)
+            if matrix is not None:
+                return self.__predict_with_matrix(user_id, matrix, source, ratings, recs_number, items_directory,
+                                                  candidate_item_id_list)
+
             logger.info("Retrieving candidate items")
             if candidate_item_id_list is None:
                 unrated_items = get_unrated_items(items_directory, ratings)
             else:
                 unrated_items = [load_content_instance(items_directory, item_id) for item_id in candidate_item_id_list]
 
-            logger.info("Retrieving rated items")
-            rated_items = get_rated_items(items_directory, ratings)
+            centroid = self.__get_profile(user_id, ratings, items_directory, "items",
+                                          lambda: self.__get_centroid(ratings, items_directory))
 
-            first_item = rated_items[0]
-            need_vectorizer = False
-            if self.get_item_field() not in first_item.get_field_list():
-                raise ValueError("The field name specified could not be found!")
-            else:
-                try:
-                    representation = first_item.get_field(self.get_item_field()).get_representation(
-                        self.get_item_field_representation())
-                except KeyError:
-                    raise ValueError("The given representation id wasn't found for the specified field")
-
-                if not isinstance(representation, EmbeddingField) and not isinstance(representation, FeaturesBagField):
-                    raise ValueError("The given representation must be an embedding or a tf-idf vector")
-
-                if isinstance(representation, EmbeddingField):
-                    if len(representation.get_value().shape) != 1:
-                        raise ValueError("The specified representation is not a document embedding, so the centroid"
-                                         " can not be calculated")
-
-                if isinstance(representation, FeaturesBagField):
-                    need_vectorizer = True
-
-            columns = ["to_id", "rating"]
-            scores = pd.DataFrame(columns=columns)
-
-            if not need_vectorizer:
-                logger.info("Computing centroid")
-                centroid = self.__get_centroid_without_vectorizer(ratings, rated_items)
-                logger.info("Computing similarities")
-
-                for item in unrated_items:
-                    item_id = item.get_content_id()
-                    item_field_representation = item.get_field(self.get_item_field()).get_representation(
-                        self.get_item_field_representation()).get_value()
-                    logger.info("Computing similarity with %s" % item_id)
-                    similarity = self.__similarity.perform(DenseVector(centroid), DenseVector(item_field_representation))
-                    scores = pd.concat([scores, pd.DataFrame.from_records([(item_id, similarity)], columns=columns)],
-                                       ignore_index=True)
+            unrated_items = [item for item in unrated_items if item is not None]
+            unrated_item_id_list = [item.get_content_id() for item in unrated_items]
+            unrated_list = [item.get_field(self.get_item_field()).get_representation(
+                self.get_item_field_representation()).get_value() for item in unrated_items]
+
+            if isinstance(centroid, dict):
+                # the centroid and the candidate items are vectorized together, so they share the vocabulary
+                matrix = DictVectorizer(sparse=True).fit_transform([centroid] + unrated_list)
+                centroid, unrated_matrix = matrix[0], matrix[1:]
             else:
-                logger.info("Computing centroid")
-                centroid, unrated_matrix = self.__get_centroid_with_vectorizer(ratings, rated_items, unrated_items)
-
-                logger.info("Computing similarities")
-                for item, item_array in zip(unrated_items, unrated_matrix):
-                    item_id = item.get_content_id()
-                    logger.info("Computing similarity with %s" % item_id)
-                    similarity = self.__similarity.perform(SparseVector(centroid), SparseVector(item_array))
-                    scores = pd.concat([scores, pd.DataFrame.from_records([(item_id, similarity)], columns=columns)],
-                                       ignore_index=True)
-
-            scores = scores.sort_values(['rating'], ascending=False).reset_index(drop=True)
-            scores = scores[:recs_number]
+                unrated_matrix = np.array(unrated_list)
+
+            logger.info("Computing similarities")
+            similarities = self.__similarity.perform_batch(centroid, unrated_matrix)
+            scores = self.__get_top_k(unrated_item_id_list, similarities, recs_number)
 
             return scores
         except ValueError as v:
@@ -1,4 +1,6 @@
-from typing import List
+import os
+import re
+from typing import List, Union
 
 from scipy import sparse
 from sklearn import neighbors
@@ -13,25 +15,193 @@ from sklearn.svm import LinearSVC
 from sklearn.tree import DecisionTreeClassifier
 
 from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import EmbeddingMatrix, \
+    FeaturesBagMatrix
 
 import pandas as pd
 
 from orange_cb_recsys.recsys.algorithm import RankingAlgorithm
+from orange_cb_recsys.recsys.profile_cache import ProfileCache
 from orange_cb_recsys.utils.const import logger
 from orange_cb_recsys.utils.load_content import get_rated_items, get_unrated_items, load_content_instance
 
 
+def _to_dense(matrix):
+    return matrix.toarray()
+
+
 class ClassifierRecommender(RankingAlgorithm):
     """
        Class that implements a logistic regression classifier.
        Args:
            item_field (str): Name of the field that contains the content to use
            field_representation (str): Id of the field_representation content
+           profile_cache (ProfileCache): cache in which the classifiers fitted for the users are stored,
+               if None the classifier is fitted at every prediction
        """
-    def __init__(self, item_field: str, field_representation: str, classifier: str, threshold=-1):
+    def __init__(self, item_field: str, field_representation: str, classifier: str, threshold=-1,
+                 profile_cache: ProfileCache = None):
         super().__init__(item_field, field_representation)
         self.__classifier: str = classifier
         self.__threshold = threshold
+        self.__profile_cache: ProfileCache = profile_cache
+
+    def get_profile_cache(self) -> ProfileCache:
+        return self.__profile_cache
+
+    def set_profile_cache(self, profile_cache: ProfileCache):
+        self.__profile_cache = profile_cache
+
+    def __get_profile(self, user_id: str, ratings: pd.DataFrame, items_directory: str, source: str,
+                      compute_profile):
+        """
+        Gets the classifier fitted for the user from the profile cache, fitting it with compute_profile
+        if it is not cached or if there is no cache
+
+        Args:
+            source (str): where the classifier is fitted from, classifiers fitted on the exported
+                matrices and on the items are not interchangeable
+            compute_profile: function without arguments that fits the classifier
+        """
+        if self.__profile_cache is None:
+            return compute_profile()
+
+        key = ProfileCache.get_key(user_id, ["ClassifierRecommender", self.get_item_field(),
+                                             self.get_item_field_representation(), self.__classifier.lower(),
+                                             self.__threshold, os.path.abspath(items_directory), source], ratings,
+                                   ProfileCache.get_catalog_version(items_directory))
+        profile = self.__profile_cache.get(key)
+        if profile is None:
+            profile = compute_profile()
+            self.__profile_cache.put(key, profile)
+        else:
+            logger.info("Classifier of user %s found in the profile cache", user_id)
+
+        return profile
+
+    def __create_classifier(self):
+        clf = None
+        if self.__classifier.lower() == "random_forest":
+            clf = RandomForestClassifier(n_estimators=400, random_state=42)
+        elif self.__classifier.lower() == "svm":
+            clf = CalibratedClassifierCV(LinearSVC(random_state=42))
+        elif self.__classifier.lower() == "log_regr":
+            clf = LogisticRegression(random_state=42)
+        elif self.__classifier.lower() == "knn":
+            clf = neighbors.KNeighborsClassifier()
+        elif self.__classifier.lower() == "decision_tree":
+            clf = DecisionTreeClassifier(random_state=42)
+        elif self.__classifier.lower() == "gaussian_process":
+            clf = GaussianProcessClassifier(random_state=42)
+
+        return clf
+
+    def __get_threshold(self, ratings: pd.DataFrame) -> float:
+        if self.__threshold == -1:
+            return pd.to_numeric(ratings["score"], downcast="float").mean()
+        return self.__threshold
+
+    def __predict_with_matrix(self, user_id: str, matrix: Union[EmbeddingMatrix, FeaturesBagMatrix], source: str,
+                              ratings: pd.DataFrame, recs_number: int, items_directory: str,
+                              candidate_item_id_list: List = None) -> pd.DataFrame:
+        """
+        Fits the classifier on the rows of the matrix exported by the content analyzer or built by the
+        item catalog, instead of loading the items and vectorizing their representations,
+        and scores all the candidate items in a single call
+
+        Args:
+            user_id: user for which recommendations will be computed
+            matrix (EmbeddingMatrix or FeaturesBagMatrix): matrix of the item field representation
+            source (str): 'matrix' if the matrix was exported, 'catalog' if it was built by the item catalog
+            ratings (pd.DataFrame): ratings of the user
+            recs_number (int): How long the ranking will be
+            items_directory (str): Name of the directory where the items are stored.
+            candidate_item_id_list: list of the items that can be recommended, if None
+                all unrated items will be used
+
+        Returns:
+            score_frame (pd.DataFrame): DataFrame whose columns are the ids of the items (to_id),
+                and the probability that the user likes them (rating)
+        """
+        dense = self.__classifier.lower() == "gaussian_process"
+
+        def fit_classifier():
+            logger.info("Retrieving rated items")
+            rated_ratings = ratings[[item_id in matrix for item_id in ratings.to_id]]
+            threshold = self.__get_threshold(ratings)
+            labels = [1 if float(score) >= threshold else 0 for score in rated_ratings.score]
+
+            rated_matrix = matrix.get_rows(list(rated_ratings.to_id))
+            if sparse.issparse(rated_matrix) and dense:
+                rated_matrix = rated_matrix.toarray()
+
+            logger.info("Fitting classifier")
+            clf = self.__create_classifier()
+            return clf.fit(rated_matrix, labels)
+
+        clf = self.__get_profile(user_id, ratings, items_directory, source, fit_classifier)
+
+        if candidate_item_id_list is None:
+            rated_items_filename_list = set([re.sub(r'[^\w\s]', '', item_id) for item_id in ratings.to_id])
+            candidate_item_id_list = [item_id for item_id in matrix.get_content_id_list()
+                                      if re.sub(r'[^\w\s]', '', item_id) not in rated_items_filename_list]
+        candidate_item_id_list = [item_id for item_id in candidate_item_id_list if item_id in matrix]
+
+        candidate_matrix = matrix.get_rows(candidate_item_id_list)
+        if sparse.issparse(candidate_matrix) and dense:
+            candidate_matrix = candidate_matrix.toarray()
+
+        logger.info("Predicting scores")
+        score_labels = clf.predict_proba(candidate_matrix)
+
+        score_frame = pd.DataFrame({"to_id": candidate_item_id_list, "rating": score_labels[:, 1]})
+        score_frame = score_frame.sort_values(['rating'], ascending=False).reset_index(drop=True)
+        score_frame = score_frame[:recs_number]
+
+        return score_frame
+
+    def predict_batch(self, user_id_list: List[str], ratings: pd.DataFrame, recs_number: int,
+                      items_directory: str) -> pd.DataFrame:
+        """
+        Computes the rankings of many users getting the matrix of the item field representation only once,
+        from the item catalog or from the matrices exported by the content analyzer.
+        A classifier is still fitted for each user, unless it is in the profile cache;
+        users without ratings are skipped. If there is no matrix of the representation, the rankings are computed by calling predict
+        for each user, that loads the items every time
+
+        Args:
+            user_id_list (List<str>): users for which recommendations will be computed
+            ratings (pd.DataFrame): ratings of the users in user_id_list
+            recs_number (int): How long the ranking of each user will be
+            items_directory (str): Name of the directory where the items are stored.
+
+        Returns:
+            score_frame (pd.DataFrame): DataFrame whose columns are the ids of the users (from_id),
+                the ids of the recommended items (to_id) and the probability that the users like them (rating)
+        """
+        user_ratings_dict = {user_id: user_ratings for user_id, user_ratings in ratings.groupby('from_id')}
+        for user_id in user_id_list:
+            if user_id not in user_ratings_dict:
+                logger.warning("User %s has no ratings, no ranking will be computed", user_id)
+        user_id_list = [user_id for user_id in user_id_list if user_id in user_ratings_dict]
+
+        matrix, source = self.get_representation_matrix(items_directory)
+        if matrix is None:
+            logger.info("The representation wasn't exported, the items are loaded for each user")
+            return super().predict_batch(user_id_list, ratings, recs_number, items_directory)
+
+        frame_list = []
+        for user_id in user_id_list:
+            user_ratings = user_ratings_dict[user_id].sort_values(['to_id'], ascending=True)
+            score_frame = self.__predict_with_matrix(user_id, matrix, source, user_ratings, recs_number,
+                                                     items_directory)
+            frame_list.append(pd.DataFrame({'from_id': user_id,
+                                            'to_id': score_frame.to_id.values,
+                                            'rating': score_frame.rating.values}))
+
+        if len(frame_list) == 0:
+            return pd.DataFrame(columns=['from_id', 'to_id', 'rating'])
+        return pd.concat(frame_list, ignore_index=True)
 
     def predict(self, user_id: str, ratings: pd.DataFrame, recs_number: int, items_directory: str, candidate_item_id_list: List = None) -> pd.DataFrame:
         """
@@ -40,7 +210,12 @@ class ClassifierRecommender(RankingAlgorithm):
         take the "tf-idf" representation of each  "Plot" field for every rated item, the tf-idf representation of rated items
         and items to classify will be parsed to dense arrays;
         2) Define target features, items with rating greater (lower) than threshold will be used as positive(negative) examples;
-        3) Creates an object Classifier, uses the method fit and predicts the class of the new items
+        3) Creates an object Classifier, uses the method fit and predicts the class of the new items.
+        The fitted classifier is stored in the profile cache, if there is one, and it is fitted again
+        only when the ratings of the user change
+
+        If the content analyzer exported the matrix of the representation (embedding or features bag),
+        the classifier is fitted on the rows of the matrix, without loading the items
 
         Args:
             candidate_item_id_list: list of the items that can be recommended, if None
@@ -54,64 +229,50 @@ class ClassifierRecommender(RankingAlgorithm):
             The predicted classes, or the predict values.
         """
 
+        matrix, source = self.get_representation_matrix(items_directory)
+        if matrix is not None:
+            return self.__predict_with_matrix(user_id, matrix, source, ratings, recs_number, items_directory,
+                                              candidate_item_id_list)
+
         if candidate_item_id_list is None:
             unrated_items = get_unrated_items(items_directory, ratings)
         else:
             unrated_items = [load_content_instance(items_directory, item_id) for item_id in candidate_item_id_list]
 
-        rated_features_bag_list = []
-        unrated_features_bag_list = []
+        def fit_classifier():
+            logger.info("Retrieving rated items")
+            rated_items = get_rated_items(items_directory, ratings)
+            threshold = self.__get_threshold(ratings)
 
-        logger.info("Retrieving rated items")
-        rated_items = get_rated_items(items_directory, ratings)
-        if self.__threshold == -1:
-            threshold = pd.to_numeric(ratings["score"], downcast="float").mean()
-        else:
-            threshold = self.__threshold
+            rated_features_bag_list = []
+            labels = []
+            for item in rated_items:
+                if item is not None:
+                    rated_features_bag_list.append(item.get_field(self.get_item_field()).get_representation(self.get_item_field_representation()).get_value())
+                    labels.append(1 if float(ratings[ratings['to_id'] == item.get_content_id()].score) >= threshold else 0)
 
-        labels = []
-        for item in rated_items:
-            if item is not None:
-                rated_features_bag_list.append(item.get_field(self.get_item_field()).get_representation(self.get_item_field_representation()).get_value())
-                labels.append(1 if float(ratings[ratings['to_id'] == item.get_content_id()].score) >= threshold else 0)
+            clf = self.__create_classifier()
 
-        logger.info("Labeling examples")
-        for item in unrated_items:
-            if item is not None:
-                unrated_features_bag_list.append(item.get_field(self.get_item_field()).get_representation(self.get_item_field_representation()).get_value())
+            logger.info("Fitting classifier")
+            if self.__classifier.lower() == "gaussian_process":
+                pipe = make_pipeline(DictVectorizer(sparse=True), FunctionTransformer(_to_dense, accept_sparse=True), clf)
+            else:
+                pipe = make_pipeline(DictVectorizer(sparse=True), clf)
 
-        clf = None
-        if self.__classifier.lower() == "random_forest":
-            clf = RandomForestClassifier(n_estimators=400, random_state=42)
-        elif self.__classifier.lower() == "svm":
-            clf = CalibratedClassifierCV(LinearSVC(random_state=42))
-        elif self.__classifier.lower() == "log_regr":
-            clf = LogisticRegression(random_state=42)
-        elif self.__classifier.lower() == "knn":
-            clf = neighbors.KNeighborsClassifier()
-        elif self.__classifier.lower() == "decision_tree":
-            clf = DecisionTreeClassifier(random_state=42)
-        elif self.__classifier.lower() == "gaussian_process":
-            clf = GaussianProcessClassifier(random_state=42)
-
-        logger.info("Fitting classifier")
-        if self.__classifier.lower() == "gaussian_process":
-            pipe = make_pipeline(DictVectorizer(sparse=True), FunctionTransformer(lambda x: x.todense(), accept_sparse=True), clf)
-        else:
-            pipe = make_pipeline(DictVectorizer(sparse=True), clf)
+            return pipe.fit(rated_features_bag_list, labels)
 
-        pipe = pipe.fit(rated_features_bag_list, labels)
+        pipe = self.__get_profile(user_id, ratings, items_directory, "items", fit_classifier)
 
-        columns = ["to_id", "rating"]
-        score_frame = pd.DataFrame(columns=columns)
+        logger.info("Labeling examples")
+        unrated_items = [item for item in unrated_items if item is not None]
+        unrated_features_bag_list = [item.get_field(self.get_item_field()).get_representation(self.get_item_field_representation()).get_value()
+                                     for item in unrated_items]
 
         logger.info("Predicting scores")
         score_labels = pipe.predict_proba(unrated_features_bag_list)
 
-        for score, item in zip(score_labels, unrated_items):
-            if item is not None:
-                score_frame = pd.concat([score_frame, pd.DataFrame.from_records([(item.get_content_id(), score[1])], columns=columns)], ignore_index=True)
-
+        score_frame = pd.DataFrame({"to_id": [item.get_content_id() for item in unrated_items],
+                                    "rating": score_labels[:, 1]})
         score_frame = score_frame.sort_values(['rating'], ascending=False).reset_index(drop=True)
         score_frame = score_frame[:recs_number]
 
@@ -1,90 +1,163 @@
+import heapq
 import os
-from typing import List
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List
 
 from orange_cb_recsys.recsys.algorithm import RankingAlgorithm
 
 import pandas as pd
 
 from orange_cb_recsys.utils.const import DEVELOPING, home_path, logger
-from orange_cb_recsys.utils.load_content import load_content_instance
+from orange_cb_recsys.utils.load_content import load_content_instance, load_document_id_map
 
-from java.nio.file import Paths
+from orange_cb_recsys.recsys.ranking_algorithms.searcher_manager import acquire_searcher
 
-from org.apache.lucene.queryparser.classic import QueryParser
-from org.apache.lucene.search import IndexSearcher, BooleanQuery, BooleanClause, BoostQuery
-from org.apache.lucene.store import SimpleFSDirectory
-from org.apache.lucene.index import DirectoryReader
-from org.apache.lucene.search.similarities import ClassicSimilarity
+from java.util import ArrayList
+
+from org.apache.lucene.search import IndexSearcher, BooleanQuery, BooleanClause, BoostQuery, TermQuery, \
+    TermInSetQuery
+from org.apache.lucene.index import Term
+from org.apache.lucene.util import BytesRef, BytesRefIterator
 from org.apache.lucene.analysis.core import SimpleAnalyzer
-from org.apache.lucene.analysis.core import KeywordAnalyzer
+from org.apache.lucene.analysis.tokenattributes import CharTermAttribute
+
+
+# filters of the last candidate lists, the same query instance lets lucene cache its matching documents
+_CANDIDATE_FILTER_CACHE_SIZE = 64
+_candidate_filter_dict: OrderedDict = OrderedDict()
+_candidate_filter_lock = threading.Lock()
+
+
+def _get_candidate_filter(candidate_list: List[str]) -> TermInSetQuery:
+    """
+    Gets the query that matches the documents of the candidate items. It is used as a filter clause,
+    so it doesn't change the scores, and it is cached for each set of candidates
+    """
+    key = frozenset(candidate_list)
+    with _candidate_filter_lock:
+        if key in _candidate_filter_dict:
+            _candidate_filter_dict.move_to_end(key)
+            return _candidate_filter_dict[key]
+
+    term_list = ArrayList()
+    for content_id in key:
+        term_list.add(BytesRef(content_id))
+    candidate_filter = TermInSetQuery("content_id", term_list)
+
+    with _candidate_filter_lock:
+        _candidate_filter_dict[key] = candidate_filter
+        while len(_candidate_filter_dict) > _CANDIDATE_FILTER_CACHE_SIZE:
+            _candidate_filter_dict.popitem(last=False)
+
+    return candidate_filter
 
 
 class IndexQuery(RankingAlgorithm):
     """
     Class for the search engine recommender
+
+    Args:
+        classic_similarity (bool): if True the items are scored with the ClassicSimilarity (tf-idf)
+        positive_threshold (float): the items rated above this threshold are considered liked by the user
+        max_query_terms (int): maximum number of terms of each field in the query
     """
-    def __init__(self, classic_similarity: bool = True, positive_threshold: float = 0):
+    def __init__(self, classic_similarity: bool = True, positive_threshold: float = 0, max_query_terms: int = 25):
         super().__init__(None, None)
         self.__classic_similarity: bool = classic_similarity
         self.__positive_threshold: float = positive_threshold
+        self.__max_query_terms: int = int(max_query_terms)
 
-    def __recs_query(self, positive_rated_document_list, scores, recs_number, items_directory,
+    @staticmethod
+    def __get_term_frequencies(reader, analyzer, document: int, field_name: str, field_text: str):
+        """
+        Generator of the terms of a field of a document with their frequency in the field, read from
+        the term vector of the field. The fields of the indexes written without term vectors are analyzed
+        again from their stored text
+        """
+        term_vector = reader.getTermVector(document, field_name)
+        if term_vector is not None:
+            term_enum = term_vector.iterator()
+            for term in BytesRefIterator.cast_(term_enum):
+                postings = term_enum.postings(None)
+                postings.nextDoc()
+                yield term.utf8ToString(), postings.freq()
+            return
+
+        term_counter = Counter()
+        token_stream = analyzer.tokenStream(field_name, field_text)
+        char_term = token_stream.addAttribute(CharTermAttribute.class_)
+        token_stream.reset()
+        while token_stream.incrementToken():
+            term_counter[char_term.toString()] += 1
+        token_stream.end()
+        token_stream.close()
+        yield from term_counter.items()
+
+    def __get_term_weights(self, searcher: IndexSearcher, positive_rated_document_list,
+                           scores) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregates the terms of the documents that the user liked, for each field. The weight
+        of a term is the sum, over the liked documents, of its frequency in the document multiplied
+        by the rating the user gave to the document
+        """
+        reader = searcher.getIndexReader()
+        analyzer = SimpleAnalyzer()
+        term_weights = {}
+        for document, score in zip(positive_rated_document_list, scores):
+            field_name_set = set()
+            for field in searcher.doc(document).getFields():
+                field_name = field.name()
+                if field_name == 'content_id' or field_name in field_name_set:
+                    continue
+                field_name_set.add(field_name)
+
+                field_weights = term_weights.setdefault(field_name, {})
+                for term, frequency in self.__get_term_frequencies(reader, analyzer, document, field_name,
+                                                                   field.stringValue()):
+                    field_weights[term] = field_weights.get(term, 0) + frequency * score
+
+        return term_weights
+
+    def __recs_query(self, searcher: IndexSearcher, positive_rated_document_list, scores, recs_number,
                      candidate_list: List) -> pd.DataFrame:
         """
-        Builds a query using the contents that the user liked. The terms relative to the contents that
-        the user liked are boosted by the rating he/she gave. A filter clause is added to the query to
+        Builds a query using the contents that the user liked, like the MoreLikeThis query of lucene:
+        the terms of the contents that the user liked are weighted by the ratings he/she gave,
+        and only the max_query_terms terms with the highest weight of each field are kept, so the size
+        of the query doesn't depend on the number of ratings. A filter clause is added to the query to
         consider only candidate items
         Args:
+            searcher (IndexSearcher): searcher on the search index of the items
             positive_rated_document_list: List of contents that the user liked
             scores: Ratings given by the user
             recs_number: How many items must be recommended. You can only specify the number, not
                 a specific item for which compute the prediction
-            items_directory: Directory where the items are stored
 
         Returns:
             score_frame (pd.DataFrame): DataFrame containing the recommendations for the user
         """
-        BooleanQuery.setMaxClauseCount(2000000)
-        searcher = IndexSearcher(DirectoryReader.open(SimpleFSDirectory(Paths.get(items_directory))))
-        if self.__classic_similarity:
-            searcher.setSimilarity(ClassicSimilarity())
-
-        field_list = searcher.doc(positive_rated_document_list[0]).getFields()
-        user_fields = {}
-        field_parsers = {}
-        analyzer = SimpleAnalyzer()
-        for field in field_list:
-            if field.name() == 'content_id':
-                continue
-            user_fields[field.name()] = field.stringValue()
-            field_parsers[field.name()] = QueryParser(field.name(), analyzer)
-
-        positive_rated_document_list.remove(positive_rated_document_list[0])
-
-        for _ in positive_rated_document_list:
-            for field in field_list:
-                if field.name() == 'content_id':
-                    continue
-                user_fields[field.name()] += field.stringValue()
+        columns = ['to_id', 'rating']
+        if len(positive_rated_document_list) == 0:
+            return pd.DataFrame(columns=columns)
 
         logger.info("Building query")
 
         query_builder = BooleanQuery.Builder()
-        for score in scores:
-            for field_name in user_fields.keys():
-                if field_name == 'content_id':
-                    continue
-                field_parsers[field_name].setDefaultOperator(QueryParser.Operator.OR)
-
-                field_query = field_parsers[field_name].escape(user_fields[field_name])
-                field_query = field_parsers[field_name].parse(field_query)
-                field_query = BoostQuery(field_query, score)
-                query_builder.add(field_query, BooleanClause.Occur.SHOULD)
+        clause_count = 1
+        for field_name, field_weights in self.__get_term_weights(
+                searcher, positive_rated_document_list, scores).items():
+            top_term_list = heapq.nlargest(self.__max_query_terms,
+                                           ((term, weight) for term, weight in field_weights.items() if weight > 0),
+                                           key=lambda term_weight: term_weight[1])
+            for term, weight in top_term_list:
+                query_builder.add(BoostQuery(TermQuery(Term(field_name, term)), float(weight)),
+                                  BooleanClause.Occur.SHOULD)
+            clause_count += len(top_term_list)
+        BooleanQuery.setMaxClauseCount(max(BooleanQuery.getMaxClauseCount(), clause_count))
 
         if candidate_list is not None:
-            id_query_string = ' OR '.join("content_id:\"" + content_id + "\"" for content_id in candidate_list)
-            id_query = QueryParser("testo_libero", KeywordAnalyzer()).parse(id_query_string)
-            query_builder.add(id_query, BooleanClause.Occur.MUST)
+            query_builder.add(_get_candidate_filter(candidate_list), BooleanClause.Occur.FILTER)
 
         query = query_builder.build()
         docs_to_search = len(positive_rated_document_list) + recs_number
@@ -92,20 +165,17 @@ class IndexQuery(RankingAlgorithm):
 
         logger.info("Building score frame to return")
 
-        recorded_items = 0
-        columns = ['to_id', 'rating']
-        score_frame = pd.DataFrame(columns=columns)
+        positive_rated_document_set = set(positive_rated_document_list)
+        score_list = []
         for scoreDoc in scoreDocs:
-            if recorded_items >= recs_number:
+            if len(score_list) >= recs_number:
                 break
-            if scoreDoc.doc not in positive_rated_document_list:
+            if scoreDoc.doc not in positive_rated_document_set:
                 doc = searcher.doc(scoreDoc.doc)
                 item_id = doc.getField("content_id").stringValue()
-                recorded_items += 1
+                score_list.append((item_id, scoreDoc.score))
 
-                score_frame = pd.concat([score_frame, pd.DataFrame.from_records([(item_id, scoreDoc.score)], columns=columns)])
-
-        return score_frame
+        return pd.DataFrame.from_records(score_list, columns=columns)
 
     def predict(self, user_id: str, ratings: pd.DataFrame, recs_number, items_directory: str, candidate_item_id_list: List = None):
         """
@@ -124,17 +194,36 @@ class IndexQuery(RankingAlgorithm):
         if not DEVELOPING:
             index_path = os.path.join(home_path, items_directory, 'search_index')
 
-        scores = []
-        rated_document_list = []
-        for item_id, score in zip(ratings.to_id, ratings.score):
-            item = load_content_instance(items_directory, item_id)
-
-            if score > self.__positive_threshold:
-                rated_document_list.append(item.get_index_document_id())
-                scores.append(score)
-
-        return self.__recs_query(rated_document_list,
-                                 scores,
-                                 recs_number,
-                                 index_path,
-                                 candidate_item_id_list)
+        positive_ratings = ratings[ratings.score > self.__positive_threshold]
+        document_id_map = load_document_id_map(os.path.dirname(index_path))
+
+        # the searcher is borrowed from a manager shared by the process, that keeps the index open
+        with acquire_searcher(index_path, self.__classic_similarity) as searcher:
+            scores = []
+            rated_document_list = []
+            if document_id_map is not None:
+                document_id_dict = document_id_map.get_document_id_dict(list(positive_ratings.to_id))
+                for item_id, score in zip(positive_ratings.to_id, positive_ratings.score):
+                    if str(item_id) in document_id_dict:
+                        rated_document_list.append(document_id_dict[str(item_id)])
+                        scores.append(score)
+            else:
+                # contents produced before the document id map was introduced
+                for item_id, score in zip(positive_ratings.to_id, positive_ratings.score):
+                    item = load_content_instance(items_directory, item_id)
+                    document_id = item.get_index_document_id()
+                    if document_id is None:
+                        # contents whose document was updated don't know its id
+                        score_docs = searcher.search(
+                            TermQuery(Term("content_id", item.get_content_id())), 1).scoreDocs
+                        if len(score_docs) == 0:
+                            continue
+                        document_id = score_docs[0].doc
+                    rated_document_list.append(document_id)
+                    scores.append(score)
+
+            return self.__recs_query(searcher,
+                                     rated_document_list,
+                                     scores,
+                                     recs_number,
+                                     candidate_item_id_list)
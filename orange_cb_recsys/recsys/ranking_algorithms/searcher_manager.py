@@ -0,0 +1,98 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+import lucene
+
+from java.nio.file import Paths
+
+from org.apache.lucene.search import IndexSearcher, SearcherManager
+from org.apache.lucene.search.similarities import ClassicSimilarity
+from org.apache.lucene.store import SimpleFSDirectory
+from org.apache.pylucene.search import PythonSearcherFactory
+
+from orange_cb_recsys.utils.const import logger
+
+# SearcherManager of each index, shared by the whole process and indexed by (index path, classic similarity)
+_manager_dict: Dict[Tuple[str, bool], SearcherManager] = {}
+_manager_lock = threading.Lock()
+# the factory must be referenced while lucene can call it
+_classic_similarity_factory = None
+
+
+class _ClassicSimilaritySearcherFactory(PythonSearcherFactory):
+    """
+    Factory of the searchers of a searcher manager that sets the ClassicSimilarity (tf-idf)
+    on every searcher when it is created, before any thread can borrow it
+    """
+
+    def newSearcher(self, reader, previous_reader):
+        searcher = IndexSearcher(reader)
+        searcher.setSimilarity(ClassicSimilarity())
+        return searcher
+
+
+def _attach_current_thread():
+    """
+    Attaches the current thread to the JVM, every thread that uses lucene must be attached
+    """
+    env = lucene.getVMEnv()
+    if env is not None and not env.isCurrentThreadAttached():
+        env.attachCurrentThread()
+
+
+def _get_manager(index_path: str, classic_similarity: bool) -> SearcherManager:
+    global _classic_similarity_factory
+    key = (index_path, classic_similarity)
+    with _manager_lock:
+        if key not in _manager_dict:
+            logger.info("Opening searcher manager for index %s", index_path)
+            searcher_factory = None
+            if classic_similarity:
+                if _classic_similarity_factory is None:
+                    _classic_similarity_factory = _ClassicSimilaritySearcherFactory()
+                searcher_factory = _classic_similarity_factory
+            _manager_dict[key] = SearcherManager(SimpleFSDirectory(Paths.get(index_path)), searcher_factory)
+        return _manager_dict[key]
+
+
+@contextmanager
+def acquire_searcher(index_path: str, classic_similarity: bool = False):
+    """
+    Borrows an IndexSearcher on an index from the searcher manager of the index, which is shared
+    by every thread of the process, so the index reader is opened once. Before the searcher is
+    borrowed, the manager reopens the reader if the index changed since it was opened.
+    The searcher is given back when the with block ends.
+
+    Usage:
+        with acquire_searcher(index_path) as searcher:
+            searcher.search(query, 10)
+
+    Args:
+        index_path (str): directory of the index
+        classic_similarity (bool): if True the searcher uses the ClassicSimilarity (tf-idf),
+            set by the manager when it creates the searcher, otherwise the default one of lucene
+
+    Returns:
+        searcher (IndexSearcher)
+    """
+    _attach_current_thread()
+    manager = _get_manager(index_path, classic_similarity)
+    manager.maybeRefresh()
+    searcher = manager.acquire()
+    try:
+        yield searcher
+    finally:
+        manager.release(searcher)
+
+
+def close_searchers():
+    """
+    Closes the searcher managers of every index, the searchers already borrowed
+    remain usable until they are given back
+    """
+    _attach_current_thread()
+    with _manager_lock:
+        for manager in _manager_dict.values():
+            manager.close()
+        _manager_dict.clear()
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
-from scipy import spatial
+
+import numpy as np
+from scipy import spatial, sparse
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 
 
 class Vector(ABC):
@@ -39,6 +42,56 @@ class Similarity(ABC):
         """
         raise NotImplementedError
 
+    def perform_batch(self, vector, matrix) -> np.ndarray:
+        """
+        Calculates the similarity between vector and each row of matrix.
+        The default implementation calls perform for each row, subclasses
+        can override it with a vectorized implementation
+
+        Args:
+            vector (np.ndarray or sparse matrix): one dimensional array or sparse matrix with a single row
+            matrix (np.ndarray or sparse matrix): matrix with one row for each vector to compare
+
+        Returns:
+            similarities (np.ndarray): one dimensional array with the similarity of each row
+        """
+        if sparse.issparse(matrix):
+            vector = sparse.csr_matrix(vector)
+            return np.array([float(self.perform(SparseVector(vector), SparseVector(matrix[i])))
+                             for i in range(matrix.shape[0])])
+
+        return np.array([self.perform(DenseVector(vector), DenseVector(row)) for row in matrix])
+
+    def prepare_matrix(self, matrix):
+        """
+        Prepares a matrix that is compared many times, for example by normalizing its rows,
+        so the work is done once. The default implementation returns the matrix as it is
+
+        Args:
+            matrix (np.ndarray or sparse matrix): matrix with one row for each vector to compare
+
+        Returns:
+            prepared_matrix: the matrix to pass to perform_pairwise with other_prepared set
+        """
+        return matrix
+
+    def perform_pairwise(self, matrix, other_matrix, other_prepared: bool = False) -> np.ndarray:
+        """
+        Calculates the similarity between each row of matrix and each row of other_matrix.
+        The default implementation calls perform_batch for each row of matrix
+
+        Args:
+            matrix (np.ndarray or sparse matrix): matrix with one row for each vector to compare
+            other_matrix (np.ndarray or sparse matrix): matrix with one row for each vector to compare
+            other_prepared (bool): True if other_matrix was returned by prepare_matrix
+
+        Returns:
+            similarities (np.ndarray): matrix whose element [i, j] is the similarity between
+                the i-th row of matrix and the j-th row of other_matrix
+        """
+        return np.array([self.perform_batch(matrix[i], other_matrix) for i in range(matrix.shape[0])]) \
+            .reshape(matrix.shape[0], other_matrix.shape[0])
+
 
 class CosineSimilarity(Similarity):
     """
@@ -49,3 +102,36 @@ class CosineSimilarity(Similarity):
 
     def perform(self, v1: Vector, v2: Vector):
         return v1.similarity(v2)
+
+    def perform_batch(self, vector, matrix) -> np.ndarray:
+        """
+        Normalizes the rows of matrix once and computes all the cosine similarities
+        with a single matrix-vector product. Zero vectors have similarity 0
+        """
+        if sparse.issparse(vector):
+            vector = vector.toarray()
+        vector = np.asarray(vector, dtype=np.float64).ravel()
+        vector_norm = np.linalg.norm(vector)
+        if vector_norm == 0 or matrix.shape[0] == 0:
+            return np.zeros(matrix.shape[0])
+
+        return np.asarray(normalize(matrix).dot(vector / vector_norm)).ravel()
+
+    def prepare_matrix(self, matrix):
+        """
+        Normalizes the rows of matrix, zero rows are left as they are
+        """
+        return normalize(matrix)
+
+    def perform_pairwise(self, matrix, other_matrix, other_prepared: bool = False) -> np.ndarray:
+        """
+        Normalizes the rows of both matrices and computes all the cosine similarities
+        with a single matrix product. Zero vectors have similarity 0.
+        The rows of other_matrix are not normalized again if it was prepared
+        """
+        if not other_prepared:
+            other_matrix = normalize(other_matrix)
+        similarities = normalize(matrix) @ other_matrix.T
+        if sparse.issparse(similarities):
+            similarities = similarities.toarray()
+        return np.asarray(similarities)
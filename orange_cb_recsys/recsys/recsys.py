@@ -50,7 +50,7 @@ class RecSys:
 
         # load user ratings
         logger.info("Loading user ratings")
-        user_ratings = self.__config.get_rating_frame()[self.__config.get_rating_frame()['from_id'] == user_id]
+        user_ratings = self.__config.get_user_ratings(user_id)
         user_ratings = user_ratings.sort_values(['to_id'], ascending=True)
 
         # define for which items calculate the prediction
@@ -87,7 +87,7 @@ class RecSys:
 
         # load user ratings
         logger.info("Loading user ratings")
-        user_ratings = self.__config.get_rating_frame()[self.__config.get_rating_frame()['from_id'] == user_id]
+        user_ratings = self.__config.get_user_ratings(user_id)
         user_ratings = user_ratings.sort_values(['to_id'], ascending=True)
 
         # calculate predictions
@@ -98,6 +98,34 @@ class RecSys:
 
         return score_frame
 
+    def fit_ranking_batch(self, user_id_list: List[str], recs_number: int) -> pd.DataFrame:
+        """
+        Computes the rankings of many users at once, using all the items that each user didn't
+        rate as candidates. The ranking algorithm can share the work between the users,
+        for example loading the items only once
+
+        Args:
+            user_id_list: users for which compute the ranking recommendation
+            recs_number: how many items should the ranking of each user contain,
+                the ranking length can be lower
+        Returns:
+            score_frame (DataFrame): result frame whose columns are: from_id, to_id, rating
+
+        Raises:
+             ValueError: if the algorithm is a score prediction algorithm
+        """
+        if self.__config.get_ranking_algorithm() is None:
+            raise ValueError("You must set ranking algorithm to use this method")
+
+        logger.info("Loading users ratings")
+        users_ratings = self.__config.get_users_ratings(user_id_list)
+
+        logger.info("Computing rankings")
+        score_frame = self.__config.get_ranking_algorithm().predict_batch(user_id_list, users_ratings, recs_number,
+                                                                          self.__config.get_items_directory())
+
+        return score_frame
+
     def fit_eval_predict(self, user_id, user_ratings: pd.DataFrame, test_set: pd.DataFrame):
         """
         Computes predicted ratings, or ranking (according to algorithm chosen in the config)
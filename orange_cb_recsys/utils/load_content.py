@@ -1,10 +1,220 @@
-import lzma
 import os
-import pickle
 import re
+from typing import List
+
+from orange_cb_recsys.content_analyzer.content_representation.ann_index import ANNIndex, ANN_INDEX_SUFFIX
 from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.content_manifest import \
+    ContentManifest, MANIFEST_FILE_NAME
+from orange_cb_recsys.content_analyzer.content_representation.content_store import \
+    ColumnarStoreReader, STORE_FILE_NAME
+from orange_cb_recsys.content_analyzer.content_representation.document_id_map import \
+    DocumentIdMap, DOCUMENT_ID_MAP_FILE_NAME
+from orange_cb_recsys.content_analyzer.content_representation.inverted_index import \
+    InvertedIndex, INVERTED_INDEX_SUFFIX
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import \
+    EmbeddingMatrix, FeaturesBagMatrix, get_representation_path
+from orange_cb_recsys.utils import serialization
 from orange_cb_recsys.utils.const import logger
 
+_cache = {}
+
+
+def _load_cached(path: str, loader, sidecar_path_list: List[str] = ()):
+    """
+    Returns the object built by loader for the file in path, the object is built again
+    only if the file or one of its sidecar files changed since the last call,
+    and the object built before is closed
+
+    Args:
+        sidecar_path_list (List<str>): files read by loader together with the file in path,
+            like the ids of the rows of a matrix
+
+    Returns:
+        None if the file doesn't exist
+    """
+    try:
+        modified = os.path.getmtime(path)
+    except OSError:
+        return None
+    if len(sidecar_path_list) != 0:
+        modified = (modified,) + tuple(os.path.getmtime(sidecar_path) if os.path.exists(sidecar_path) else None
+                                       for sidecar_path in sidecar_path_list)
+
+    key = os.path.abspath(path)
+    cached = _cache.get(key)
+    if cached is None or cached[0] != modified:
+        if cached is not None and hasattr(cached[1], 'close'):
+            # the memory map or the connection of the evicted object are released
+            cached[1].close()
+        cached = (modified, loader())
+        _cache[key] = cached
+
+    return cached[1]
+
+
+def load_content_store(directory: str):
+    """
+    Opens the columnar store of a directory, if the contents in the directory
+    were stored in a columnar store.
+    The opened stores are cached, a store is opened again only if its file changed
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+
+    Returns:
+        store (ColumnarStoreReader): None if there is no columnar store in the directory
+    """
+    return _load_cached(os.path.join(directory, STORE_FILE_NAME),
+                        lambda: ColumnarStoreReader(directory))
+
+
+def load_content_manifest(directory: str):
+    """
+    Loads the manifest of the contents written by the content analyzer.
+    Loaded manifests are cached like the content stores
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+
+    Returns:
+        manifest (ContentManifest): None if the manifest wasn't written
+    """
+    return _load_cached(os.path.join(directory, MANIFEST_FILE_NAME),
+                        lambda: ContentManifest(directory))
+
+
+def load_document_id_map(directory: str):
+    """
+    Opens the map from content id to search index document id saved by the content analyzer.
+    Opened maps are cached like the content stores
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+
+    Returns:
+        document_id_map (DocumentIdMap): None if the map wasn't saved
+    """
+    return _load_cached(os.path.join(directory, DOCUMENT_ID_MAP_FILE_NAME),
+                        lambda: DocumentIdMap(directory))
+
+
+def load_embedding_matrix(directory: str, field_name: str, representation_id: str):
+    """
+    Opens the embedding matrix exported by the content analyzer for a document
+    embedding representation. Opened matrices are cached like the content stores
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+        field_name (str): Name of the field
+        representation_id (str): Id of the representation
+
+    Returns:
+        matrix (EmbeddingMatrix): None if the representation wasn't exported
+    """
+    return _load_cached(get_representation_path(directory, field_name, representation_id, '.npy'),
+                        lambda: EmbeddingMatrix(directory, field_name, representation_id),
+                        [get_representation_path(directory, field_name, representation_id, '_ids.json')])
+
+
+def load_ann_index(directory: str, field_name: str, representation_id: str):
+    """
+    Opens the ANN index built by the content analyzer on the embedding matrix of a document
+    embedding representation. Opened indexes are cached like the content stores
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+        field_name (str): Name of the field
+        representation_id (str): Id of the representation
+
+    Returns:
+        index (ANNIndex): None if the index wasn't built
+    """
+    return _load_cached(get_representation_path(directory, field_name, representation_id, ANN_INDEX_SUFFIX),
+                        lambda: ANNIndex(directory, field_name, representation_id))
+
+
+def load_features_bag_matrix(directory: str, field_name: str, representation_id: str):
+    """
+    Opens the sparse matrix exported by the content analyzer for a features bag
+    representation. Opened matrices are cached like the content stores
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+        field_name (str): Name of the field
+        representation_id (str): Id of the representation
+
+    Returns:
+        matrix (FeaturesBagMatrix): None if the representation wasn't exported
+    """
+    return _load_cached(get_representation_path(directory, field_name, representation_id, '.npz'),
+                        lambda: FeaturesBagMatrix(directory, field_name, representation_id),
+                        [get_representation_path(directory, field_name, representation_id, suffix)
+                         for suffix in ['_vocabulary.json', '_ids.json']])
+
+
+def load_inverted_index(directory: str, field_name: str, representation_id: str):
+    """
+    Opens the inverted index built by the content analyzer on the sparse matrix of a features
+    bag representation. Opened indexes are cached like the content stores
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+        field_name (str): Name of the field
+        representation_id (str): Id of the representation
+
+    Returns:
+        index (InvertedIndex): None if the index wasn't built
+    """
+    return _load_cached(get_representation_path(directory, field_name, representation_id, INVERTED_INDEX_SUFFIX),
+                        lambda: InvertedIndex(directory, field_name, representation_id))
+
+
+def load_representation_matrix(directory: str, field_name: str, representation_id: str):
+    """
+    Opens the matrix exported by the content analyzer for a representation,
+    whether it is a document embedding or a features bag
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+        field_name (str): Name of the field
+        representation_id (str): Id of the representation
+
+    Returns:
+        matrix (EmbeddingMatrix or FeaturesBagMatrix): None if the representation wasn't exported
+    """
+    matrix = load_embedding_matrix(directory, field_name, representation_id)
+    if matrix is None:
+        matrix = load_features_bag_matrix(directory, field_name, representation_id)
+    return matrix
+
+
+def _get_directory_filename_list(items_directory: str):
+    manifest = load_content_manifest(items_directory)
+    if manifest is not None:
+        return manifest.get_file_name_list()
+
+    store = load_content_store(items_directory)
+    if store is not None:
+        return [re.sub(r'[^\w\s]', '', content_id) for content_id in store.get_content_id_list()]
+
+    extension_tuple = tuple(serialization.get_extension_list())
+    return list(dict.fromkeys(os.path.splitext(filename)[0]
+                              for filename in os.listdir(items_directory)
+                              if filename.endswith(extension_tuple)))
+
+
+def _get_filename_dict(items_directory: str, content_id_list) -> dict:
+    """
+    Maps each of the given content ids to the file name of the content,
+    the file names are read from the manifest of the directory when it exists
+    """
+    manifest = load_content_manifest(items_directory)
+    if manifest is not None:
+        return {content_id: manifest.get_file_name(content_id) for content_id in set(content_id_list)}
+
+    return {content_id: re.sub(r'[^\w\s]', '', content_id) for content_id in set(content_id_list)}
+
 
 def load_content_instance(directory: str, content_id: str):
     """
@@ -17,13 +227,47 @@ def load_content_instance(directory: str, content_id: str):
         content (Content)
     """
     logger.info("Loading %s" % content_id)
-    try:
-        content_filename = os.path.join(directory, content_id + '.xz')
-        with lzma.open(content_filename, "rb") as content_file:
-            content: Content = pickle.load(content_file)
-        return content
-    except FileNotFoundError:
+    store = load_content_store(directory)
+    if store is not None:
+        return store.get_content(content_id)
+
+    path = serialization.find_file(os.path.join(directory, content_id))
+    if path is None:
         return None
+    content: Content = serialization.load(path)
+    return content
+
+
+def get_all_items(items_directory: str):
+    """
+    Gets all the items in the items directory
+
+    Args:
+        items_directory (str): Path to the items directory
+
+    Returns:
+        items (List<Content>): List of all the items
+    """
+    logger.info("Loading all items")
+    return [load_content_instance(items_directory, item_id)
+            for item_id in _get_directory_filename_list(items_directory)]
+
+
+def iter_items(items_directory: str):
+    """
+    Generator of all the items in the items directory, loaded one at a time,
+    so that they don't need to be all in memory at once
+
+    Args:
+        items_directory (str): Path to the items directory
+
+    Returns:
+        items (Iterator<Content>): the items, the missing ones are skipped
+    """
+    for item_id in _get_directory_filename_list(items_directory):
+        item = load_content_instance(items_directory, item_id)
+        if item is not None:
+            yield item
 
 
 def get_unrated_items(items_directory: str, ratings):
@@ -37,13 +281,11 @@ def get_unrated_items(items_directory: str, ratings):
     Returns:
         unrated_items (List<Content>): List of items that the user has not rated
     """
-    directory_filename_list = [os.path.splitext(filename)[0]
-                               for filename in os.listdir(items_directory)
-                               if filename != 'search_index']
+    directory_filename_list = _get_directory_filename_list(items_directory)
 
     logger.info("Getting filenames from IDs")
     # list of id of item without rating
-    rated_items_filename_list = set([re.sub(r'[^\w\s]', '', item_id) for item_id in ratings.to_id])
+    rated_items_filename_list = set(_get_filename_dict(items_directory, ratings.to_id).values())
 
     logger.info("Checking if unrated")
     filename_list = [item_id for item_id in directory_filename_list if
@@ -68,13 +310,11 @@ def get_rated_items(items_directory, ratings):
     Returns:
         unrated_items (List<Content>): List of items that the user has rated
     """
-    directory_filename_list = [os.path.splitext(filename)[0]
-                               for filename in os.listdir(items_directory)
-                               if filename != 'search_index']
+    directory_filename_list = _get_directory_filename_list(items_directory)
 
     logger.info("Getting filenames from IDs")
     # list of id of item without rating
-    rated_items_filename_list = set([re.sub(r'[^\w\s]', '', item_id) for item_id in ratings.to_id])
+    rated_items_filename_list = set(_get_filename_dict(items_directory, ratings.to_id).values())
 
     logger.info("Checking if rated")
     filename_list = [item_id for item_id in directory_filename_list if
@@ -98,15 +338,14 @@ def remove_not_existent_items(ratings, items_directory: str):
         ratings (pd.DataFrame): Ratings of the user
         items_directory (str): Path to the directory in which the items are stored
     """
-    directory_filename_list = [os.path.splitext(filename)[0]
-                               for filename in os.listdir(items_directory)
-                               if filename != 'search_index']
-
-    rated_items_filename_list = set([re.sub(r'[^\w\s]', '', item_id) for item_id in ratings.to_id])
-
-    intersection = [x for x in rated_items_filename_list if x in directory_filename_list]
-    ratings = ratings[ratings["to_id"].isin(intersection)]
+    manifest = load_content_manifest(items_directory)
+    if manifest is not None:
+        directory_filename_set = manifest.get_file_name_set()
+    else:
+        directory_filename_set = set(_get_directory_filename_list(items_directory))
 
-    print(ratings)
+    existing_item_id_list = [item_id for item_id, filename in _get_filename_dict(items_directory, ratings.to_id).items()
+                             if filename in directory_filename_set]
+    ratings = ratings[ratings["to_id"].isin(existing_item_id_list)]
 
     return ratings
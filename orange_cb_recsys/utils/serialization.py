@@ -0,0 +1,162 @@
+import lzma
+import os
+import pickle
+import zlib
+from typing import Callable, Dict, List
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Codec:
+    """
+    Compression used for the serialized contents. The codec of a file is recognized on read
+    by the magic bytes at the start of the compressed data, so the files don't need a header.
+    The files written with the codec have its extension, so other tools can tell how they are compressed
+
+    Args:
+        name (str): name of the codec, used in the configuration
+        magic (bytes): first bytes of the data compressed by the codec
+        compress (Callable): function that compresses bytes
+        decompress (Callable): function that decompresses bytes
+        extension (str): extension of the files written with the codec, with the leading dot
+    """
+
+    def __init__(self, name: str, magic: bytes, compress: Callable[[bytes], bytes],
+                 decompress: Callable[[bytes], bytes], extension: str):
+        self.__name = name
+        self.__magic = magic
+        self.__compress = compress
+        self.__decompress = decompress
+        self.__extension = extension
+
+    def get_name(self) -> str:
+        return self.__name
+
+    def get_magic(self) -> bytes:
+        return self.__magic
+
+    def get_extension(self) -> str:
+        return self.__extension
+
+    def compress(self, data: bytes) -> bytes:
+        return self.__compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self.__decompress(data)
+
+    def __str__(self):
+        return self.__name
+
+
+_codec_dict: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec):
+    """
+    Makes a codec available for serialization, by its name
+    """
+    _codec_dict[codec.get_name()] = codec
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Gets a registered codec
+
+    Raises:
+        ValueError: if there is no codec with the given name, for example because the
+            library of the codec is not installed
+    """
+    if name not in _codec_dict:
+        raise ValueError("Codec %s not available, the available codecs are %s" % (name, ', '.join(_codec_dict)))
+    return _codec_dict[name]
+
+
+def get_codec_name_list():
+    return list(_codec_dict.keys())
+
+
+def get_extension_list() -> List[str]:
+    """
+    Gets the extensions of the files written with the registered codecs, the extension
+    of the default codec is the first, since most of the files have it
+    """
+    extension_list = [_codec_dict['lzma'].get_extension()]
+    for codec in _codec_dict.values():
+        if codec.get_extension() not in extension_list:
+            extension_list.append(codec.get_extension())
+    return extension_list
+
+
+def find_file(path: str) -> str:
+    """
+    Finds the file written by dump for a path without extension, whatever its codec
+
+    Args:
+        path (str): path of the file without the extension
+
+    Returns:
+        path (str): path of the file with its extension, None if there is no file
+    """
+    for extension in get_extension_list():
+        if os.path.isfile(path + extension):
+            return path + extension
+    return None
+
+
+# pickles without compression start with the PROTO opcode
+register_codec(Codec('none', pickle.PROTO, lambda data: data, lambda data: data, '.pkl'))
+# zlib header of the default window size, at every compression level
+register_codec(Codec('zlib', b'\x78', zlib.compress, zlib.decompress, '.zlib'))
+register_codec(Codec('lzma', b'\xfd7zXZ\x00', lzma.compress, lzma.decompress, '.xz'))
+if lz4 is not None:
+    register_codec(Codec('lz4', b'\x04\x22\x4d\x18', lz4.frame.compress, lz4.frame.decompress, '.lz4'))
+if zstandard is not None:
+    # the compressors are not thread safe, so one is created for each call
+    register_codec(Codec('zstd', b'\x28\xb5\x2f\xfd', lambda data: zstandard.ZstdCompressor().compress(data),
+                         lambda data: zstandard.ZstdDecompressor().decompress(data), '.zst'))
+
+
+def dumps(obj, codec: str = 'lzma') -> bytes:
+    """
+    Pickles an object and compresses it with the given codec
+    """
+    return get_codec(codec).compress(pickle.dumps(obj))
+
+
+def loads(data: bytes):
+    """
+    Decompresses and unpickles the data written by dumps, the codec is found from the magic bytes
+
+    Raises:
+        ValueError: if the data wasn't compressed by an available codec
+    """
+    for codec in _codec_dict.values():
+        if data.startswith(codec.get_magic()):
+            return pickle.loads(codec.decompress(data))
+    raise ValueError("The data wasn't compressed by an available codec")
+
+
+def dump(obj, path: str, codec: str = 'lzma'):
+    """
+    Pickles an object in a file, compressed with the given codec
+    """
+    data = dumps(obj, codec)
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+def load(path: str):
+    """
+    Loads an object saved by dump, or a pickle compressed by lzma.open.
+    The codec is recognized by the content of the file, not by its extension
+    """
+    with open(path, 'rb') as file:
+        return loads(file.read())
@@ -0,0 +1,73 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from orange_cb_recsys.content_analyzer.content_representation.ann_index import build_ann_index, ANNIndex
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import EmbeddingMatrixWriter
+from orange_cb_recsys.recsys.ranking_algorithms.centroid_vector import CentroidVector
+from orange_cb_recsys.recsys.ranking_algorithms.similarities import CosineSimilarity
+from orange_cb_recsys.utils.load_content import load_ann_index
+
+
+class TestANNIndex(TestCase):
+    def setUp(self):
+        self.directory = 'test_ann_index'
+        os.mkdir(self.directory)
+
+        # four groups of items around orthogonal directions
+        random_state = np.random.RandomState(1)
+        self.embeddings = np.repeat(np.eye(4), 25, axis=0) + random_state.normal(scale=0.05, size=(100, 4))
+        self.content_id_list = ['tt%03d' % i for i in range(100)]
+
+        writer = EmbeddingMatrixWriter(self.directory, 'Plot', '1')
+        for content_id, embedding in zip(self.content_id_list, self.embeddings):
+            writer.append(content_id, embedding)
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_candidate_rows(self):
+        self.assertIsNone(load_ann_index(self.directory, 'Plot', '1'))
+        build_ann_index(self.directory, 'Plot', '1', n_lists=4)
+        index = load_ann_index(self.directory, 'Plot', '1')
+        self.assertIsInstance(index, ANNIndex)
+        self.assertEqual(index.get_row_count(), 100)
+
+        # the list most similar to the query holds the group of the query
+        rows = index.get_candidate_rows(np.array([0.0, 1.0, 0.0, 0.0]), 10, 1)
+        np.testing.assert_array_equal(rows, np.arange(25, 50))
+
+        # more lists are searched if a list hasn't enough rows
+        rows = index.get_candidate_rows(np.array([0.0, 1.0, 0.0, 0.0]), 30, 1)
+        self.assertEqual(len(rows), 50)
+        self.assertTrue(set(range(25, 50)).issubset(rows))
+
+        rows = index.get_candidate_rows(np.array([0.0, 1.0, 0.0, 0.0]), 1, 4)
+        np.testing.assert_array_equal(rows, np.arange(100))
+
+    def test_predict(self):
+        build_ann_index(self.directory, 'Plot', '1', n_lists=4)
+        ratings = pd.DataFrame.from_records([
+            ("A000", "tt000", 1.0),
+            ("A000", "tt001", 1.0),
+            ("A000", "tt050", -1.0),
+        ], columns=["from_id", "to_id", "score"])
+
+        expected = CentroidVector('Plot', '1', CosineSimilarity()).predict('A000', ratings, 5, self.directory)
+        ranking = CentroidVector('Plot', '1', CosineSimilarity(), ann_n_probe=1).predict(
+            'A000', ratings, 5, self.directory)
+        self.assertEqual(list(ranking.to_id), list(expected.to_id))
+        np.testing.assert_array_almost_equal(ranking.rating, expected.rating)
+
+        # the rated items are excluded also when the list of the centroid holds only few items
+        ranking = CentroidVector('Plot', '1', CosineSimilarity(), ann_n_probe=1).predict(
+            'A000', ratings, 24, self.directory)
+        self.assertEqual(len(ranking), 24)
+        self.assertFalse({'tt000', 'tt001', 'tt050'} & set(ranking.to_id))
+
+        with self.assertRaises(ValueError):
+            CentroidVector('Plot', '1', CosineSimilarity(), ann_n_probe=0)
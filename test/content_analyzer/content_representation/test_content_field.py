@@ -1,6 +1,11 @@
+import pickle
 from unittest import TestCase
 
-from orange_cb_recsys.content_analyzer.content_representation.content_field import FeaturesBagField
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.content_field import FeaturesBagField, \
+    EmbeddingField, ContentField, get_term_id_array
 
 
 class TestFeaturesBagField(TestCase):
@@ -16,3 +21,81 @@ class TestFeaturesBagField(TestCase):
         feature.append_feature('synsetID_2', 'global_score_2')
         self.assertEqual(feature.get_value(), {'synsetID_1': 'global_score_1', 'synsetID_2': 'global_score_2'},
                          "Error in the features_dict")
+
+
+class TestCompactFormat(TestCase):
+    def test_pickle(self):
+        features = FeaturesBagField('0', {'space': 0.5, 'ship': 2})
+        embedding = EmbeddingField('1', np.array([0.25, 1.0, 2.0]))
+        field = ContentField('Plot', '0000', {'0': features, '1': embedding})
+        content = Content('tt001', {'Plot': field}, {'director': 'someone'})
+        content.set_index_document_id(3)
+
+        loaded = pickle.loads(pickle.dumps(content))
+        self.assertEqual(loaded, content)
+        self.assertEqual(loaded.get_lod_properties(), {'director': 'someone'})
+        self.assertEqual(loaded.get_index_document_id(), 3)
+        loaded_features = loaded.get_field('Plot').get_representation('0')
+        self.assertEqual(loaded_features.get_value(), {'space': 0.5, 'ship': 2.0})
+        self.assertEqual(loaded_features.get_feature('ship'), 2.0)
+        loaded_features.append_feature('alien', 1.0)
+        self.assertEqual(loaded_features.get_value(), {'space': 0.5, 'ship': 2.0, 'alien': 1.0})
+
+        # features bags whose values aren't numbers are pickled as they are
+        features = FeaturesBagField('0', {'synsetID': 'global_score'})
+        self.assertEqual(pickle.loads(pickle.dumps(features)).get_value(), {'synsetID': 'global_score'})
+
+    def test_pickle_dtype(self):
+        # the weights and the embeddings are stored as float32
+        features = {'space': 0.1, 'ship': 1 / 3}
+        loaded = pickle.loads(pickle.dumps(FeaturesBagField('0', features))).get_value()
+        self.assertEqual(list(loaded), list(features))
+        self.assertEqual(list(loaded.values()), np.array(list(features.values()), dtype=np.float32).tolist())
+        loaded = pickle.loads(pickle.dumps(EmbeddingField('1', np.array([0.1, 1 / 3])))).get_value()
+        self.assertEqual(loaded.dtype, np.float32)
+
+        # unless keep_dtype is set
+        for features in [{'space': 1, 'ship': 3}, {'space': 0.1, 'ship': 1 / 3}, {'space': 1, 'ship': 0.1},
+                         {'space': np.float32(0.1), 'ship': np.float32(2)}, {'space': 2 ** 70}, {}]:
+            loaded = pickle.loads(pickle.dumps(FeaturesBagField('0', features, keep_dtype=True))).get_value()
+            self.assertEqual(loaded, features)
+            self.assertEqual([type(value) for value in loaded.values()],
+                             [type(value) for value in features.values()])
+
+        for embedding_array in [np.array([0.1, 1 / 3]), np.array([0.1, 1 / 3], dtype=np.float32),
+                                np.array([[1, 2], [3, 4]])]:
+            embedding = EmbeddingField('1', embedding_array, keep_dtype=True)
+            loaded = pickle.loads(pickle.dumps(embedding)).get_value()
+            self.assertEqual(loaded.dtype, embedding_array.dtype)
+            np.testing.assert_array_equal(loaded, embedding_array)
+
+    def test_compact(self):
+        features_bag = FeaturesBagField('0', {'space': 0.5, 'ship': 2})
+        self.assertTrue(features_bag.compact())
+        self.assertEqual(features_bag.get_value(), {'space': 0.5, 'ship': 2.0})
+        self.assertEqual(features_bag.get_feature('ship'), 2.0)
+
+        # the features bags share the ids of their terms
+        other_features_bag = FeaturesBagField('0', {'ship': 1.0})
+        other_features_bag.compact()
+        self.assertEqual(other_features_bag, FeaturesBagField('0', {'ship': 1.0}))
+        self.assertEqual(pickle.loads(pickle.dumps(other_features_bag)).get_value(), {'ship': 1.0})
+        self.assertEqual(get_term_id_array(['ship']).tolist(), get_term_id_array(['ship', 'space'])[:1].tolist())
+
+        features_bag.append_feature('star', 1.5)
+        self.assertEqual(features_bag.get_value(), {'space': 0.5, 'ship': 2.0, 'star': 1.5})
+
+        # only bags of numbers are compact
+        self.assertFalse(FeaturesBagField('0', {'space': 'ship'}).compact())
+        self.assertFalse(FeaturesBagField('0', {'space': True}).compact())
+
+    def test_legacy_state(self):
+        features = FeaturesBagField.__new__(FeaturesBagField)
+        features.__setstate__({'_FieldRepresentation__name': '0', '_FeaturesBagField__features': {'space': 0.5}})
+        self.assertEqual(features.get_name(), '0')
+        self.assertEqual(features.get_value(), {'space': 0.5})
+
+        content = Content.__new__(Content)
+        content.__setstate__({'_Content__content_id': 'tt001', '_Content__field_dict': {}})
+        self.assertEqual(content.get_content_id(), 'tt001')
+        self.assertIsNone(content.get_index_document_id())
@@ -0,0 +1,39 @@
+import os
+import shutil
+from unittest import TestCase
+
+import pandas as pd
+
+from orange_cb_recsys.content_analyzer.content_representation.content_manifest import ContentManifestWriter, \
+    ContentManifest
+from orange_cb_recsys.utils.load_content import load_content_manifest, remove_not_existent_items
+
+
+class TestContentManifest(TestCase):
+    def setUp(self):
+        self.directory = 'test_content_manifest'
+        os.mkdir(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_manifest(self):
+        self.assertIsNone(load_content_manifest(self.directory))
+
+        writer = ContentManifestWriter(self.directory)
+        for content_id in ['tt001', 'tt:002', 'tt,"003"']:
+            writer.append(content_id)
+        writer.close()
+
+        manifest = load_content_manifest(self.directory)
+        self.assertIsInstance(manifest, ContentManifest)
+        self.assertEqual(len(manifest), 3)
+        self.assertEqual(manifest.get_content_id_list(), ['tt001', 'tt:002', 'tt,"003"'])
+        self.assertEqual(manifest.get_file_name_list(), ['tt001', 'tt002', 'tt003'])
+        self.assertEqual(manifest.get_file_name('tt:002'), 'tt002')
+        self.assertEqual(manifest.get_file_name('tt:005'), 'tt005')
+        self.assertEqual(manifest.get_offset('tt,"003"'), 2)
+        self.assertIsNone(manifest.get_offset('tt005'))
+
+        ratings = pd.DataFrame({'to_id': ['tt:002', 'tt005', 'tt001', 'tt:002']})
+        self.assertEqual(list(remove_not_existent_items(ratings, self.directory).to_id), ['tt:002', 'tt001', 'tt:002'])
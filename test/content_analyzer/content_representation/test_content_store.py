@@ -0,0 +1,97 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.content_field import FeaturesBagField, \
+    ContentField, EmbeddingField
+from orange_cb_recsys.content_analyzer.content_representation.content_store import ColumnarStoreWriter, \
+    ColumnarStoreReader
+from orange_cb_recsys.utils.load_content import load_content_instance, get_rated_items, get_unrated_items
+
+import pandas as pd
+
+
+class TestColumnarStore(TestCase):
+    def setUp(self):
+        self.directory = 'test_columnar_store'
+        os.mkdir(self.directory)
+
+        self.contents = []
+        for i, content_id in enumerate(['tt001', 'tt002', 'tt:003']):
+            features = FeaturesBagField('0')
+            features.append_feature('term', float(i))
+            embedding = EmbeddingField('1', np.array([i, 1.0, 2.0]))
+            plot = ContentField('Plot', '0000')
+            plot.append('0', features)
+            plot.append('1', embedding)
+            content = Content(content_id)
+            content.append('Plot', plot)
+            content.set_index_document_id(i)
+            self.contents.append(content)
+
+        # a content without the embedding representation
+        title = ContentField('Title')
+        title.append('0', FeaturesBagField('0', {'title': 1.0}))
+        content = Content('tt004')
+        content.append('Title', title)
+        self.contents.append(content)
+
+        writer = ColumnarStoreWriter(self.directory)
+        for content in self.contents:
+            writer.append(content)
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_read(self):
+        store = ColumnarStoreReader(self.directory)
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.get_content_id_list(), ['tt001', 'tt002', 'tt:003', 'tt004'])
+
+        content = store.get_content('tt002')
+        self.assertEqual(content.get_content_id(), 'tt002')
+        self.assertEqual(content.get_field('Plot').get_representation('0').get_value(), {'term': 1.0})
+        self.assertEqual(content.get_field('Plot').get_timestamp(), '0000')
+
+        # contents can be read also by their file name
+        self.assertEqual(store.get_content('tt003').get_content_id(), 'tt:003')
+
+        self.assertIsNone(store.get_representation('tt004', 'Plot', '1'))
+        self.assertEqual(store.get_representation('tt004', 'Title', '0').get_value(), {'title': 1.0})
+        self.assertIsNone(store.get_content('tt005'))
+        store.close()
+
+    def test_append_copy(self):
+        store = ColumnarStoreReader(self.directory)
+        copy_directory = os.path.join(self.directory, 'copy')
+        os.mkdir(copy_directory)
+        writer = ColumnarStoreWriter(copy_directory)
+        writer.append(self.contents[1])
+        self.assertTrue(writer.append_copy(store, 'tt004'))
+        self.assertTrue(writer.append_copy(store, 'tt001', clear_index_document_id=True))
+        self.assertTrue(writer.append_copy(store, 'tt:003'))
+        self.assertFalse(writer.append_copy(store, 'tt005'))
+        writer.close()
+        store.close()
+
+        copy = ColumnarStoreReader(copy_directory)
+        self.assertEqual(copy.get_content_id_list(), ['tt002', 'tt004', 'tt001', 'tt:003'])
+        self.assertEqual(copy.get_content('tt004'), self.contents[3])
+        self.assertEqual(copy.get_content('tt001').get_field('Plot'), self.contents[0].get_field('Plot'))
+        self.assertIsNone(copy.get_content('tt001').get_index_document_id())
+        self.assertEqual(copy.get_content('tt:003').get_index_document_id(), 2)
+        self.assertIsNone(copy.get_representation('tt004', 'Plot', '1'))
+        copy.close()
+
+    def test_load_helpers(self):
+        self.assertEqual(load_content_instance(self.directory, 'tt001').get_content_id(), 'tt001')
+
+        ratings = pd.DataFrame({'to_id': ['tt:003', 'tt001']})
+        rated = get_rated_items(self.directory, ratings)
+        self.assertEqual([item.get_content_id() for item in rated], ['tt001', 'tt:003'])
+        unrated = get_unrated_items(self.directory, ratings)
+        self.assertEqual([item.get_content_id() for item in unrated], ['tt002', 'tt004'])
@@ -0,0 +1,38 @@
+import os
+import shutil
+from unittest import TestCase
+
+from orange_cb_recsys.content_analyzer.content_representation.document_id_map import write_document_id_map, \
+    DocumentIdMap
+from orange_cb_recsys.utils.load_content import load_document_id_map
+
+
+class TestDocumentIdMap(TestCase):
+    def setUp(self):
+        self.directory = 'test_document_id_map'
+        os.mkdir(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_map(self):
+        self.assertIsNone(load_document_id_map(self.directory))
+
+        write_document_id_map(self.directory, ['tt001', 'tt:002', None, 'tt003', 'tt001'])
+        document_id_map = DocumentIdMap(self.directory)
+        self.assertEqual(document_id_map.get_document_id_dict(['tt001', 'tt:002', 'tt002', 'tt003', 'tt005']),
+                         {'tt001': 4, 'tt:002': 1, 'tt002': 1, 'tt003': 3})
+        document_id_map.close()
+
+        # a file name never replaces the document of a content with that id
+        write_document_id_map(self.directory, ['tt001', 'tt:001', 'tt:002', 'tt.002'])
+        document_id_map = DocumentIdMap(self.directory)
+        self.assertEqual(document_id_map.get_document_id_dict(['tt001', 'tt:001', 'tt002']),
+                         {'tt001': 0, 'tt:001': 1, 'tt002': 2})
+        document_id_map.close()
+
+        content_id_list = ['tt%d' % i for i in range(1200)]
+        write_document_id_map(self.directory, content_id_list)
+        document_id_dict = load_document_id_map(self.directory).get_document_id_dict(content_id_list[::-1])
+        self.assertEqual(len(document_id_dict), 1200)
+        self.assertEqual(document_id_dict['tt1100'], 1100)
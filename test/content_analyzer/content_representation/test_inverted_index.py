@@ -0,0 +1,123 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from orange_cb_recsys.content_analyzer.content_representation.inverted_index import build_inverted_index, \
+    InvertedIndex
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import FeaturesBagMatrixWriter
+from orange_cb_recsys.recsys.ranking_algorithms.centroid_vector import CentroidVector
+from orange_cb_recsys.recsys.ranking_algorithms.similarities import CosineSimilarity
+from orange_cb_recsys.utils.load_content import load_inverted_index
+
+
+class TestInvertedIndex(TestCase):
+    def setUp(self):
+        self.directory = 'test_inverted_index'
+        os.mkdir(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write_matrix(self, matrix: sparse.csr_matrix):
+        writer = FeaturesBagMatrixWriter(self.directory, 'Plot', '0')
+        for row in range(matrix.shape[0]):
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            writer.append('tt%03d' % row, {'f%d' % column: value for column, value in
+                                           zip(matrix.indices[start:end], matrix.data[start:end])})
+        writer.close()
+
+    def test_top_k(self):
+        random_state = np.random.RandomState(0)
+        matrix = sparse.random(300, 40, density=0.1, format='csr', random_state=random_state, dtype=np.float32)
+        matrix[np.arange(300), random_state.randint(0, 40, 300)] = 1.0
+        self.write_matrix(matrix)
+
+        self.assertIsNone(load_inverted_index(self.directory, 'Plot', '0'))
+        build_inverted_index(self.directory, 'Plot', '0')
+        index = load_inverted_index(self.directory, 'Plot', '0')
+        self.assertIsInstance(index, InvertedIndex)
+        self.assertEqual(index.get_row_count(), 300)
+
+        # the columns of the exported matrix follow the order in which the features were found
+        exported = normalize(sparse.load_npz(os.path.join(self.directory, 'representations', 'Plot_0.npz')))
+        for k in [1, 5, 20]:
+            query = np.zeros(exported.shape[1])
+            query[random_state.choice(exported.shape[1], 4, replace=False)] = random_state.rand(4)
+            excluded_rows = np.array([3, 10])
+
+            rows, similarities = index.get_top_k(query, k, excluded_rows)
+            expected_similarities = exported @ (query / np.linalg.norm(query))
+            expected_similarities[excluded_rows] = -np.inf
+            expected_rows = np.argsort(-expected_similarities, kind='stable')[:k]
+
+            np.testing.assert_array_equal(rows, expected_rows)
+            np.testing.assert_array_almost_equal(similarities, expected_similarities[expected_rows])
+
+        # only the rows that share features with the query are returned
+        query = np.zeros(exported.shape[1])
+        query[exported[0].indices[0]] = 1.0
+        rows, _ = index.get_top_k(query, 300)
+        self.assertEqual(len(rows), exported[:, exported[0].indices[0]].nnz)
+
+        self.assertEqual(len(index.get_top_k(np.zeros(exported.shape[1]), 5)[0]), 0)
+
+    def test_pruning(self):
+        # a rare feature with high weights and a feature that every content has, with low weights
+        matrix = np.zeros((1000, 2))
+        matrix[:5] = [1.0, 0.01]
+        matrix[5:, 1] = 1.0
+        self.write_matrix(sparse.csr_matrix(matrix))
+        build_inverted_index(self.directory, 'Plot', '0')
+        index = InvertedIndex(self.directory, 'Plot', '0')
+
+        query = np.array([1.0, 0.01])
+        rows, similarities = index.get_top_k(query, 2, np.array([0]))
+        expected_similarities = normalize(matrix) @ (query / np.linalg.norm(query))
+        np.testing.assert_array_equal(rows, [1, 2])
+        np.testing.assert_array_almost_equal(similarities, expected_similarities[[1, 2]])
+
+        # the long postings list is only looked up for the candidates of the rare feature
+        self.assertEqual(index.get_read_posting_count(), 5 + 4)
+
+        # without pruning the whole lists are read
+        index.get_top_k(-query, 2)
+        self.assertEqual(index.get_read_posting_count(), 1005)
+
+    def test_negative_weights(self):
+        self.write_matrix(sparse.csr_matrix(np.array([[1.0, -1.0], [1.0, 0.0], [0.5, 1.0]])))
+        build_inverted_index(self.directory, 'Plot', '0')
+        index = InvertedIndex(self.directory, 'Plot', '0')
+
+        rows, similarities = index.get_top_k(np.array([1.0, 1.0]), 2)
+        np.testing.assert_array_equal(rows, [2, 1])
+        np.testing.assert_array_almost_equal(similarities, [1.5 / np.sqrt(2.5), 1 / np.sqrt(2)])
+
+    def test_predict(self):
+        self.write_matrix(sparse.csr_matrix(np.array([
+            [1.0, 0.5, 0.0, 0.0],
+            [0.8, 0.0, 0.3, 0.0],
+            [0.0, 0.0, 0.0, 1.0],
+            [0.0, 1.0, 0.0, 0.1],
+            [0.0, 0.0, 0.0, 2.0],
+        ])))
+        ratings = pd.DataFrame.from_records([
+            ("A000", "tt000", 1.0),
+            ("A000", "tt002", -1.0),
+        ], columns=["from_id", "to_id", "score"])
+
+        alg = CentroidVector('Plot', '0', CosineSimilarity())
+        expected = alg.predict('A000', ratings, 3, self.directory)
+        build_inverted_index(self.directory, 'Plot', '0')
+        ranking = alg.predict('A000', ratings, 3, self.directory)
+        self.assertEqual(list(ranking.to_id), list(expected.to_id))
+        np.testing.assert_array_almost_equal(ranking.rating, expected.rating)
+
+        # the ranking is completed with the items that share no features with the centroid
+        ranking = alg.predict('A000', ratings, 5, self.directory)
+        self.assertEqual(list(ranking.to_id), ['tt001', 'tt003', 'tt004'])
+        self.assertEqual(ranking.rating[2], 0)
@@ -0,0 +1,141 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import \
+    EmbeddingMatrixWriter, EmbeddingMatrix, FeaturesBagMatrixWriter, FeaturesBagMatrix
+from orange_cb_recsys.recsys.ranking_algorithms.centroid_vector import CentroidVector
+from orange_cb_recsys.recsys.ranking_algorithms.classifier import ClassifierRecommender
+from orange_cb_recsys.recsys.ranking_algorithms.similarities import CosineSimilarity
+from orange_cb_recsys.utils.load_content import load_embedding_matrix, load_representation_matrix
+
+
+class TestEmbeddingMatrix(TestCase):
+    def setUp(self):
+        self.directory = 'test_representation_matrix'
+        os.mkdir(self.directory)
+
+        writer = EmbeddingMatrixWriter(self.directory, 'Plot', '1')
+        writer.append('tt001', np.array([1.0, 0.0]))
+        writer.append('tt002', np.array([0.9, 0.1]))
+        writer.append('tt:003', np.array([0.0, 1.0]))
+        writer.append('tt004', np.array([1.0, 0.2]))
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_read(self):
+        matrix = EmbeddingMatrix(self.directory, 'Plot', '1')
+        self.assertEqual(matrix.get_matrix().shape, (4, 2))
+        self.assertEqual(matrix.get_matrix().dtype, np.float32)
+        self.assertEqual(matrix.get_content_id_list(), ['tt001', 'tt002', 'tt:003', 'tt004'])
+
+        # rows can be found also by file name, missing ids are ignored
+        self.assertEqual(matrix.get_row_index('tt003'), 2)
+        rows = matrix.get_rows(['tt:003', 'tt005', 'tt001'])
+        np.testing.assert_array_equal(rows, np.array([[0.0, 1.0], [1.0, 0.0]], dtype=np.float32))
+
+        self.assertIsNone(load_embedding_matrix(self.directory, 'Plot', '0'))
+        self.assertIs(load_embedding_matrix(self.directory, 'Plot', '1'),
+                      load_embedding_matrix(self.directory, 'Plot', '1'))
+
+    def test_sidecar_changed(self):
+        matrix = load_embedding_matrix(self.directory, 'Plot', '1')
+        self.assertNotIn('.tmp', ''.join(os.listdir(os.path.join(self.directory, 'representations'))))
+
+        # the ids are replaced after the matrix, a matrix loaded in between is loaded again
+        ids_path = os.path.join(self.directory, 'representations', 'Plot_1_ids.json')
+        with open(ids_path, 'w') as ids_file:
+            ids_file.write('["tt005", "tt006", "tt007", "tt008"]')
+        modification_time = os.path.getmtime(ids_path) + 10
+        os.utime(ids_path, (modification_time, modification_time))
+
+        reloaded = load_embedding_matrix(self.directory, 'Plot', '1')
+        self.assertIsNot(reloaded, matrix)
+        self.assertEqual(reloaded.get_content_id_list(), ['tt005', 'tt006', 'tt007', 'tt008'])
+
+    def test_writer_exceptions(self):
+        writer = EmbeddingMatrixWriter(self.directory, 'Plot', '2')
+        with self.assertRaises(ValueError):
+            writer.append('tt001', np.array([[1.0, 0.0]]))
+
+        writer.append('tt001', np.array([1.0, 0.0]))
+        with self.assertRaises(ValueError):
+            writer.append('tt002', np.array([1.0, 0.0, 0.0]))
+
+    def test_predict(self):
+        ratings = pd.DataFrame.from_records([
+            ("A000", "tt001", 1.0),
+            ("A000", "tt:003", -1.0),
+        ], columns=["from_id", "to_id", "score"])
+
+        alg = CentroidVector('Plot', '1', CosineSimilarity())
+        ranking = alg.predict('A000', ratings, 2, self.directory)
+        self.assertEqual(list(ranking.to_id), ['tt002', 'tt004'])
+
+        ranking = alg.predict('A000', ratings, 2, self.directory, candidate_item_id_list=['tt004'])
+        self.assertEqual(list(ranking.to_id), ['tt004'])
+
+        ranking = alg.predict_batch(['A000', 'A001'], ratings.append(
+            {"from_id": "A001", "to_id": "tt002", "score": 1.0}, ignore_index=True), 2, self.directory)
+        self.assertEqual(list(ranking.from_id), ['A000', 'A000', 'A001', 'A001'])
+        self.assertEqual(list(ranking.to_id), ['tt002', 'tt004', 'tt004', 'tt001'])
+
+        alg = ClassifierRecommender('Plot', '1', 'log_regr', threshold=0)
+        ranking = alg.predict('A000', ratings, 2, self.directory)
+        self.assertEqual(set(ranking.to_id), {'tt002', 'tt004'})
+        self.assertGreater(ranking.rating[0], 0.5)
+
+
+class TestFeaturesBagMatrix(TestCase):
+    def setUp(self):
+        self.directory = 'test_representation_matrix'
+        os.mkdir(self.directory)
+
+        writer = FeaturesBagMatrixWriter(self.directory, 'Plot', '0')
+        writer.append('tt001', {'space': 1.0, 'ship': 0.5})
+        writer.append('tt002', {'space': 0.8, 'alien': 0.3})
+        writer.append('tt:003', {'love': 1.0})
+        writer.append('tt004', {'ship': 1.0, 'love': 0.1})
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_read(self):
+        matrix = FeaturesBagMatrix(self.directory, 'Plot', '0')
+        self.assertEqual(matrix.get_matrix().shape, (4, 4))
+        self.assertEqual(matrix.get_vocabulary(), {'space': 0, 'ship': 1, 'alien': 2, 'love': 3})
+        self.assertEqual(matrix.get_row_index('tt003'), 2)
+
+        rows = matrix.get_rows(['tt002', 'tt005']).toarray()
+        np.testing.assert_array_almost_equal(rows, np.array([[0.8, 0.0, 0.3, 0.0]]))
+
+        self.assertIsInstance(load_representation_matrix(self.directory, 'Plot', '0'), FeaturesBagMatrix)
+        self.assertIsNone(load_representation_matrix(self.directory, 'Plot', '1'))
+
+    def test_non_numeric(self):
+        writer = FeaturesBagMatrixWriter(self.directory, 'Genre', '0')
+        writer.append('tt001', {'genre': 'comedy'})
+        writer.close()
+        self.assertIsNone(load_representation_matrix(self.directory, 'Genre', '0'))
+
+    def test_predict(self):
+        ratings = pd.DataFrame.from_records([
+            ("A000", "tt001", 1.0),
+            ("A000", "tt:003", -1.0),
+        ], columns=["from_id", "to_id", "score"])
+
+        alg = CentroidVector('Plot', '0', CosineSimilarity())
+        ranking = alg.predict('A000', ratings, 2, self.directory)
+        self.assertEqual(list(ranking.to_id), ['tt002', 'tt004'])
+        ranking = alg.predict('A000', ratings, 1, self.directory)
+        self.assertEqual(list(ranking.to_id), ['tt002'])
+
+        alg = ClassifierRecommender('Plot', '0', 'gaussian_process', threshold=0)
+        ranking = alg.predict('A000', ratings, 2, self.directory)
+        self.assertEqual(set(ranking.to_id), {'tt002', 'tt004'})
@@ -24,3 +24,24 @@ class TestLuceneTfIdf(TestCase):
 
         self.assertEqual(features['years'], 0.6989700043360189)
 
+
+    def test_produce_content_bulk(self):
+        file_path = '../../../datasets/movies_info_reduced.json'
+        try:
+            with open(file_path):
+                pass
+        except FileNotFoundError:
+            file_path = 'datasets/movies_info_reduced.json'
+
+        features_dict = {}
+        for bulk in [True, False]:
+            technique = LuceneTfIdf(bulk=bulk)
+            technique.set_field_need_refactor("Plot")
+            technique.set_pipeline_need_refactor(str(1))
+            technique.set_processor_list([NLTK()])
+            technique.dataset_refactor(JSONFile(file_path), ["imdbID"])
+            features_dict[bulk] = [technique.produce_content("test", content_id, "Plot").get_value()
+                                   for content_id in ["tt0113497", "tt0112281"]]
+            technique.delete_refactored()
+
+        self.assertEqual(features_dict[True], features_dict[False])
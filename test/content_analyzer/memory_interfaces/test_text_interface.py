@@ -0,0 +1,56 @@
+import shutil
+from unittest import TestCase
+
+import lucene
+
+from orange_cb_recsys.content_analyzer.content_representation.document_id_map import write_document_id_map, \
+    DocumentIdMap
+from orange_cb_recsys.content_analyzer.memory_interfaces import IndexInterface
+
+
+class TestIndexInterface(TestCase):
+    def setUp(self):
+        if lucene.getVMEnv() is None:
+            lucene.initVM(vmargs=['-Djava.awt.headless=true'])
+        else:
+            lucene.getVMEnv().attachCurrentThread()
+        self.directory = 'test_text_interface'
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, plot_dict, update_existing: bool):
+        index = IndexInterface(self.directory + '/search_index')
+        index.init_writing(update_existing)
+        document_id_list = []
+        for content_id, plot in plot_dict.items():
+            index.new_content()
+            index.new_field("content_id", content_id)
+            index.new_searching_field("Plot", plot)
+            document_id_list.append(index.serialize_content())
+        index.stop_writing()
+        return index, document_id_list
+
+    def test_update_document(self):
+        index, document_id_list = self.write({"tt001": "space ship", "tt002": "love story", "tt003": "space love"},
+                                             update_existing=False)
+        self.assertEqual(document_id_list, [0, 1, 2])
+        self.assertEqual(index.get_content_id_list(), ["tt001", "tt002", "tt003"])
+
+        # the ids of the updated documents are known only after the commit
+        index, document_id_list = self.write({"tt002": "love love story"}, update_existing=True)
+        self.assertEqual(document_id_list, [None])
+
+        # the replaced document is not listed
+        content_id_list = index.get_content_id_list()
+        live_content_id_list = [content_id for content_id in content_id_list if content_id is not None]
+        self.assertEqual(sorted(live_content_id_list), ["tt001", "tt002", "tt003"])
+
+        write_document_id_map(self.directory, content_id_list)
+        document_id_map = DocumentIdMap(self.directory)
+        try:
+            document_id_dict = document_id_map.get_document_id_dict(["tt001", "tt002", "tt003"])
+        finally:
+            document_id_map.close()
+        self.assertEqual(document_id_dict, {content_id: content_id_list.index(content_id)
+                                            for content_id in live_content_id_list})
@@ -1,4 +1,6 @@
 from unittest import TestCase
+
+import numpy as np
 from orange_cb_recsys.content_analyzer.ratings_manager.rating_processor import NumberNormalizer
 
 
@@ -13,3 +15,9 @@ class TestNumberNormalizer(TestCase):
         self.assertAlmostEqual(NumberNormalizer(0, 10).fit(11), 10, places=3)
         self.assertAlmostEqual(NumberNormalizer(0, 10).fit(-1), 0, places=3)
 
+
+    def test_fit_batch(self):
+        normalizer = NumberNormalizer(0, 10)
+        field_data_list = [0.5, 11, -1, 5, "2"]
+        np.testing.assert_array_almost_equal(normalizer.fit_batch(field_data_list),
+                                             [normalizer.fit(field_data) for field_data in field_data_list])
@@ -1,5 +1,9 @@
+import os
 from unittest import TestCase
 
+import numpy as np
+import pandas as pd
+
 from orange_cb_recsys.content_analyzer.ratings_manager.rating_processor import NumberNormalizer
 from orange_cb_recsys.content_analyzer.ratings_manager.ratings_importer import RatingsImporter, RatingsFieldConfig
 from orange_cb_recsys.content_analyzer.ratings_manager.sentiment_analysis import TextBlobSentimentAnalysis
@@ -28,3 +32,40 @@ class TestRatingsImporter(TestCase):
                         from_field_name="user_id",
                         to_field_name="item_id",
                         timestamp_field_name="timestamp").import_ratings()
+
+    def test_import_ratings_streaming(self):
+        file_path = '../../../datasets/test_import_ratings.json'
+        try:
+            with open(file_path):
+                pass
+        except FileNotFoundError:
+            file_path = 'datasets/test_import_ratings.json'
+
+        def create_importer(output_directory):
+            return RatingsImporter(source=JSONFile(file_path=file_path),
+                                   output_directory=output_directory,
+                                   rating_configs=[
+                                       RatingsFieldConfig(preference_field_name="stars",
+                                                          processor=NumberNormalizer(min_=0, max_=5))],
+                                   from_field_name="user_id",
+                                   to_field_name="item_id",
+                                   timestamp_field_name="timestamp")
+
+        expected = create_importer(None).import_ratings(chunk_size=2)
+        with self.assertRaises(ValueError):
+            create_importer(None).import_ratings_streaming()
+
+        importer = create_importer("test_ratings_streaming")
+        path = importer.import_ratings_streaming(chunk_size=2)
+        try:
+            ratings = pd.read_csv(path, dtype={"from_id": str, "to_id": str})
+        finally:
+            os.remove(path)
+
+        self.assertEqual(list(ratings.columns), importer.get_frame_columns())
+        self.assertEqual(list(ratings.from_id), list(expected.from_id))
+        self.assertEqual(list(ratings.to_id), list(expected.to_id))
+        np.testing.assert_array_almost_equal(ratings.score, expected.score)
+
+        with self.assertRaises(ValueError):
+            importer.import_ratings_streaming(output_format='xml')
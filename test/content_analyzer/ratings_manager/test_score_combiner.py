@@ -1,5 +1,7 @@
 from unittest import TestCase
 
+import numpy as np
+
 from orange_cb_recsys.content_analyzer.ratings_manager.score_combiner import ScoreCombiner
 
 
@@ -10,3 +12,19 @@ class TestScoreCombiner(TestCase):
         self.assertAlmostEqual(ScoreCombiner("min").combine(test_list), 0.0)
         self.assertAlmostEqual(ScoreCombiner("max").combine(test_list), 1.0)
         self.assertAlmostEqual(ScoreCombiner("mode").combine(test_list), 1.0)
+
+    def test_combine_batch(self):
+        score_matrix = np.array([[1.0, 0.0, 0.5, 1.0], [0.0, 0.0, 1.0, -1.0]])
+        np.testing.assert_array_almost_equal(ScoreCombiner("avg").combine_batch(score_matrix), [0.625, 0.0])
+        np.testing.assert_array_almost_equal(ScoreCombiner("min").combine_batch(score_matrix), [0.0, -1.0])
+        np.testing.assert_array_almost_equal(ScoreCombiner("mode").combine_batch(score_matrix), [1.0, 0.0])
+        np.testing.assert_array_almost_equal(ScoreCombiner("mode").combine_batch(np.array([[0.5, 1.0, 0.5, 1.0]])),
+                                             [0.5])
+
+    def test_mode_ties(self):
+        score_matrix = np.array([[0.5, 1.0, 0.5, 1.0], [1.0, -1.0, 0.0, 0.5], [1.0, 0.0, 0.0, 1.0],
+                                 [0.2, 0.2, 0.2, 0.2], [1.0, 0.5, 1.0, 0.5]])
+        combiner = ScoreCombiner("mode")
+        np.testing.assert_array_equal(combiner.combine_batch(score_matrix),
+                                      [combiner.combine(score_list) for score_list in score_matrix.tolist()])
+        np.testing.assert_array_equal(combiner.combine_batch(score_matrix), [0.5, -1.0, 0.0, 0.2, 0.5])
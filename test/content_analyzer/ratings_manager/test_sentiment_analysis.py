@@ -21,3 +21,9 @@ class TestTextBlobSentimentAnalysis(TestCase):
         for test_field in source:
             test_list.append(TextBlobSentimentAnalysis().fit(field_data=test_field["rating"]))
         self.assertEqual(test_list, confront_list)
+
+    def test_fit_batch(self):
+        field_data_list = ["I love this product", "not so good", "I love this product"]
+        analysis = TextBlobSentimentAnalysis()
+        self.assertEqual(list(analysis.fit_batch(field_data_list)),
+                         [analysis.fit(field_data) for field_data in field_data_list])
@@ -1,8 +1,51 @@
+import json
+import os
+import shutil
+from collections import Counter
 from unittest import TestCase
 
 from orange_cb_recsys.content_analyzer import ContentAnalyzer, ContentAnalyzerConfig, FieldConfig, FieldRepresentationPipeline
+from orange_cb_recsys.content_analyzer.content_representation.content_field import FeaturesBagField
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.entity_linking import BabelPyEntityLinking
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.field_content_production_technique import \
+    SingleContentTechnique, CollectionBasedTechnique
 from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.utils.id_merger import id_merger
+from orange_cb_recsys.utils.load_content import get_all_items, load_representation_matrix, load_content_manifest
+
+
+class WordCount(SingleContentTechnique):
+    def produce_content(self, field_representation_name: str, field_data) -> FeaturesBagField:
+        return FeaturesBagField(field_representation_name, dict(Counter(str(field_data).split())))
+
+
+class CountedWordCount(WordCount):
+    produced = 0
+
+    def produce_content(self, field_representation_name: str, field_data) -> FeaturesBagField:
+        CountedWordCount.produced += 1
+        return super().produce_content(field_representation_name, field_data)
+
+
+class CountedCollectionWordCount(CollectionBasedTechnique):
+    refactored = []
+    produced = 0
+
+    def __init__(self):
+        super().__init__()
+        self.__collection = {}
+
+    def dataset_refactor(self, information_source, id_field_names):
+        self.__collection = {id_merger(raw_content, id_field_names): raw_content[self.get_field_need_refactor()]
+                             for raw_content in information_source}
+        CountedCollectionWordCount.refactored.append(len(self.__collection))
+
+    def produce_content(self, field_representation_name: str, content_id: str, field_name: str):
+        CountedCollectionWordCount.produced += 1
+        return FeaturesBagField(field_representation_name, dict(Counter(self.__collection[content_id].split())))
+
+    def delete_refactored(self):
+        self.__collection = {}
 
 
 class TestContentsProducer(TestCase):
@@ -21,3 +64,131 @@ class TestContentsProducer(TestCase):
         content_analyzer_config.append_field_config("Plot", plot_config)
         content_analyzer = ContentAnalyzer(content_analyzer_config)
         content_analyzer.fit()
+
+    def test_fit_n_jobs(self):
+        filepath = '../../datasets/movies_info_reduced.json'
+        try:
+            with open(filepath):
+                pass
+        except FileNotFoundError:
+            filepath = 'datasets/movies_info_reduced.json'
+
+        item_list_dict = {}
+        for n_jobs in [1, 2]:
+            plot_config = FieldConfig(None)
+            plot_config.append_pipeline(FieldRepresentationPipeline(WordCount()))
+            plot_config.append_pipeline(FieldRepresentationPipeline(None))
+            content_analyzer_config = ContentAnalyzerConfig('ITEM', JSONFile(filepath), ["imdbID"],
+                                                            "movielens_test_jobs", n_jobs=n_jobs)
+            content_analyzer_config.append_field_config("Plot", plot_config)
+            ContentAnalyzer(content_analyzer_config).fit()
+            output_directory = content_analyzer_config.get_output_directory()
+            try:
+                item_list_dict[n_jobs] = {item.get_content_id(): item for item in get_all_items(output_directory)}
+            finally:
+                shutil.rmtree(output_directory, ignore_errors=True)
+
+        self.assertEqual(item_list_dict[1].keys(), item_list_dict[2].keys())
+        for content_id, item in item_list_dict[1].items():
+            parallel_item = item_list_dict[2][content_id]
+            for representation_id in ['0', '1']:
+                self.assertEqual(item.get_field('Plot').get_representation(representation_id),
+                                 parallel_item.get_field('Plot').get_representation(representation_id))
+
+        with self.assertRaises(ValueError):
+            ContentAnalyzerConfig('ITEM', JSONFile(filepath), ["imdbID"], "movielens_test_jobs", n_jobs=0)
+
+    def test_fit_incremental(self):
+        source_path = 'movielens_test_incremental.json'
+        output_directory = 'movielens_test_incremental'
+
+        def write_source(plot_dict):
+            with open(source_path, 'w') as source_file:
+                for imdb_id, plot in plot_dict.items():
+                    source_file.write(json.dumps({"imdbID": imdb_id, "Plot": plot}) + '\n')
+
+        def fit(columnar_store):
+            plot_config = FieldConfig(None)
+            plot_config.append_pipeline(FieldRepresentationPipeline(CountedWordCount()))
+            content_analyzer_config = ContentAnalyzerConfig('ITEM', JSONFile(source_path), ["imdbID"],
+                                                            output_directory, columnar_store=columnar_store,
+                                                            incremental=True)
+            content_analyzer_config.append_field_config("Plot", plot_config)
+            CountedWordCount.produced = 0
+            ContentAnalyzer(content_analyzer_config).fit()
+            return CountedWordCount.produced
+
+        for columnar_store in [False, True]:
+            try:
+                write_source({"tt001": "space ship", "tt002": "love story", "tt003": "space love"})
+                self.assertEqual(fit(columnar_store), 3)
+                self.assertEqual(fit(columnar_store), 0)
+
+                write_source({"tt001": "space ship", "tt002": "love love story", "tt004": "alien ship"})
+                self.assertEqual(fit(columnar_store), 2)
+
+                item_dict = {item.get_content_id(): item for item in get_all_items(output_directory)}
+                self.assertEqual(set(item_dict.keys()), {"tt001", "tt002", "tt004"})
+                self.assertEqual(item_dict["tt002"].get_field("Plot").get_representation("0").get_value(),
+                                 {"love": 2, "story": 1})
+
+                matrix = load_representation_matrix(output_directory, "Plot", "0")
+                self.assertEqual(set(matrix.get_content_id_list()), {"tt001", "tt002", "tt004"})
+                row = matrix.get_rows(["tt001"]).toarray()[0]
+                self.assertEqual({feature: row[column] for feature, column in matrix.get_vocabulary().items()
+                                  if row[column] != 0}, {"space": 1, "ship": 1})
+
+                # the offsets of the manifest are the rows of the exported matrices
+                manifest = load_content_manifest(output_directory)
+                self.assertEqual(manifest.get_content_id_list(), list(matrix.get_content_id_list()))
+                self.assertEqual(manifest.get_offset("tt004"), list(matrix.get_content_id_list()).index("tt004"))
+            finally:
+                shutil.rmtree(output_directory, ignore_errors=True)
+                os.remove(source_path)
+
+    def test_fit_incremental_collection(self):
+        source_path = 'movielens_test_incremental_collection.json'
+        output_directory = 'movielens_test_incremental_collection'
+
+        def write_source(plot_dict):
+            with open(source_path, 'w') as source_file:
+                for imdb_id, plot in plot_dict.items():
+                    source_file.write(json.dumps({"imdbID": imdb_id, "Plot": plot}) + '\n')
+
+        def fit(codec='lzma'):
+            plot_config = FieldConfig(None)
+            plot_config.append_pipeline(FieldRepresentationPipeline(CountedCollectionWordCount()))
+            content_analyzer_config = ContentAnalyzerConfig('ITEM', JSONFile(source_path), ["imdbID"],
+                                                            output_directory, incremental=True,
+                                                            collection_update_threshold=1, codec=codec)
+            content_analyzer_config.append_field_config("Plot", plot_config)
+            CountedCollectionWordCount.refactored = []
+            CountedCollectionWordCount.produced = 0
+            ContentAnalyzer(content_analyzer_config).fit()
+            return CountedCollectionWordCount.refactored, CountedCollectionWordCount.produced
+
+        try:
+            write_source({"tt001": "space ship", "tt002": "love story", "tt003": "space love"})
+            self.assertEqual(fit(), ([3], 3))
+
+            # the collection is not created when contents are only deleted
+            write_source({"tt001": "space ship", "tt002": "love story"})
+            self.assertEqual(fit(), ([], 0))
+
+            # the collection is created on the whole source, only the changed contents are produced
+            write_source({"tt001": "space ship", "tt002": "love love story"})
+            self.assertEqual(fit(), ([2], 1))
+            item_dict = {item.get_content_id(): item for item in get_all_items(output_directory)}
+            self.assertEqual(item_dict["tt002"].get_field("Plot").get_representation("0").get_value(),
+                             {"love": 2, "story": 1})
+
+            # a different codec changes the fingerprint of the config
+            self.assertEqual(fit('zlib'), ([2], 2))
+            self.assertEqual(fit('zlib'), ([], 0))
+            # the files of the previous codec are removed
+            self.assertEqual(sorted(file_name for file_name in os.listdir(output_directory)
+                                    if file_name.startswith('tt')), ['tt001.zlib', 'tt002.zlib'])
+            self.assertEqual(len(get_all_items(output_directory)), 2)
+        finally:
+            shutil.rmtree(output_directory, ignore_errors=True)
+            os.remove(source_path)
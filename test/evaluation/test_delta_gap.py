@@ -1,5 +1,9 @@
+from collections import Counter
 from unittest import TestCase
-from orange_cb_recsys.evaluation.delta_gap import calculate_gap
+
+import pandas as pd
+
+from orange_cb_recsys.evaluation.delta_gap import calculate_gap, get_avg_pop_by_users
 
 
 class Test(TestCase):
@@ -8,3 +12,14 @@ class Test(TestCase):
         avg_pop = {'aaa': 0.5, 'bbb': 0.7}
         calculate_gap(group, avg_pop)
 
+
+    def test_get_avg_pop_by_users(self):
+        data = pd.DataFrame.from_dict({'from_id': ["001", "001", "002", "002", "002", "003"],
+                                       'to_id': ["aaa", "bbb", "aaa", "bbb", "ccc", "ddd"]})
+        pop_by_items = Counter({'aaa': 2, 'bbb': 4, 'ccc': 3})
+
+        self.assertEqual(get_avg_pop_by_users(data, pop_by_items), {'001': 3, '002': 3, '003': 0})
+        self.assertEqual(get_avg_pop_by_users(data, pop_by_items, {'001', '004'}), {'001': 3})
+
+        with self.assertRaises(KeyError):
+            get_avg_pop_by_users(data, dict(pop_by_items))
@@ -3,15 +3,69 @@ import pandas as pd
 import numpy as np
 
 from orange_cb_recsys.evaluation.classification_metrics import Precision, Recall, FNMeasure, MRR
-from orange_cb_recsys.evaluation.eval_model import RankingAlgEvalModel
+from orange_cb_recsys.evaluation.eval_model import RankingAlgEvalModel, PredictionAlgEvalModel
 from orange_cb_recsys.evaluation.partitioning import KFoldPartitioning
+from orange_cb_recsys.evaluation.prediction_metrics import RMSE, MAE
 from orange_cb_recsys.evaluation.ranking_metrics import NDCG, Correlation
 from orange_cb_recsys.recsys import CosineSimilarity
+from orange_cb_recsys.recsys.algorithm import ScorePredictionAlgorithm
 from orange_cb_recsys.recsys.config import RecSysConfig
 from orange_cb_recsys.recsys.ranking_algorithms.centroid_vector import CentroidVector
 
 
+class MeanScore(ScorePredictionAlgorithm):
+    """
+    Predicts for every item the mean score of the training ratings
+    """
+    def __init__(self):
+        super().__init__('Plot', '1')
+
+    def predict(self, user_id, items, ratings, items_directory):
+        return pd.DataFrame({'to_id': [item.get_content_id() for item in items],
+                             'rating': [pd.to_numeric(ratings.score).mean()] * len(items)})
+
+
 class TestEvalModel(TestCase):
+    def setUp(self):
+        self.ratings = pd.DataFrame.from_records([
+            (user_id, item_id, str(((i * 7 + int(user_id)) % 11) / 10))
+            for user_id in ['1', '2', '3']
+            for i, item_id in enumerate(['tt0112281', 'tt0112302', 'tt0112346', 'tt0112453',
+                                         'tt0112641', 'tt0112760', 'tt0112896', 'tt0113041'])
+        ], columns=['from_id', 'to_id', 'score'])
+
+    def test_fit_parallel(self):
+        def fit(n_jobs):
+            recsys_config = RecSysConfig(
+                users_directory='contents/users_test1591814865.8959296',
+                items_directory='contents/movielens_test1591885241.5520566',
+                score_prediction_algorithm=None,
+                ranking_algorithm=CentroidVector('Plot', '1', CosineSimilarity()),
+                rating_frame=self.ratings
+            )
+            return RankingAlgEvalModel(recsys_config, KFoldPartitioning(), [Precision(0.4), NDCG()],
+                                       n_jobs=n_jobs).fit()
+
+        expected = fit(1)
+        self.assertEqual(list(expected['from']), ['1', '2', '3'])
+        pd.testing.assert_frame_equal(fit(2), expected)
+
+        with self.assertRaises(ValueError):
+            RankingAlgEvalModel(None, KFoldPartitioning(), n_jobs=0)
+
+    def test_prediction_fit(self):
+        recsys_config = RecSysConfig(
+            users_directory='contents/users_test1591814865.8959296',
+            items_directory='contents/movielens_test1591885241.5520566',
+            score_prediction_algorithm=MeanScore(),
+            ranking_algorithm=None,
+            rating_frame=self.ratings
+        )
+        results = PredictionAlgEvalModel(recsys_config, KFoldPartitioning(), [RMSE(), MAE()]).fit()
+        self.assertEqual(list(results['from']), ['1', '2', '3'])
+        self.assertEqual(list(results.columns), ['from', 'RMSE', 'MAE'])
+        self.assertTrue((results['RMSE'] >= results['MAE']).all())
+
     def test_fit(self):
         item_id_list = [
             'tt0112281',
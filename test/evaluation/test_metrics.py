@@ -1,3 +1,4 @@
+import math
 from unittest import TestCase
 
 from orange_cb_recsys.evaluation import Precision, Recall, FNMeasure, NDCG, MRR, Correlation, GiniIndex, \
@@ -85,6 +86,27 @@ class Test(TestCase):
         split_dict = {0: (-1.0, -0.5), 1: (-0.5, 0.0), 2: (0.0, 0.5), 3: (0.5, 1.0)}
         NDCG(split_dict).perform(predictions=score_frame, truth=truth_frame)
 
+    def test_perform_batch(self):
+        predictions = pd.DataFrame.from_dict({'from_id': ["001", "001", "001", "002", "002", "003"],
+                                              'to_id': ["aaa", "bbb", "ccc", "ddd", "aaa", "aaa"],
+                                              'rating': [0.9, 0.8, 0.7, 0.9, 0.5, 0.4]})
+        truth = pd.DataFrame.from_dict({'from_id': ["001", "001", "001", "002", "002", "002", "003"],
+                                        'to_id': ["bbb", "aaa", "ccc", "aaa", "ddd", "eee", "aaa"],
+                                        'rating': [1.0, 0.5, -0.5, 0.8, 0.2, 0.6, 1.0]})
+
+        for metric in [NDCG({0: (-1.0, 0.0), 1: (0.0, 0.5), 2: (0.5, 1.0)}), Correlation('pearson'),
+                       Correlation('kendall'), Correlation('spearman')]:
+            results = metric.perform_batch(predictions, truth)
+            self.assertEqual(list(results['from_id']), ["001", "002", "003"])
+            for user_id, result in zip(results['from_id'], results[str(metric)]):
+                expected = metric.perform(predictions[predictions['from_id'] == user_id],
+                                          truth[truth['from_id'] == user_id])
+                self.assertAlmostEqual(result, expected)
+
+        with self.assertRaises(ValueError):
+            NDCG().perform(pd.DataFrame.from_dict({'to_id': ["zzz"], 'rating': [1.0]}),
+                           pd.DataFrame.from_dict({'to_id': ["aaa"], 'rating': [1.0]}))
+
     def test_perform_fairness_metrics(self):
         GiniIndex().perform(score_frame_fairness)
         PopRecsCorrelation('test', '.').perform(score_frame_fairness, truth_frame_fairness)
@@ -96,10 +118,13 @@ class Test(TestCase):
         DeltaGap({'niche': 0.2, 'diverse': 0.6, 'bb_focused': 0.2})
 
     def test_perform_serendipity(self):
-        Serendipity(10).perform(score_frame_fairness, truth_frame_fairness)
+        # 'ccc' is the only popular item and it is recommended once
+        self.assertAlmostEqual(Serendipity(10).perform(score_frame_fairness, truth_frame_fairness), 7 / 10 / 4)
 
     def test_perform_novelty(self):
-        Novelty(10).perform(score_frame_fairness, truth_frame_fairness)
+        log_popularity = 4 * math.log2(3 / 8) + 3 * math.log2(2 / 8) + math.log2(4 / 8)
+        self.assertAlmostEqual(Novelty(10).perform(score_frame_fairness, truth_frame_fairness),
+                               - log_popularity / (4 * 10))
 
     def test_perform_rmse(self):
         predictions = pd.DataFrame.from_dict({'to_id': ["bbb", "eee", "aaa", "ddd", "ccc", "fff", "hhh"],
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from orange_cb_recsys.evaluation.utils import pop_ratio_by_user, get_profile_avg_pop_ratio, \
+    get_recs_avg_pop_ratio, split_user_in_groups
+
+
+class TestUtils(TestCase):
+    def setUp(self):
+        self.score_frame = pd.DataFrame.from_dict({
+            'from_id': ["001", "001", "001", "002", "002", "002", "003"],
+            'to_id': ["aaa", "aaa", "bbb", "aaa", "ccc", "ddd", "ddd"],
+            'rating': [1.0, 1.0, 0.5, 0.0, 0.6, 0.2, 0.7]})
+        self.pop_items = {'aaa', 'ccc'}
+
+    def test_pop_ratio_by_user(self):
+        pop_ratios = pop_ratio_by_user(self.score_frame, self.pop_items)
+        self.assertEqual(list(pop_ratios.columns), ['from_id', 'popularity_ratio'])
+
+        # the ratio is computed on the distinct items of each user
+        pop_ratio_dict = dict(zip(pop_ratios.from_id, pop_ratios.popularity_ratio))
+        self.assertEqual(pop_ratio_dict, {'001': 1 / 2, '002': 2 / 3, '003': 0})
+
+        self.assertAlmostEqual(get_profile_avg_pop_ratio({'001', '002'}, pop_ratios), 7 / 12)
+        self.assertTrue(np.isnan(get_profile_avg_pop_ratio(set(), pop_ratios)))
+
+        groups = split_user_in_groups(self.score_frame, {'niche': 0.34, 'diverse': 0.33}, self.pop_items)
+        self.assertEqual(groups, {'niche': {'002'}, 'diverse': {'001'}, 'default_diverse': {'003'}})
+
+    def test_get_recs_avg_pop_ratio(self):
+        # the ratio is computed on all the recommendations of each user
+        self.assertAlmostEqual(get_recs_avg_pop_ratio({'001', '003', '004'}, self.score_frame, self.pop_items),
+                               (2 / 3 + 0) / 2)
+        self.assertTrue(np.isnan(get_recs_avg_pop_ratio({'004'}, self.score_frame, self.pop_items)))
@@ -44,6 +44,36 @@ class TestCentroidVector(TestCase):
 
         self.assertGreater(alg.predict('A000', ratings=ratings, recs_number=2, items_directory=path).rating[0], 0.9)
 
+    def test_predict_batch(self):
+        ratings = pd.DataFrame.from_records([
+            ("A000", "tt0112281", 0.99),
+            ("A000", "tt0112453", 0),
+            ("A000", "tt0112641", 0.44),
+            ("A000", "tt0112760", -0.68),
+            ("A001", "tt0112896", 0.32),
+            ("A001", "tt0113041", -0.1),
+            ("A002", "tt0113101", -0.87)
+        ], columns=["from_id", "to_id", "score"])
+
+        path = "../../../contents/movielens_test1591885241.5520566"
+        if not os.path.isdir(path):
+            path = "contents/movielens_test1591885241.5520566"
+
+        alg = CentroidVector('Plot', '1', CosineSimilarity())
+        ranking = alg.predict_batch(['A000', 'A001', 'A002', 'A003'], ratings, 3, path)
+        self.assertEqual(list(ranking.columns), ['from_id', 'to_id', 'rating'])
+        # users without positive ratings are skipped
+        self.assertEqual(set(ranking.from_id), {'A000', 'A001'})
+
+        for user_id in ['A000', 'A001']:
+            user_ratings = ratings[ratings.from_id == user_id]
+            expected = alg.predict(user_id, user_ratings, 3, path)
+            user_ranking = ranking[ranking.from_id == user_id]
+            self.assertEqual(list(user_ranking.to_id), list(expected.to_id))
+            self.assertFalse(set(user_ranking.to_id) & set(user_ratings.to_id))
+            for rating, expected_rating in zip(user_ranking.rating, expected.rating):
+                self.assertAlmostEqual(rating, expected_rating, places=5)
+
     def test_exceptions(self):
         ratings = pd.DataFrame.from_records([
             ("A000", "tt0112281", "sdfgd", 0.99, "54654675"),
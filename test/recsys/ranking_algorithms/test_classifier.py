@@ -5,6 +5,7 @@ import pandas as pd
 import os
 import pickle
 
+from orange_cb_recsys.recsys import ItemCatalog
 from orange_cb_recsys.recsys.ranking_algorithms.classifier import ClassifierRecommender
 
 
@@ -26,3 +27,33 @@ class TestClassifierRecommender(TestCase):
             path = "contents/movielens_test1591885241.5520566"
 
         self.assertGreater(alg.predict('A000', ratings, 1, path, ['tt0114576']).rating[0], 0)
+
+    def test_predict_batch(self):
+        ratings = pd.DataFrame.from_records([
+            ("A000", "tt0112281", 0.99),
+            ("A000", "tt0112453", -0.5),
+            ("A000", "tt0112641", 0.44),
+            ("A001", "tt0112896", 0.32),
+            ("A001", "tt0113041", -0.1),
+        ], columns=["from_id", "to_id", "score"])
+
+        path = "../../../contents/movielens_test1591885241.5520566"
+        if not os.path.isdir(path):
+            path = "contents/movielens_test1591885241.5520566"
+
+        alg = ClassifierRecommender("Plot", "2", "log_regr", 0)
+        expected_dict = {user_id: alg.predict(user_id, ratings[ratings.from_id == user_id], 3, path)
+                         for user_id in ['A000', 'A001']}
+
+        # without an exported matrix the rankings are computed by predict, with the matrix
+        # of the item catalog the items are loaded only once
+        for item_catalog in [None, ItemCatalog(path, [("Plot", "2")])]:
+            alg.set_item_catalog(item_catalog)
+            ranking = alg.predict_batch(['A000', 'A001', 'A002'], ratings, 3, path)
+            self.assertEqual(list(ranking.columns), ['from_id', 'to_id', 'rating'])
+            self.assertEqual(set(ranking.from_id), {'A000', 'A001'})
+            for user_id, expected in expected_dict.items():
+                user_ranking = ranking[ranking.from_id == user_id]
+                self.assertEqual(list(user_ranking.to_id), list(expected.to_id))
+                for rating, expected_rating in zip(user_ranking.rating, expected.rating):
+                    self.assertAlmostEqual(rating, expected_rating, places=4)
@@ -6,6 +6,7 @@ import pandas as pd
 import lucene
 
 from orange_cb_recsys.recsys import IndexQuery, RecSysConfig, RecSys
+from orange_cb_recsys.recsys.ranking_algorithms.searcher_manager import acquire_searcher, close_searchers
 
 class TestIndexQuery(TestCase):
     def test_predict(self):
@@ -43,4 +44,60 @@ class TestIndexQuery(TestCase):
             t_index.predict(user_id='A000', ratings=ratings, recs_number=2, items_directory=path)
         except RuntimeError:
             lucene.initVM(vmargs=['-Djava.awt.headless=true'])
-            t_index.predict(user_id='A000', ratings=ratings, recs_number=2, items_directory=path)
\ No newline at end of file
+            t_index.predict(user_id='A000', ratings=ratings, recs_number=2, items_directory=path)
+
+    def test_acquire_searcher(self):
+        path = "../../../contents/movielens_test1591885241.5520566/search_index"
+        if not os.path.isdir(path):
+            path = "contents/movielens_test1591885241.5520566/search_index"
+        if lucene.getVMEnv() is None:
+            lucene.initVM(vmargs=['-Djava.awt.headless=true'])
+
+        with acquire_searcher(path, True) as searcher:
+            first_reader = searcher.getIndexReader()
+        with acquire_searcher(path, True) as searcher:
+            self.assertEqual(searcher.getIndexReader(), first_reader)
+            # the similarity is set by the manager when the searcher is created
+            self.assertEqual(searcher.getSimilarity().getClass().getSimpleName(), 'ClassicSimilarity')
+        with acquire_searcher(path) as searcher:
+            self.assertNotEqual(searcher.getSimilarity().getClass().getSimpleName(), 'ClassicSimilarity')
+        close_searchers()
+
+    def test_predict_max_query_terms(self):
+        ratings = pd.DataFrame.from_records([
+            ("A000", "tt0112281", 0.99),
+            ("A000", "tt0112641", 0.44),
+            ("A000", "tt0112760", -0.68),
+        ], columns=["from_id", "to_id", "score"])
+
+        path = "../../../contents/movielens_test1591885241.5520566"
+        if not os.path.isdir(path):
+            path = "contents/movielens_test1591885241.5520566"
+        if lucene.getVMEnv() is None:
+            lucene.initVM(vmargs=['-Djava.awt.headless=true'])
+
+        ranking = IndexQuery(max_query_terms=5).predict('A000', ratings, 3, path)
+        self.assertEqual(len(ranking), 3)
+        self.assertNotIn("tt0112281", list(ranking.to_id))
+        self.assertNotIn("tt0112641", list(ranking.to_id))
+
+    def test_predict_candidates(self):
+        ratings = pd.DataFrame.from_records([
+            ("A000", "tt0112281", 0.99),
+            ("A000", "tt0112641", 0.44),
+        ], columns=["from_id", "to_id", "score"])
+
+        path = "../../../contents/movielens_test1591885241.5520566"
+        if not os.path.isdir(path):
+            path = "contents/movielens_test1591885241.5520566"
+        if lucene.getVMEnv() is None:
+            lucene.initVM(vmargs=['-Djava.awt.headless=true'])
+
+        candidate_list = ["tt0112760", "tt0113041"]
+        alg = IndexQuery()
+        ranking = alg.predict('A000', ratings, 3, path, candidate_item_id_list=candidate_list)
+        self.assertTrue(set(ranking.to_id).issubset(candidate_list))
+
+        # the cached filter of the same candidates gives the same ranking
+        cached_ranking = alg.predict('A000', ratings, 3, path, candidate_item_id_list=candidate_list[::-1])
+        self.assertEqual(list(cached_ranking.to_id), list(ranking.to_id))
@@ -1,5 +1,9 @@
 from unittest import TestCase
-from orange_cb_recsys.recsys.ranking_algorithms.similarities import CosineSimilarity, DenseVector
+
+import numpy as np
+from scipy import sparse
+
+from orange_cb_recsys.recsys.ranking_algorithms.similarities import CosineSimilarity, DenseVector, Similarity
 
 
 class TestCosineSimilarity(TestCase):
@@ -17,3 +21,35 @@ class TestCosineSimilarity(TestCase):
         with self.assertRaises(ValueError):
             sim.perform(a, b)
 
+
+    def test_perform_batch(self):
+        a = np.array([5, 9, 7, 8, 3, 5, 4, 2, 6, 4])
+        matrix = np.array([[8, 1, 3, 10, 8, 4, 9, 2, 1, 6],
+                           [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                           [5, 9, 7, 8, 3, 5, 4, 2, 6, 4]])
+        sim = CosineSimilarity()
+        np.testing.assert_array_almost_equal(sim.perform_batch(a, matrix), [0.7552110293516224, 0, 1])
+        np.testing.assert_array_almost_equal(
+            sim.perform_batch(sparse.csr_matrix(a), sparse.csr_matrix(matrix)), [0.7552110293516224, 0, 1])
+
+    def test_default_perform_batch(self):
+        class DenseCosine(Similarity):
+            def perform(self, v1, v2):
+                return v1.similarity(v2)
+
+        a = np.array([5, 9, 7, 8, 3, 5, 4, 2, 6, 4])
+        matrix = np.array([[8, 1, 3, 10, 8, 4, 9, 2, 1, 6],
+                           [5, 9, 7, 8, 3, 5, 4, 2, 6, 4]])
+        np.testing.assert_array_almost_equal(DenseCosine().perform_batch(a, matrix), [0.7552110293516224, 1])
+        np.testing.assert_array_almost_equal(
+            DenseCosine().perform_batch(sparse.csr_matrix(a), sparse.csr_matrix(matrix)), [0.7552110293516224, 1])
+
+    def test_perform_pairwise_prepared(self):
+        matrix = np.array([[5, 9, 7, 8, 3, 5, 4, 2, 6, 4]])
+        other_matrix = np.array([[8, 1, 3, 10, 8, 4, 9, 2, 1, 6],
+                                 [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]])
+        sim = CosineSimilarity()
+        prepared = sim.prepare_matrix(sparse.csr_matrix(other_matrix))
+        np.testing.assert_array_almost_equal(sim.perform_pairwise(matrix, other_matrix), [[0.7552110293516224, 0]])
+        np.testing.assert_array_almost_equal(sim.perform_pairwise(sparse.csr_matrix(matrix), prepared,
+                                                                  other_prepared=True), [[0.7552110293516224, 0]])
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+import pandas as pd
+
+from orange_cb_recsys.recsys import RecSysConfig, CentroidVector, CosineSimilarity
+
+
+class TestRecSysConfig(TestCase):
+    def test_user_ratings(self):
+        rating_frame = pd.DataFrame.from_records([
+            ("2", "tt0112453", 0.5),
+            ("1", "tt0112281", 1.0),
+            ("2", "tt0112302", -0.5),
+            ("3", "tt0112346", 0.0),
+            ("1", "tt0112641", 0.2),
+        ], columns=["from_id", "to_id", "score"])
+        config = RecSysConfig(users_directory='users', items_directory='items',
+                              ranking_algorithm=CentroidVector('Plot', '0', CosineSimilarity()),
+                              rating_frame=rating_frame)
+
+        # the ratings of each user keep their order
+        user_ratings = config.get_user_ratings("2")
+        self.assertEqual(list(user_ratings.to_id), ["tt0112453", "tt0112302"])
+        self.assertEqual(list(user_ratings.from_id), ["2", "2"])
+        self.assertEqual(user_ratings.from_id.dtype, rating_frame.from_id.dtype)
+        self.assertEqual(len(config.get_user_ratings("4")), 0)
+
+        users_ratings = config.get_users_ratings(["3", "4", "1"])
+        self.assertEqual(list(users_ratings.from_id), ["3", "1", "1"])
+        self.assertEqual(list(users_ratings.to_id), ["tt0112346", "tt0112281", "tt0112641"])
+        self.assertEqual(len(config.get_users_ratings([])), 0)
+
+        # the index is built again on the new rating frame
+        config.set_rating_frame(rating_frame[rating_frame.from_id != "2"])
+        self.assertEqual(len(config.get_user_ratings("2")), 0)
+        self.assertEqual(len(config.get_user_ratings("1")), 2)
@@ -0,0 +1,110 @@
+import os
+import pickle
+import shutil
+import time
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.content_field import ContentField, \
+    EmbeddingField, FeaturesBagField
+from orange_cb_recsys.content_analyzer.content_representation.representation_matrix import EmbeddingMatrix, \
+    FeaturesBagMatrix
+from orange_cb_recsys.recsys import ItemCatalog, RecSysConfig, CentroidVector, CosineSimilarity
+
+
+class TestItemCatalog(TestCase):
+    def setUp(self):
+        self.directory = 'test_item_catalog'
+        os.mkdir(self.directory)
+        self.features = {
+            'tt001': {'a': 1.0, 'b': 0.5},
+            'tt002': {'b': 1.0, 'c': 0.2},
+            'tt003': {'c': 1.0},
+            'tt004': {'a': 0.3, 'c': 0.7},
+        }
+        for content_id, features in self.features.items():
+            self.serialize(content_id, features)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def serialize(self, content_id: str, features: dict):
+        field = ContentField('Plot')
+        field.append('0', FeaturesBagField('0', features))
+        field.append('1', EmbeddingField('1', np.array(list(features.get(key, 0.0) for key in 'abc'))))
+        content = Content(content_id)
+        content.append('Plot', field)
+        content.serialize(self.directory)
+
+    def test_get_matrix(self):
+        catalog = ItemCatalog(self.directory, [('Plot', 0)])
+        self.assertEqual(catalog.get_field_representation_list(), [('Plot', '0')])
+
+        matrix = catalog.get_matrix('Plot', '0')
+        self.assertIsInstance(matrix, FeaturesBagMatrix)
+        self.assertFalse(catalog.is_exported('Plot', '0'))
+        self.assertEqual(sorted(matrix.get_content_id_list()), sorted(self.features))
+        vocabulary = matrix.get_vocabulary()
+        for content_id, features in self.features.items():
+            row = matrix.get_rows([content_id]).toarray().ravel()
+            np.testing.assert_array_almost_equal([row[vocabulary[key]] for key in features],
+                                                 list(features.values()))
+            self.assertEqual(np.count_nonzero(row), len(features))
+        # the matrix is kept in memory
+        self.assertIs(catalog.get_matrix('Plot', '0'), matrix)
+
+        embedding_matrix = catalog.get_matrix('Plot', '1')
+        self.assertIsInstance(embedding_matrix, EmbeddingMatrix)
+        self.assertEqual(embedding_matrix.get_matrix().dtype, np.float32)
+        np.testing.assert_array_almost_equal(embedding_matrix.get_rows(['tt002']), [[0.0, 1.0, 0.2]])
+        self.assertEqual(catalog.get_field_representation_list(), [('Plot', '0'), ('Plot', '1')])
+
+        with self.assertRaises(ValueError):
+            catalog.get_matrix('Plot', '2')
+        self.assertEqual(len(catalog.get_field_representation_list()), 2)
+
+        # the copies load the matrices again
+        catalog_copy = pickle.loads(pickle.dumps(catalog))
+        self.assertEqual(catalog_copy.get_field_representation_list(), [('Plot', '0'), ('Plot', '1')])
+        self.assertEqual(len(catalog_copy.get_matrix('Plot', '1').get_content_id_list()), 4)
+
+    def test_refresh(self):
+        catalog = ItemCatalog(self.directory, [('Plot', '0')])
+        self.assertFalse(catalog.refresh())
+
+        self.serialize('tt005', {'d': 1.0})
+        # the modification time of the directory may not change within the same tick
+        modification_time = time.time() + 10
+        os.utime(self.directory, (modification_time, modification_time))
+
+        matrix = catalog.get_matrix('Plot', '0')
+        self.assertIn('tt005', matrix)
+        self.assertIn('d', matrix.get_vocabulary())
+        self.assertFalse(catalog.refresh())
+
+    def test_predict(self):
+        ratings = pd.DataFrame.from_records([
+            ("A000", "tt001", 1.0),
+            ("A000", "tt003", -1.0),
+        ], columns=["from_id", "to_id", "score"])
+
+        for representation_id in ['0', '1']:
+            alg = CentroidVector('Plot', representation_id, CosineSimilarity())
+            expected = alg.predict('A000', ratings, 2, self.directory)
+
+            config = RecSysConfig(users_directory='users', items_directory=self.directory,
+                                  ranking_algorithm=alg, rating_frame=ratings,
+                                  item_catalog=ItemCatalog(self.directory, [('Plot', representation_id)]))
+            self.assertIs(alg.get_item_catalog(), config.get_item_catalog())
+            matrix, source = alg.get_representation_matrix(self.directory)
+            self.assertEqual(source, 'catalog')
+
+            ranking = alg.predict('A000', ratings, 2, self.directory)
+            self.assertEqual(list(ranking.to_id), list(expected.to_id))
+            np.testing.assert_array_almost_equal(ranking.rating, expected.rating, decimal=5)
+
+        # the catalog is used only for its items directory
+        self.assertEqual(alg.get_representation_matrix('other_directory'), (None, 'matrix'))
@@ -0,0 +1,102 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from orange_cb_recsys.recsys import CentroidVector, ClassifierRecommender, CosineSimilarity
+from orange_cb_recsys.recsys.profile_cache import ProfileCache
+
+
+class TestProfileCache(TestCase):
+    def setUp(self):
+        self.cache_directory = 'test_profile_cache'
+        self.ratings = pd.DataFrame.from_records([
+            ("A000", "tt0112281", 0.99),
+            ("A000", "tt0112453", 0),
+            ("A000", "tt0112641", 0.44),
+            ("A000", "tt0112760", -0.68),
+        ], columns=["from_id", "to_id", "score"])
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_directory, ignore_errors=True)
+
+    def test_get_key(self):
+        key = ProfileCache.get_key('A000', ['Plot', '1'], self.ratings)
+        self.assertEqual(key, ProfileCache.get_key('A000', ['Plot', '1'], self.ratings.iloc[::-1]))
+        self.assertNotEqual(key, ProfileCache.get_key('A001', ['Plot', '1'], self.ratings))
+        self.assertNotEqual(key, ProfileCache.get_key('A000', ['Plot', '0'], self.ratings))
+
+        changed_ratings = self.ratings.copy()
+        changed_ratings.loc[0, 'score'] = 0.5
+        self.assertNotEqual(key, ProfileCache.get_key('A000', ['Plot', '1'], changed_ratings))
+
+    def test_catalog_version(self):
+        items_directory = os.path.join(self.cache_directory, 'items')
+        os.makedirs(items_directory)
+        manifest_path = os.path.join(items_directory, 'contents_manifest.csv')
+        with open(manifest_path, 'w') as manifest_file:
+            manifest_file.write('content_id\n')
+        catalog_version = ProfileCache.get_catalog_version(items_directory)
+        self.assertEqual(catalog_version, ProfileCache.get_catalog_version(items_directory))
+        key = ProfileCache.get_key('A000', ['Plot', '1'], self.ratings, catalog_version)
+        self.assertNotEqual(key, ProfileCache.get_key('A000', ['Plot', '1'], self.ratings))
+
+        # an incremental run of the content analyzer writes the manifest again
+        with open(manifest_path, 'w') as manifest_file:
+            manifest_file.write('content_id\ntt001\n')
+        self.assertNotEqual(key, ProfileCache.get_key('A000', ['Plot', '1'], self.ratings,
+                                                      ProfileCache.get_catalog_version(items_directory)))
+
+    def test_lru(self):
+        cache = ProfileCache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn('b', cache)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+        with self.assertRaises(ValueError):
+            ProfileCache(max_size=0)
+
+    def test_persistence(self):
+        cache = ProfileCache(max_size=2, cache_directory=self.cache_directory)
+        cache.put('a', np.array([1.0, 2.0]))
+        cache.put('b', {'term': 0.5})
+        cache.put('c', 3)
+        self.assertEqual(len(os.listdir(self.cache_directory)), 2)
+
+        cache = ProfileCache(max_size=2, cache_directory=self.cache_directory)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), {'term': 0.5})
+        self.assertEqual(cache.get('c'), 3)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(os.listdir(self.cache_directory), [])
+
+    def test_algorithms(self):
+        path = "contents/movielens_test1591885241.5520566"
+
+        cache = ProfileCache(cache_directory=self.cache_directory)
+        alg = CentroidVector('Plot', '1', CosineSimilarity(), profile_cache=cache)
+        expected = alg.predict('A000', self.ratings, 3, path)
+        self.assertEqual(len(cache), 1)
+        ranking = alg.predict('A000', self.ratings, 3, path)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(list(ranking.to_id), list(expected.to_id))
+
+        alg = ClassifierRecommender('Plot', '2', 'gaussian_process', threshold=0, profile_cache=cache)
+        expected = alg.predict('A000', self.ratings, 3, path)
+        self.assertEqual(len(cache), 2)
+
+        # the fitted classifier is read from the directory by a new cache
+        alg.set_profile_cache(ProfileCache(cache_directory=self.cache_directory))
+        ranking = alg.predict('A000', self.ratings, 3, path)
+        self.assertEqual(len(alg.get_profile_cache()), 2)
+        self.assertEqual(list(ranking.to_id), list(expected.to_id))
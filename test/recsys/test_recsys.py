@@ -77,3 +77,22 @@ class TestRecSys(TestCase):
             t_recsys.fit_predict('1', [])
         except ValueError:
             pass
+
+    def test_fit_ranking_batch(self):
+        t_ratings = pd.DataFrame.from_records([
+            ('1', 'tt0112281', 0.8),
+            ('1', 'tt0112302', -0.5),
+            ('2', 'tt0112346', 0.4),
+            ('2', 'tt0112453', 1.0),
+        ], columns=['from_id', 'to_id', 'score'])
+
+        path = 'contents'
+        t_centroid = CentroidVector(item_field='Plot', field_representation='1', similarity=CosineSimilarity())
+        t_config = RecSysConfig(users_directory='{}/users_test1591814865.8959296'.format(path),
+                                items_directory='{}/movielens_test1591885241.5520566'.format(path),
+                                rating_frame=t_ratings,
+                                ranking_algorithm=t_centroid)
+        t_recsys = RecSys(config=t_config)
+        ranking = t_recsys.fit_ranking_batch(['1', '2'], 2)
+        self.assertEqual(list(ranking.from_id), ['1', '1', '2', '2'])
+        self.assertEqual(list(ranking[ranking.from_id == '1'].to_id), list(t_recsys.fit_ranking('1', 2).to_id))
@@ -1,5 +1,11 @@
+import os
+import shutil
 from unittest import TestCase
-from orange_cb_recsys.utils.load_content import load_content_instance, remove_not_existent_items
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.content_store import ColumnarStoreWriter
+from orange_cb_recsys.utils.load_content import load_content_instance, remove_not_existent_items, \
+    load_content_store
 import pandas as pd
 
 
@@ -13,3 +19,28 @@ class Test(TestCase):
     def test_remove_not_existent_items(self):
         ratings = pd.DataFrame({'to_id': ['tt0112281', 'aaaa']})
         remove_not_existent_items(ratings, 'contents/movielens_test1591885241.5520566')
+
+    def test_load_content_store(self):
+        directory = 'test_load_content_store'
+        os.mkdir(directory)
+        try:
+            writer = ColumnarStoreWriter(directory)
+            writer.append(Content('tt001'))
+            writer.close()
+            store = load_content_store(directory)
+            self.assertIs(load_content_store(directory), store)
+
+            writer = ColumnarStoreWriter(directory)
+            writer.append(Content('tt002'))
+            writer.close()
+            modification_time = os.path.getmtime(store.get_path()) + 10
+            os.utime(store.get_path(), (modification_time, modification_time))
+
+            # the store changed, the previous one is closed
+            new_store = load_content_store(directory)
+            self.assertEqual(new_store.get_content_id_list(), ['tt002'])
+            with self.assertRaises(ValueError):
+                store.get_content('tt001')
+            new_store.close()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
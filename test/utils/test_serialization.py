@@ -0,0 +1,58 @@
+import lzma
+import os
+import pickle
+import shutil
+from unittest import TestCase
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.content_field import FeaturesBagField, ContentField
+from orange_cb_recsys.utils.load_content import load_content_instance, get_all_items
+from orange_cb_recsys.utils.serialization import dumps, loads, get_codec, get_codec_name_list, find_file
+
+
+class TestSerialization(TestCase):
+    def setUp(self):
+        self.directory = 'test_serialization'
+        os.mkdir(self.directory)
+
+        content_field_repr = FeaturesBagField("0")
+        content_field_repr.append_feature("test_key", 0.5)
+        content_field = ContentField("test_field", "0000")
+        content_field.append("0", content_field_repr)
+        self.content = Content("tt:001")
+        self.content.append("test_field", content_field)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_codecs(self):
+        self.assertTrue({'none', 'zlib', 'lzma'}.issubset(get_codec_name_list()))
+        for codec in get_codec_name_list():
+            data = dumps({'key': [1, 2.5, 'value']}, codec)
+            self.assertEqual(loads(data), {'key': [1, 2.5, 'value']})
+
+            shutil.rmtree(self.directory)
+            os.mkdir(self.directory)
+            self.content.serialize(self.directory, codec)
+            self.assertEqual(os.listdir(self.directory), ['tt001' + get_codec(codec).get_extension()])
+            self.assertEqual(find_file(os.path.join(self.directory, 'tt001')),
+                             os.path.join(self.directory, 'tt001' + get_codec(codec).get_extension()))
+            self.assertEqual(load_content_instance(self.directory, 'tt001'), self.content)
+            self.assertEqual(get_all_items(self.directory), [self.content])
+
+        self.assertEqual(get_codec('lzma').get_extension(), '.xz')
+        self.assertEqual(len(set(get_codec(codec).get_extension() for codec in get_codec_name_list())),
+                         len(get_codec_name_list()))
+        self.assertIsNone(find_file(os.path.join(self.directory, 'tt002')))
+        self.assertIsNone(load_content_instance(self.directory, 'tt002'))
+
+        with self.assertRaises(ValueError):
+            get_codec('rar')
+        with self.assertRaises(ValueError):
+            loads(b'not compressed')
+
+    def test_legacy_file(self):
+        # contents serialized before the codecs were added
+        with lzma.open(os.path.join(self.directory, 'tt001.xz'), 'wb') as content_file:
+            pickle.dump(self.content, content_file)
+        self.assertEqual(load_content_instance(self.directory, 'tt001'), self.content)